@@ -0,0 +1,208 @@
+import asyncio
+import time
+
+from .MessengerHook import _Delivery
+from .MessengerHookQueue import MessengerHookResult
+
+
+def _import_aiohttp():
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError('AsyncMessengerHook requires aiohttp. Install it with `pip install PyDooray[aiohttp]`') \
+            from None
+    return aiohttp
+
+
+class AsyncMessengerHook(_Delivery):
+    """
+    Dooray! messenger incoming hook helper class for asyncio.
+
+    The messages are sent with an :mod:`aiohttp` session, which keeps the connections to the hook host in a pool.
+    The session is created by the first message, on its event loop. Close the hook on that loop when it is
+    no longer used, or use it as an async context manager.
+
+    The rate limit and the retries of :attr:`RETRY_STATUS_CODES` are the ones of :class:`dooray.MessengerHook`.
+
+    Usage::
+
+        import dooray
+
+        async with dooray.AsyncMessengerHook(HOOK_URL, hook_name='Alert Bot') as hook:
+            attachments = dooray.MessengerHookAttachments.builder().add_attachment(text='Details').create()
+            await hook.asend('Disk usage is over 90%', attachments)
+
+            results = await hook.asend_many((f'Job {i} finished' for i in range(1000)), concurrency=20)
+    """
+
+    def __init__(
+        self,
+        hook_url,
+        hook_name="My Bot",
+        hook_icon="https://static.dooray.com/static_images/dooray-bot.png",
+        user_agent="PyDooray/Python",
+        timeout=10,
+        pool_maxsize=100,
+        rate=None,
+        burst=1,
+        max_retries=3,
+        backoff=1.0,
+        max_backoff=30.0,
+        max_retry_wait=60.0,
+        clock=time.monotonic,
+    ):
+        """
+        :param hook_url: Hook URL
+        :type hook_url: str
+        :param hook_name: Name of the hook. Defaults to "My Bot"
+        :type hook_name: str, optional
+        :param hook_icon: Icon URL of the hook. Defaults to "https://static.dooray.com/static_images/dooray-bot.png"
+        :type hook_icon: str, optional
+        :param user_agent: User agent of the request. Defaults to "PyDooray/Python"
+        :type user_agent: str, optional
+        :param timeout: Timeout of the request in seconds, or a (connect, read) tuple. Defaults to 10
+        :type timeout: float or tuple, optional
+        :param pool_maxsize: Maximum number of connections kept to the hook host. Defaults to 100
+        :type pool_maxsize: int, optional
+        :param rate: Maximum number of messages sent per second. Defaults to None, which does not limit the rate
+        :type rate: float, optional
+        :param burst: Number of messages sent at once before the rate applies. Defaults to 1
+        :type burst: int, optional
+        :param max_retries: Maximum number of retries of a throttled message. Defaults to 3
+        :type max_retries: int, optional
+        :param backoff: Time in seconds to wait before the first retry without Retry-After. \
+            It doubles for each retry, and a random part of it is waited. Defaults to 1
+        :type backoff: float, optional
+        :param max_backoff: Maximum time in seconds to wait before a retry without Retry-After. Defaults to 30
+        :type max_backoff: float, optional
+        :param max_retry_wait: Maximum time in seconds to wait before a retry. The message is given up \
+            when Retry-After asks for longer. Defaults to 60
+        :type max_retry_wait: float, optional
+        :param clock: Function returning the current time in seconds. Defaults to :func:`time.monotonic`
+        :type clock: callable, optional
+        """
+        if not isinstance(hook_url, str):
+            raise TypeError(hook_url)
+        if not isinstance(hook_name, str):
+            raise TypeError(hook_name)
+        if not isinstance(hook_icon, str):
+            raise TypeError(hook_icon)
+        if user_agent is not None and not isinstance(user_agent, str):
+            raise TypeError(user_agent)
+        if timeout is not None and not isinstance(timeout, (int, float, tuple)):
+            raise TypeError(timeout)
+        if not isinstance(pool_maxsize, int):
+            raise TypeError(pool_maxsize)
+        super().__init__(rate, burst, max_retries, backoff, max_backoff, max_retry_wait, clock)
+        _import_aiohttp()
+
+        self._hook_url = hook_url
+        self._hook_name = hook_name
+        self._hook_icon = hook_icon
+        self._request_header = {}
+        if user_agent is not None:
+            self._request_header['User-Agent'] = user_agent
+        self._timeout = timeout
+        self._pool_maxsize = pool_maxsize
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            aiohttp = _import_aiohttp()
+            if isinstance(self._timeout, tuple):
+                timeout = aiohttp.ClientTimeout(sock_connect=self._timeout[0], sock_read=self._timeout[1])
+            else:
+                timeout = aiohttp.ClientTimeout(total=self._timeout)
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._pool_maxsize),
+                timeout=timeout,
+                headers=self._request_header,
+            )
+        return self._session
+
+    async def close(self):
+        """
+        Close the session and its pooled connections. The hook can still be used, with a new session.
+        """
+        session, self._session = self._session, None
+        if session is not None:
+            await session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def asend(self, text, attachments=None):
+        """
+        Send a message to the hook.
+
+        :param text: Message text
+        :type text: str
+        :param attachments: List of dictionaries of attachments. See :meth:`dooray.MessengerHook.send`
+        :type attachments: list, optional
+        :return: True if the hook has accepted the message
+        """
+        if not isinstance(text, str):
+            raise TypeError(text)
+        if attachments is not None and not isinstance(attachments, list):
+            raise TypeError(attachments)
+
+        payload = {
+            'botName': self._hook_name,
+            'botIconImage': self._hook_icon,
+            'text': text,
+        }
+        if attachments is not None:
+            payload['attachments'] = attachments
+        attempt = 0
+        while True:
+            wait = self._wait_before_send()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            async with self._get_session().post(self._hook_url, json=payload) as resp:
+                status, headers = resp.status, resp.headers
+            wait = self._wait_before_retry(status, headers, attempt)
+            if wait is None:
+                return status == 200
+            await asyncio.sleep(wait)
+            attempt += 1
+
+    async def asend_many(self, messages, concurrency=10):
+        """
+        Send messages to the hook, up to `concurrency` at a time.
+        The messages are taken from `messages` as they are sent, so it can be a long generator.
+
+        :param messages: Messages to send. Each one is a text, or a (text, attachments) tuple. \
+            The result of an invalid one has a :class:`TypeError`
+        :type messages: iterable
+        :param concurrency: Maximum number of messages sent at a time. Defaults to 10
+        :type concurrency: int, optional
+        :return: list of :class:`dooray.MessengerHookResult`, in the order of the messages
+        """
+        if not isinstance(concurrency, int):
+            raise TypeError(concurrency)
+        if concurrency < 1:
+            raise ValueError(concurrency)
+
+        iterator = enumerate(messages)
+        results = {}
+
+        async def work():
+            # The iterator is shared by the workers. Each one takes the next message when it is free.
+            for index, message in iterator:
+                text, attachments = message, None
+                try:
+                    if not isinstance(message, str):
+                        if not isinstance(message, tuple) or len(message) != 2:
+                            raise TypeError(message)
+                        text, attachments = message
+                    ok = await self.asend(text, attachments)
+                    results[index] = MessengerHookResult(text, attachments, ok=ok)
+                except Exception as e:
+                    # Invalid messages are reported as well, without stopping the others
+                    results[index] = MessengerHookResult(text, attachments, error=e)
+
+        await asyncio.gather(*(work() for _ in range(concurrency)))
+        return [results[i] for i in range(len(results))]
@@ -1,10 +1,13 @@
 import requests
 import datetime
+import time
 import dooray.DoorayObjects
 import dooray.Member
 import dooray.IncomingHook
 import dooray.Project
 import dooray.Messenger
+from .DoorayDirectory import WorkflowRegistry, MemberDirectory, ChannelDirectory, TemplateCache
+from .DoorayCache import ResponseCache, SingleFlight
 from .DoorayExceptions import BadHttpResponseStatusCode, ServerGeneralError
 
 DEFAULT_ENDPOINT = "https://api.dooray.com"
@@ -20,6 +23,8 @@ class DoorayBase:
             token=None,
             endpoint=DEFAULT_ENDPOINT,
             user_agent="PyDooray/Python",
+            cache=None,
+            singleflight=False,
     ):
         if not isinstance(token, str):
             raise TypeError(token)
@@ -27,6 +32,8 @@ class DoorayBase:
             raise TypeError(endpoint)
         if user_agent is not None and not isinstance(user_agent, str):
             raise TypeError(user_agent)
+        if cache is not None and not isinstance(cache, ResponseCache):
+            raise TypeError(cache)
 
         self._token = token
         self._endpoint = endpoint
@@ -34,22 +41,85 @@ class DoorayBase:
             'Authorization': f'dooray-api {self._token}',
             'User-Agent': user_agent,
         }
+        self._cache = cache
+        self._cache_scope = ResponseCache.make_scope(endpoint, token)
+        self._singleflight = SingleFlight() if singleflight else None
+
+    def _request(self, method, url, name=None, **kwargs):
+        # 'name' is the name of the API method, which selects the TTL of the cached response
+        if self._singleflight is not None and method == 'GET':
+            key = ResponseCache.make_key(method, url, kwargs.get('params'), self._cache_scope)
+            return self._singleflight.do(key, lambda: self._request_once(method, url, name, **kwargs))
+        return self._request_once(method, url, name, **kwargs)
+
+    def _request_once(self, method, url, name=None, **kwargs):
+        ttl = 0
+        negative = False
+        if self._cache is not None and method == 'GET' and name is not None:
+            ttl = self._cache.ttl_for(name)
+            negative = self._cache.negative_ttl > 0
+        if ttl > 0 or negative:
+            return self._cached_request(method, url, ttl, **kwargs)
 
-    def _request(self, method, url, **kwargs):
         if 'headers' in kwargs:
             kwargs['headers'].update(self._request_header)
         else:
             kwargs['headers'] = self._request_header
 
+        return self._send(method, url, **kwargs)
+
+    def _invalidate(self, path, recursive=True):
+        # Called after a successful write, so that this client reads its own writes
+        if self._cache is not None:
+            self._cache.invalidate(path, recursive=recursive)
+
+    def _cached_request(self, method, url, ttl, **kwargs):
+        key = ResponseCache.make_key(method, url, kwargs.get('params'), self._cache_scope)
+        resp = self._cache.get_negative(key)
+        if resp is not None:
+            raise BadHttpResponseStatusCode(resp)
+        if ttl > 0:
+            resp = self._cache.get(key)
+            if resp is not None:
+                return resp
+
+        headers = kwargs.pop('headers', {})
+        conditional = self._cache.conditional_headers(key) if ttl > 0 else {}
+        kwargs['headers'] = {**headers, **conditional, **self._request_header}
+
+        started = time.monotonic()
         resp = requests.request(method, f'{self._endpoint}{url}', **kwargs)
+        elapsed = time.monotonic() - started
+
+        if resp.status_code == 304 and conditional:
+            cached = self._cache.revalidated(key, ttl, elapsed)
+            if cached is not None:
+                return cached
+            # Evicted in the meantime. Fetch it again without the validators.
+            kwargs['headers'] = {**headers, **self._request_header}
+            started = time.monotonic()
+            resp = requests.request(method, f'{self._endpoint}{url}', **kwargs)
+            elapsed = time.monotonic() - started
+
+        if resp.status_code == 404:
+            self._cache.set_negative(key, resp)
+        DoorayBase._check_response(resp)
+        if ttl > 0:
+            self._cache.set(key, resp, ttl, elapsed)
+        return resp
+
+    def _send(self, method, url, **kwargs):
+        resp = requests.request(method, f'{self._endpoint}{url}', **kwargs)
+        DoorayBase._check_response(resp)
+        return resp
 
+    @staticmethod
+    def _check_response(resp):
         if resp.status_code != 200:
             raise BadHttpResponseStatusCode(resp)
         if resp.text == 'SERVER_GENERAL_ERROR':
             raise ServerGeneralError(resp)
 
-        return resp
-
 
 class Dooray(DoorayBase):
     """
@@ -60,6 +130,9 @@ class Dooray(DoorayBase):
         token=None,
         endpoint=DEFAULT_ENDPOINT,
         user_agent="PyDooray/Python",
+        interning=None,
+        cache=None,
+        singleflight=False,
     ):
         """
         :param token: Dooray! API token
@@ -68,23 +141,42 @@ class Dooray(DoorayBase):
         :type endpoint: str
         :param user_agent: User agent string, defaults to "PyDooray/Python"
         :type user_agent: str
+        :param interning: Share one instance per (type, id) among the nested objects of posts, templates and logs.
+            'response' shares them within a response, 'client' shares them across all the responses of this client.
+            See :class:`dooray.DoorayObjects.ObjectInterner`. Defaults to None, which disables interning.
+        :type interning: 'response' | 'client', optional
+        :param cache: Cache of GET responses, shared by all the APIs of this client. \
+            See :class:`dooray.ResponseCache`. Defaults to None, which disables caching.
+        :type cache: :class:`dooray.ResponseCache`, optional
+        :param singleflight: Share one HTTP call among the identical GET requests in flight at the same time, \
+            e.g. many threads getting the same post. See :class:`dooray.DoorayCache.SingleFlight`. Defaults to False.
+        :type singleflight: bool, optional
         """
-        super().__init__(token, endpoint, user_agent)
+        super().__init__(token, endpoint, user_agent, cache=cache, singleflight=singleflight)
 
-        self.messenger = DoorayMessenger(token, endpoint, user_agent)
+        self.messenger = DoorayMessenger(token, endpoint, user_agent, cache=cache, singleflight=singleflight)
         """
         Messenger object to access Dooray! Messenger API
         
         :type: :class:`dooray.DoorayMessenger`
         """
 
-        self.project = DoorayProject(token, endpoint, user_agent)
+        self.project = DoorayProject(
+            token, endpoint, user_agent, interning=interning, cache=cache, singleflight=singleflight
+        )
         """
         Project object to access Dooray! Project API
 
         :type: :class:`dooray.DoorayProject`
         """
 
+        self.members = MemberDirectory(self)
+        """
+        Members indexed by id, user code, external email and name.
+
+        :type: :class:`dooray.DoorayDirectory.MemberDirectory`
+        """
+
     def get_members(
         self,
         name=None,
@@ -144,7 +236,7 @@ class Dooray(DoorayBase):
                 "name, user_code, user_code_exact, id_provider_user_id, or external_emails"
             )
 
-        resp = self._request('GET', f'/common/v1/members', params=params)
+        resp = self._request('GET', f'/common/v1/members', params=params, name='get_members')
 
         return dooray.DoorayObjects.DoorayListResponse(resp.json(), dooray.Member.Member, page=page, size=size)
 
@@ -158,7 +250,7 @@ class Dooray(DoorayBase):
         :type incoming_hook_id: str
         :return: :class:`dooray.DoorayObjects.DoorayResponse` of :class:`dooray.IncomingHook.IncomingHook`
         """
-        resp = self._request('GET', f'/common/v1/incoming-hooks/{incoming_hook_id}')
+        resp = self._request('GET', f'/common/v1/incoming-hooks/{incoming_hook_id}', name='get_incoming_hook')
 
         return dooray.DoorayObjects.DoorayResponse(resp.json(), dooray.IncomingHook.IncomingHook)
 
@@ -175,8 +267,21 @@ class DoorayMessenger(DoorayBase):
             token=None,
             endpoint=DEFAULT_ENDPOINT,
             user_agent="PyDooray/Python",
+            cache=None,
+            singleflight=False,
     ):
-        super().__init__(token, endpoint, user_agent)
+        super().__init__(token, endpoint, user_agent, cache=cache, singleflight=singleflight)
+
+        self.channels = ChannelDirectory(self)
+        """
+        Channels indexed by id, title, type and participant member id.
+
+        :type: :class:`dooray.DoorayDirectory.ChannelDirectory`
+        """
+
+    def _invalidate_channels(self):
+        self._invalidate('/messenger/v1/channels', recursive=False)
+        self.channels.invalidate()
 
     @staticmethod
     def _get_member_id_list(member_ids):
@@ -198,7 +303,7 @@ class DoorayMessenger(DoorayBase):
         :return: :class:`dooray.DoorayObjects.DoorayListResponse` of :class:`dooray.Messenger.Channel`
         """
 
-        resp = self._request('GET', f'/messenger/v1/channels')
+        resp = self._request('GET', f'/messenger/v1/channels', name='get_channels')
 
         return dooray.DoorayObjects.DoorayListResponse(resp.json(), dooray.Messenger.Channel, size=None)
 
@@ -264,6 +369,7 @@ class DoorayMessenger(DoorayBase):
         }
 
         resp = self._request('POST', f'/messenger/v1/channels/{channel_id}/members/join', json=data)
+        self._invalidate_channels()
 
         return dooray.DoorayObjects.DoorayResponse(resp.json())
 
@@ -284,6 +390,7 @@ class DoorayMessenger(DoorayBase):
         }
 
         resp = self._request('POST', f'/messenger/v1/channels/{channel_id}/members/leave', json=data)
+        self._invalidate_channels()
 
         return dooray.DoorayObjects.DoorayResponse(resp.json())
 
@@ -319,6 +426,7 @@ class DoorayMessenger(DoorayBase):
             'idType': id_type,
         }
         resp = self._request('POST', f'/messenger/v1/channels', params=params, json=data)
+        self._invalidate_channels()
 
         return dooray.DoorayObjects.DoorayResponse(resp.json(), dooray.DoorayObjects.Relation)
 
@@ -330,13 +438,66 @@ class DoorayProject(DoorayBase):
     Instead of instantiating this class directly, use :class:`dooray.Dooray.project`
     """
 
+    # Client scoped interners are bounded, as they live as long as the client.
+    CLIENT_INTERNER_MAX_SIZE = 10000
+
+    # Status of is-creatable when the code is taken. Only these answers are cached as "not creatable",
+    # not the auth or throttling failures.
+    NOT_CREATABLE_STATUS_CODES = (409,)
+
     def __init__(
             self,
             token=None,
             endpoint=DEFAULT_ENDPOINT,
             user_agent="PyDooray/Python",
+            interning=None,
+            cache=None,
+            singleflight=False,
     ):
-        super().__init__(token, endpoint, user_agent)
+        super().__init__(token, endpoint, user_agent, cache=cache, singleflight=singleflight)
+        if interning not in (None, 'response', 'client'):
+            raise ValueError(interning)
+
+        self._interning = interning
+        self.interner = None
+        """
+        The interner shared by all the responses, if `interning` is 'client'. Otherwise None.
+
+        :type: :class:`dooray.DoorayObjects.ObjectInterner`
+        """
+        if interning == 'client':
+            self.interner = dooray.DoorayObjects.ObjectInterner(max_size=DoorayProject.CLIENT_INTERNER_MAX_SIZE)
+
+        self.workflows = WorkflowRegistry(self)
+        """
+        Workflows of the projects, indexed by id, name and class.
+
+        :type: :class:`dooray.DoorayDirectory.WorkflowRegistry`
+        """
+
+        self.templates = TemplateCache(self)
+        """
+        Templates of the projects, rendered locally.
+
+        :type: :class:`dooray.DoorayDirectory.TemplateCache`
+        """
+
+    def _response_interner(self):
+        if self._interning == 'response':
+            return dooray.DoorayObjects.ObjectInterner()
+        return self.interner
+
+    def _invalidate_post(self, project_id, post_id):
+        # The post with its logs, and the post lists
+        self._invalidate(f'/project/v1/projects/{project_id}/posts/{post_id}')
+        self._invalidate(f'/project/v1/projects/{project_id}/posts', recursive=False)
+
+    @staticmethod
+    def _drop_bodies(data):
+        # Dropped before building the objects, so that the contents are released along with the response
+        for e in data['result']:
+            e.pop('body', None)
+        return data
 
     # Project > Projects
     def is_creatable(self, code):
@@ -352,10 +513,16 @@ class DoorayProject(DoorayBase):
         data = {
             'code': code,
         }
+        # Taken codes are cached if the cache has negative_ttl
+        key = ResponseCache.make_key('POST', '/project/v1/projects/is-creatable', data, self._cache_scope)
+        if self._cache is not None and self._cache.get_negative(key) is not None:
+            return False
 
         try:
             self._request('POST', f'/project/v1/projects/is-creatable', json=data)
-        except BadHttpResponseStatusCode:
+        except BadHttpResponseStatusCode as e:
+            if self._cache is not None and e.status_code in DoorayProject.NOT_CREATABLE_STATUS_CODES:
+                self._cache.set_negative(key, e.status_code)
             return False
 
         return True
@@ -381,6 +548,7 @@ class DoorayProject(DoorayBase):
         }
 
         resp = self._request('POST', f'/project/v1/projects', json=data)
+        self._invalidate('/project/v1/projects/is-creatable')
 
         return dooray.DoorayObjects.DoorayResponse(resp.json(), dooray.DoorayObjects.Relation)
 
@@ -394,7 +562,7 @@ class DoorayProject(DoorayBase):
         :type project_id: str
         :return: :class:`dooray.DoorayObjects.DoorayResponse` of :class:`dooray.Project.Project`
         """
-        resp = self._request('GET', f'/project/v1/projects/{project_id}')
+        resp = self._request('GET', f'/project/v1/projects/{project_id}', name='get')
 
         return dooray.DoorayObjects.DoorayResponse(resp.json(), dooray.Project.Project)
 
@@ -408,7 +576,7 @@ class DoorayProject(DoorayBase):
         :type project_id: str
         :return: :class:`dooray.DoorayObjects.DoorayResponse` of :class:`dooray.Project.Workflow`
         """
-        resp = self._request('GET', f'/project/v1/projects/{project_id}/workflows')
+        resp = self._request('GET', f'/project/v1/projects/{project_id}/workflows', name='get_workflows')
 
         return dooray.DoorayObjects.DoorayListResponse(resp.json(), dooray.Project.Workflow)
 
@@ -449,7 +617,11 @@ class DoorayProject(DoorayBase):
         :return: :class:`dooray.DoorayObjects.DoorayResponse` of :class:`dooray.Project.EmailAddress`
         """
 
-        resp = self._request('GET', f'/project/v1/projects/{project_id}/email-addresses/{email_address_id}')
+        resp = self._request(
+            'GET',
+            f'/project/v1/projects/{project_id}/email-addresses/{email_address_id}',
+            name='get_email_address'
+        )
 
         return dooray.DoorayObjects.DoorayResponse(resp.json(), dooray.Project.EmailAddress)
 
@@ -482,6 +654,7 @@ class DoorayProject(DoorayBase):
         # TODO color parameter only accepts string in 'xxxxxx' format
 
         resp = self._request('POST', f'/project/v1/projects/{project_id}/tags', json=data)
+        self._invalidate(f'/project/v1/projects/{project_id}/tags', recursive=False)
 
         return dooray.DoorayObjects.DoorayResponse(resp.json(), dooray.DoorayObjects.Relation)
 
@@ -498,7 +671,7 @@ class DoorayProject(DoorayBase):
         :return: :class:`dooray.DoorayObjects.DoorayResponse` of :class:`dooray.Project.Tag`
         """
 
-        resp = self._request('GET', f'/project/v1/projects/{project_id}/tags/{tag_id}')
+        resp = self._request('GET', f'/project/v1/projects/{project_id}/tags/{tag_id}', name='get_tag')
 
         return dooray.DoorayObjects.DoorayResponse(resp.json(), dooray.Project.Tag)
 
@@ -538,6 +711,7 @@ class DoorayProject(DoorayBase):
         # TODO how to create a milestone without period?
 
         resp = self._request('POST', f'/project/v1/projects/{project_id}/milestones', json=data)
+        self._invalidate(f'/project/v1/projects/{project_id}/milestones', recursive=False)
 
         return dooray.DoorayObjects.DoorayResponse(resp.json(), dooray.DoorayObjects.Relation)
 
@@ -565,7 +739,12 @@ class DoorayProject(DoorayBase):
         if status is not None:
             params['status'] = status
 
-        resp = self._request('GET', f'/project/v1/projects/{project_id}/milestones', params=params)
+        resp = self._request(
+            'GET',
+            f'/project/v1/projects/{project_id}/milestones',
+            params=params,
+            name='get_milestones'
+        )
 
         return dooray.DoorayObjects.DoorayListResponse(resp.json(), dooray.Project.Milestone, page=page, size=size)
 
@@ -582,7 +761,11 @@ class DoorayProject(DoorayBase):
         :return: :class:`dooray.DoorayObjects.DoorayResponse` of :class:`dooray.Project.Milestone`
         """
 
-        resp = self._request('GET', f'/project/v1/projects/{project_id}/milestones/{milestone_id}')
+        resp = self._request(
+            'GET',
+            f'/project/v1/projects/{project_id}/milestones/{milestone_id}',
+            name='get_milestone'
+        )
         # TODO in case of milestone_id is wrong, returns 200 OK with 'SERVER_GENERAL_ERROR', not a json object
 
         return dooray.DoorayObjects.DoorayResponse(resp.json(), dooray.Project.Milestone)
@@ -620,6 +803,8 @@ class DoorayProject(DoorayBase):
         # TODO closedAt not updated if status set as 'closed' with this API
 
         resp = self._request('PUT', f'/project/v1/projects/{project_id}/milestones/{milestone_id}', json=data)
+        self._invalidate(f'/project/v1/projects/{project_id}/milestones/{milestone_id}')
+        self._invalidate(f'/project/v1/projects/{project_id}/milestones', recursive=False)
 
         return dooray.DoorayObjects.DoorayResponse(resp.json())
 
@@ -637,6 +822,8 @@ class DoorayProject(DoorayBase):
         """
 
         resp = self._request('DELETE', f'/project/v1/projects/{project_id}/milestones/{milestone_id}')
+        self._invalidate(f'/project/v1/projects/{project_id}/milestones/{milestone_id}')
+        self._invalidate(f'/project/v1/projects/{project_id}/milestones', recursive=False)
 
         return dooray.DoorayObjects.DoorayResponse(resp.json())
 
@@ -700,6 +887,7 @@ class DoorayProject(DoorayBase):
         }
 
         resp = self._request('POST', f'/project/v1/projects/{project_id}/members', json=data)
+        self._invalidate(f'/project/v1/projects/{project_id}/members/{member_id}')
         # TODO result object is different from the API document
         # TODO if already exist member, do nothing. but the response is the same as payload
 
@@ -717,7 +905,7 @@ class DoorayProject(DoorayBase):
         :type member_id: str
         :return: :class:`dooray.DoorayObjects.DoorayResponse` of :class:`dooray.Project.ProjectMember`
         """
-        resp = self._request('GET', f'/project/v1/projects/{project_id}/members/{member_id}')
+        resp = self._request('GET', f'/project/v1/projects/{project_id}/members/{member_id}', name='get_member')
 
         return dooray.DoorayObjects.DoorayResponse(resp.json(), dooray.Project.ProjectMember)
 
@@ -744,7 +932,12 @@ class DoorayProject(DoorayBase):
         if size is not None:
             params['size'] = size
 
-        resp = self._request('GET', f'/project/v1/projects/{project_id}/member-groups', params=params)
+        resp = self._request(
+            'GET',
+            f'/project/v1/projects/{project_id}/member-groups',
+            params=params,
+            name='get_member_groups'
+        )
         # TODO result returns list of lists. looks like an error
 
         return dooray.DoorayObjects.DoorayListResponse(resp.json(), dooray.Project.MemberGroup, page=page, size=size)
@@ -762,7 +955,11 @@ class DoorayProject(DoorayBase):
         :return: :class:`dooray.DoorayObjects.DoorayResponse` of :class:`dooray.Project.MemberGroup`
         """
 
-        resp = self._request('GET', f'/project/v1/projects/{project_id}/member-groups/{member_group_id}')
+        resp = self._request(
+            'GET',
+            f'/project/v1/projects/{project_id}/member-groups/{member_group_id}',
+            name='get_member_group'
+        )
 
         return dooray.DoorayObjects.DoorayResponse(resp.json(), dooray.Project.MemberGroup)
 
@@ -779,7 +976,13 @@ class DoorayProject(DoorayBase):
         :return: :class:`dooray.DoorayObjects.DoorayResponse` of :class:`dooray.DoorayObjects.Relation`
         """
         # TODO html support for 'body' and 'guide'
-        resp = self._request('POST', f'/project/v1/projects/{project_id}/templates', json=template.to_json_dict())
+        resp = self._request(
+            'POST',
+            f'/project/v1/projects/{project_id}/templates',
+            data=template.to_json_bytes(),
+            headers={'Content-Type': 'application/json'}
+        )
+        self._invalidate(f'/project/v1/projects/{project_id}/templates', recursive=False)
 
         return dooray.DoorayObjects.DoorayResponse(resp.json(), dooray.DoorayObjects.Relation)
 
@@ -804,9 +1007,11 @@ class DoorayProject(DoorayBase):
         if size is not None:
             params['size'] = size
 
-        resp = self._request('GET', f'/project/v1/projects/{project_id}/templates', params=params)
+        resp = self._request('GET', f'/project/v1/projects/{project_id}/templates', params=params, name='get_templates')
 
-        return dooray.DoorayObjects.DoorayListResponse(resp.json(), dooray.Project.ReadTemplate, page=page, size=size)
+        return dooray.DoorayObjects.DoorayListResponse(
+            resp.json(), dooray.Project.ReadTemplate, page=page, size=size, interner=self._response_interner()
+        )
 
     def get_template(self, project_id, template_id, interpolation=False):
         """
@@ -826,9 +1031,16 @@ class DoorayProject(DoorayBase):
         if interpolation:
             params['interpolation'] = 'true'
 
-        resp = self._request('GET', f'/project/v1/projects/{project_id}/templates/{template_id}', params=params)
+        resp = self._request(
+            'GET',
+            f'/project/v1/projects/{project_id}/templates/{template_id}',
+            params=params,
+            name='get_template'
+        )
 
-        return dooray.DoorayObjects.DoorayResponse(resp.json(), dooray.Project.ReadTemplate)
+        return dooray.DoorayObjects.DoorayResponse(
+            resp.json(), dooray.Project.ReadTemplate, interner=self._response_interner()
+        )
 
     def update_template(self, project_id, template_id, template):
         """
@@ -847,8 +1059,12 @@ class DoorayProject(DoorayBase):
         resp = self._request(
             'PUT',
             f'/project/v1/projects/{project_id}/templates/{template_id}',
-            json=template.to_json_dict()
+            data=template.to_json_bytes(),
+            headers={'Content-Type': 'application/json'}
         )
+        self._invalidate(f'/project/v1/projects/{project_id}/templates/{template_id}')
+        self._invalidate(f'/project/v1/projects/{project_id}/templates', recursive=False)
+        self.templates.invalidate(project_id, template_id)
 
         return dooray.DoorayObjects.DoorayResponse(resp.json())
 
@@ -865,6 +1081,9 @@ class DoorayProject(DoorayBase):
         :return: :class:`dooray.DoorayObjects.DoorayResponse`
         """
         resp = self._request('DELETE', f'/project/v1/projects/{project_id}/templates/{template_id}')
+        self._invalidate(f'/project/v1/projects/{project_id}/templates/{template_id}')
+        self._invalidate(f'/project/v1/projects/{project_id}/templates', recursive=False)
+        self.templates.invalidate(project_id, template_id)
 
         return dooray.DoorayObjects.DoorayResponse(resp.json())
 
@@ -880,7 +1099,13 @@ class DoorayProject(DoorayBase):
         :param post: The post object to be written. See :class:`dooray.PostBuilder` for more details.
         :return: :class:`dooray.DoorayObjects.DoorayResponse` of :class:`dooray.DoorayObjects.Relation`
         """
-        resp = self._request('POST', f'/project/v1/projects/{project_id}/posts', json=post.to_json_dict())
+        resp = self._request(
+            'POST',
+            f'/project/v1/projects/{project_id}/posts',
+            data=post.to_json_bytes(),
+            headers={'Content-Type': 'application/json'}
+        )
+        self._invalidate(f'/project/v1/projects/{project_id}/posts', recursive=False)
         # TODO 'parentPostId' seems not working correctly
         # TODO html support for 'body'
 
@@ -900,7 +1125,8 @@ class DoorayProject(DoorayBase):
                   created_at=None,
                   updated_at=None,
                   due_at=None,
-                  order=None
+                  order=None,
+                  with_body=True
                   ):
         """
         Get posts of a project which match the given criteria.
@@ -940,6 +1166,9 @@ class DoorayProject(DoorayBase):
         :param order: Sort order of the returned posts. Possible values are 'postDueAt', 'postUpdatedAt', 'createdAt',\
             '-postDueAt', '-postUpdatedAt' and '-createdAt'. '-' means reverse order. Default is None.
         :type order: str
+        :param with_body: If false, the body of the posts is not kept and `body` of each post is None. \
+            Use it to scan many posts without holding their contents. Default is True.
+        :type with_body: bool
         :return: :class:`dooray.DoorayObjects.DoorayListResponse` of :class:`dooray.Project.ReadPost`
         :date format: Possible values are as follows:
 
@@ -984,9 +1213,12 @@ class DoorayProject(DoorayBase):
         if order is not None:
             params['order'] = order
 
-        resp = self._request('GET', f'/project/v1/projects/{project_id}/posts', params=params)
+        resp = self._request('GET', f'/project/v1/projects/{project_id}/posts', params=params, name='get_posts')
+        data = resp.json() if with_body else DoorayProject._drop_bodies(resp.json())
 
-        return dooray.DoorayObjects.DoorayListResponse(resp.json(), dooray.Project.ReadPost, page=page, size=size)
+        return dooray.DoorayObjects.DoorayListResponse(
+            data, dooray.Project.ReadPost, page=page, size=size, interner=self._response_interner()
+        )
 
     def get_post(self, project_id, post_id):
         """
@@ -1001,9 +1233,11 @@ class DoorayProject(DoorayBase):
         :return: :class:`dooray.DoorayObjects.DoorayResponse` of :class:`dooray.Project.ReadPost`
         """
 
-        resp = self._request('GET', f'/project/v1/projects/{project_id}/posts/{post_id}')
+        resp = self._request('GET', f'/project/v1/projects/{project_id}/posts/{post_id}', name='get_post')
 
-        return dooray.DoorayObjects.DoorayResponse(resp.json(), dooray.Project.ReadPost)
+        return dooray.DoorayObjects.DoorayResponse(
+            resp.json(), dooray.Project.ReadPost, interner=self._response_interner()
+        )
 
     def update_post(self, project_id, post_id, post):
         """
@@ -1020,11 +1254,24 @@ class DoorayProject(DoorayBase):
         """
         # TODO 'parentPostId' seems not working correctly
         # TODO html support for 'body'
-        resp = self._request('PUT', f'/project/v1/projects/{project_id}/posts/{post_id}', json=post.to_json_dict())
+        resp = self._request(
+            'PUT',
+            f'/project/v1/projects/{project_id}/posts/{post_id}',
+            data=post.to_json_bytes(),
+            headers={'Content-Type': 'application/json'}
+        )
+        self._invalidate_post(project_id, post_id)
 
         return dooray.DoorayObjects.DoorayResponse(resp.json())
 
-    def set_post_workflow_for_member(self, project_id, post_id, member_id, workflow_id):
+    def _workflow_id(self, project_id, workflow_id, workflow):
+        if (workflow_id is None) == (workflow is None):
+            raise ValueError('Either workflow_id or workflow is required')
+        if workflow is not None:
+            return self.workflows.resolve(project_id, workflow).id
+        return workflow_id
+
+    def set_post_workflow_for_member(self, project_id, post_id, member_id, workflow_id=None, workflow=None):
         """
         Set a workflow of a post for a member.
 
@@ -1038,16 +1285,20 @@ class DoorayProject(DoorayBase):
         :type member_id: str
         :param workflow_id: Workflow ID.
         :type workflow_id: str
+        :param workflow: Workflow name, localized name or class, instead of `workflow_id`. \
+            Resolved with :attr:`workflows`. ValueError is raised if no workflow matches.
+        :type workflow: str
         :return: :class:`dooray.DoorayObjects.DoorayResponse`
         """
         data = {
-            'workflowId': workflow_id
+            'workflowId': self._workflow_id(project_id, workflow_id, workflow)
         }
         resp = self._request('PUT', f'/project/v1/projects/{project_id}/posts/{post_id}/to/{member_id}', json=data)
+        self._invalidate_post(project_id, post_id)
 
         return dooray.DoorayObjects.DoorayResponse(resp.json())
 
-    def set_post_workflow(self, project_id, post_id, workflow_id):
+    def set_post_workflow(self, project_id, post_id, workflow_id=None, workflow=None):
         """
         Set a workflow of a post.
 
@@ -1059,12 +1310,16 @@ class DoorayProject(DoorayBase):
         :type post_id: str
         :param workflow_id: Workflow ID.
         :type workflow_id: str
+        :param workflow: Workflow name, localized name or class, e.g. 'Done', instead of `workflow_id`. \
+            Resolved with :attr:`workflows`. ValueError is raised if no workflow matches.
+        :type workflow: str
         :return: :class:`dooray.DoorayObjects.DoorayResponse`
         """
         data = {
-            'workflowId': workflow_id
+            'workflowId': self._workflow_id(project_id, workflow_id, workflow)
         }
         resp = self._request('POST', f'/project/v1/projects/{project_id}/posts/{post_id}/set-workflow', json=data)
+        self._invalidate_post(project_id, post_id)
 
         return dooray.DoorayObjects.DoorayResponse(resp.json())
 
@@ -1082,6 +1337,7 @@ class DoorayProject(DoorayBase):
         """
 
         resp = self._request('POST', f'/project/v1/projects/{project_id}/posts/{post_id}/set-done')
+        self._invalidate_post(project_id, post_id)
 
         return dooray.DoorayObjects.DoorayResponse(resp.json())
 
@@ -1109,11 +1365,12 @@ class DoorayProject(DoorayBase):
             }
         }
         resp = self._request('POST', f'/project/v1/projects/{project_id}/posts/{post_id}/logs', json=data)
+        self._invalidate(f'/project/v1/projects/{project_id}/posts/{post_id}/logs', recursive=False)
         # TODO html support for 'body'
 
         return dooray.DoorayObjects.DoorayResponse(resp.json(), dooray.DoorayObjects.Relation)
 
-    def get_post_logs(self, project_id, post_id, page=None, size=None, order=None):
+    def get_post_logs(self, project_id, post_id, page=None, size=None, order=None, with_body=True):
         """
         Get logs of a post.
 
@@ -1129,6 +1386,9 @@ class DoorayProject(DoorayBase):
         :type size: int
         :param order: Order of logs. Possible values are 'createdAt' and '-createdAt'. Default is None.
         :type order: str
+        :param with_body: If false, the body of the logs is not kept and `body` of each log is None. \
+            Use it to scan the logs of a long thread without holding their contents. Default is True.
+        :type with_body: bool
         :return: :class:`dooray.DoorayObjects.DoorayListResponse` of :class:`dooray.Project.PostLog`
         """
         params = {}
@@ -1139,9 +1399,17 @@ class DoorayProject(DoorayBase):
         if order is not None:
             params['order'] = order
 
-        resp = self._request('GET', f'/project/v1/projects/{project_id}/posts/{post_id}/logs', params=params)
+        resp = self._request(
+            'GET',
+            f'/project/v1/projects/{project_id}/posts/{post_id}/logs',
+            params=params,
+            name='get_post_logs'
+        )
+        data = resp.json() if with_body else DoorayProject._drop_bodies(resp.json())
 
-        return dooray.DoorayObjects.DoorayListResponse(resp.json(), dooray.Project.PostLog, page=page, size=size)
+        return dooray.DoorayObjects.DoorayListResponse(
+            data, dooray.Project.PostLog, page=page, size=size, interner=self._response_interner()
+        )
 
     def get_post_log(self, project_id, post_id, log_id):
         """
@@ -1157,9 +1425,15 @@ class DoorayProject(DoorayBase):
         :type log_id: str
         :return: :class:`dooray.DoorayObjects.DoorayResponse` of :class:`dooray.Project.PostLog`
         """
-        resp = self._request('GET', f'/project/v1/projects/{project_id}/posts/{post_id}/logs/{log_id}')
+        resp = self._request(
+            'GET',
+            f'/project/v1/projects/{project_id}/posts/{post_id}/logs/{log_id}',
+            name='get_post_log'
+        )
 
-        return dooray.DoorayObjects.DoorayResponse(resp.json(), dooray.Project.PostLog)
+        return dooray.DoorayObjects.DoorayResponse(
+            resp.json(), dooray.Project.PostLog, interner=self._response_interner()
+        )
 
     def update_post_log(self, project_id, post_id, log_id, content):
         """
@@ -1185,6 +1459,8 @@ class DoorayProject(DoorayBase):
         }
         # TODO html support for 'body'
         resp = self._request('PUT', f'/project/v1/projects/{project_id}/posts/{post_id}/logs/{log_id}', json=data)
+        self._invalidate(f'/project/v1/projects/{project_id}/posts/{post_id}/logs/{log_id}')
+        self._invalidate(f'/project/v1/projects/{project_id}/posts/{post_id}/logs', recursive=False)
 
         return dooray.DoorayObjects.DoorayResponse(resp.json())
 
@@ -1203,5 +1479,7 @@ class DoorayProject(DoorayBase):
         :return: :class:`dooray.DoorayObjects.DoorayResponse`
         """
         resp = self._request('DELETE', f'/project/v1/projects/{project_id}/posts/{post_id}/logs/{log_id}')
+        self._invalidate(f'/project/v1/projects/{project_id}/posts/{post_id}/logs/{log_id}')
+        self._invalidate(f'/project/v1/projects/{project_id}/posts/{post_id}/logs', recursive=False)
 
         return dooray.DoorayObjects.DoorayResponse(resp.json())
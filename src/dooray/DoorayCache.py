@@ -0,0 +1,746 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_TTLS = {
+    'get': 300,
+    'get_workflows': 300,
+    'get_tag': 300,
+    'get_milestone': 60,
+    'get_template': 60,
+    'get_member': 60,
+    'get_incoming_hook': 300,
+}
+"""
+Default time-to-live in seconds of the cached responses, by the name of the API method.
+Responses of the other methods are not cached unless a TTL is given for them.
+"""
+
+
+class ResponseCache:
+    """
+    In-process cache of GET responses, with per-method TTLs and LRU eviction.
+
+    Responses are keyed by the HTTP method, the path and the query parameters, and by the endpoint and
+    a hash of the token of the client, so that clients with different tokens can share one cache.
+    Pass the cache to :class:`dooray.Dooray` to share it among all the APIs.
+
+    If the server sends `ETag` or `Last-Modified` headers, an expired response is kept and revalidated
+    with a conditional request. On `304 Not Modified` it is served from the cache again,
+    and the bytes and time saved are recorded. Responses without validators simply expire.
+
+    With `negative_ttl`, "not found" responses of GET requests and "not creatable" results of
+    :meth:`dooray.DoorayProject.is_creatable` are cached too, apart from the other responses.
+
+    Usage::
+
+        import dooray
+
+        cache = dooray.ResponseCache(max_entries=1000, ttls={'get_workflows': 600, 'get_posts': 10})
+        d = dooray.Dooray(API_TOKEN, cache=cache)
+        d.project.get_workflows(PROJECT_ID)   # calls the API
+        d.project.get_workflows(PROJECT_ID)   # served from the cache
+        print(cache.stats())
+    """
+
+    def __init__(
+        self,
+        ttls=None,
+        default_ttl=0,
+        max_entries=1024,
+        max_bytes=None,
+        negative_ttl=0,
+        max_negative_entries=1024,
+        clock=time.monotonic,
+    ):
+        """
+        :param ttls: Time-to-live in seconds by the name of the API method, e.g. `{'get_workflows': 600}`. \
+            Merged into :data:`dooray.DoorayCache.DEFAULT_TTLS`. A TTL of 0 disables caching for the method.
+        :type ttls: dict, optional
+        :param default_ttl: Time-to-live in seconds of the methods not in `ttls`. Defaults to 0, which means \
+            they are not cached
+        :type default_ttl: int or float, optional
+        :param max_entries: Maximum number of cached responses. Defaults to 1024
+        :type max_entries: int, optional
+        :param max_bytes: Maximum total size of the cached response bodies. Defaults to None, which means no limit
+        :type max_bytes: int, optional
+        :param negative_ttl: Time-to-live in seconds of the "not found" and "not creatable" results. \
+            Defaults to 0, which means they are not cached
+        :type negative_ttl: int or float, optional
+        :param max_negative_entries: Maximum number of the "not found" and "not creatable" results. Defaults to 1024
+        :type max_negative_entries: int, optional
+        :param clock: Function returning the current time in seconds. Defaults to :func:`time.monotonic`
+        :type clock: callable, optional
+        """
+        if ttls is not None and not isinstance(ttls, dict):
+            raise TypeError(ttls)
+        if not isinstance(default_ttl, (int, float)):
+            raise TypeError(default_ttl)
+        if not isinstance(max_entries, int):
+            raise TypeError(max_entries)
+        if max_bytes is not None and not isinstance(max_bytes, int):
+            raise TypeError(max_bytes)
+        if not isinstance(negative_ttl, (int, float)):
+            raise TypeError(negative_ttl)
+        if not isinstance(max_negative_entries, int):
+            raise TypeError(max_negative_entries)
+
+        self._ttls = dict(DEFAULT_TTLS)
+        if ttls is not None:
+            self._ttls.update(ttls)
+        self._default_ttl = default_ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._clock = clock
+
+        # key -> _Entry
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.negative_ttl = negative_ttl
+        """
+        Time-to-live in seconds of the "not found" and "not creatable" results. 0 if they are not cached.
+
+        :type: int or float
+        """
+        self._max_negative_entries = max_negative_entries
+        # key -> (value, expires_at)
+        self._negatives = OrderedDict()
+
+        self.hits = 0
+        """
+        Number of requests served from the cache.
+
+        :type: int
+        """
+        self.misses = 0
+        """
+        Number of cacheable requests sent to the server.
+
+        :type: int
+        """
+        self.evictions = 0
+        """
+        Number of responses evicted to stay within `max_entries` and `max_bytes`.
+
+        :type: int
+        """
+        self.not_modified = 0
+        """
+        Number of expired responses revalidated by `304 Not Modified`.
+
+        :type: int
+        """
+        self.bytes_saved = 0
+        """
+        Total size of the response bodies not downloaded again thanks to revalidation.
+
+        :type: int
+        """
+        self.seconds_saved = 0.0
+        """
+        Estimated time saved by revalidation, compared to the time taken to download the responses first.
+
+        :type: float
+        """
+        self.negative_hits = 0
+        """
+        Number of "not found" and "not creatable" results served from the cache.
+
+        :type: int
+        """
+
+    @staticmethod
+    def make_key(method, url, params=None, scope=None):
+        """
+        Returns the cache key of a request.
+
+        :param method: HTTP method
+        :type method: str
+        :param url: Path of the request
+        :type url: str
+        :param params: Query parameters
+        :type params: dict, optional
+        :param scope: Keeps the responses of different clients apart in a shared cache. \
+            See :meth:`make_scope`. Defaults to None
+        :type scope: str, optional
+        :return: str
+        """
+        key = f'{method} {url}'
+        if params:
+            key += '?' + urllib.parse.urlencode(sorted(params.items()), doseq=True)
+        if scope is not None:
+            key += '#' + scope
+        return key
+
+    @staticmethod
+    def make_scope(endpoint, token):
+        """
+        Returns the scope of the cache keys of a client, from its endpoint and a hash of its token.
+
+        :param endpoint: API endpoint
+        :type endpoint: str
+        :param token: API token
+        :type token: str
+        :return: str
+        """
+        digest = hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]
+        return f'{endpoint} {digest}'
+
+    @staticmethod
+    def _path_of(key):
+        return key.split('#', 1)[0].split(' ', 1)[1].split('?', 1)[0]
+
+    def ttl_for(self, name):
+        """
+        Returns the time-to-live of the responses of an API method.
+
+        :param name: Name of the API method, e.g. 'get_workflows'
+        :type name: str
+        :return: TTL in seconds. 0 if the responses are not cached.
+        """
+        return self._ttls.get(name, self._default_ttl)
+
+    def get(self, key):
+        """
+        Returns the cached response, or None if it is not cached or has expired.
+
+        :param key: Cache key. See :meth:`make_key`
+        :type key: str
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= self._clock():
+                # Keep it for revalidation, if possible
+                if entry.etag is None and entry.last_modified is None:
+                    self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.response
+
+    def conditional_headers(self, key):
+        """
+        Returns the headers to revalidate an expired response, or an empty dict if it cannot be revalidated.
+
+        :param key: Cache key. See :meth:`make_key`
+        :type key: str
+        :return: dict of `If-None-Match` and `If-Modified-Since` headers
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        headers = {}
+        if entry is not None:
+            if entry.etag is not None:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified is not None:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def revalidated(self, key, ttl, elapsed=0.0):
+        """
+        Renew the response revalidated by `304 Not Modified`, and returns it.
+
+        :param key: Cache key. See :meth:`make_key`
+        :type key: str
+        :param ttl: Time-to-live in seconds
+        :type ttl: int or float
+        :param elapsed: Time taken by the conditional request in seconds
+        :type elapsed: float
+        :return: The cached response, or None if it has been evicted in the meantime
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.expires_at = self._clock() + ttl
+            self._entries.move_to_end(key)
+            self.not_modified += 1
+            self.bytes_saved += entry.size
+            self.seconds_saved += max(0.0, entry.elapsed - elapsed)
+            return entry.response
+
+    def set(self, key, response, ttl, elapsed=0.0):
+        """
+        Store a response.
+
+        :param key: Cache key. See :meth:`make_key`
+        :type key: str
+        :param response: The response
+        :type response: :class:`requests.Response`
+        :param ttl: Time-to-live in seconds
+        :type ttl: int or float
+        :param elapsed: Time taken by the request in seconds
+        :type elapsed: float
+        """
+        entry = _Entry(response, self._clock() + ttl, elapsed)
+        if self._max_bytes is not None and entry.size > self._max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while len(self._entries) > self._max_entries or \
+                    (self._max_bytes is not None and self._bytes > self._max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def get_negative(self, key):
+        """
+        Returns the cached "not found" or "not creatable" result, or None.
+
+        :param key: Cache key. See :meth:`make_key`
+        :type key: str
+        """
+        with self._lock:
+            entry = self._negatives.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= self._clock():
+                del self._negatives[key]
+                return None
+            self._negatives.move_to_end(key)
+            self.negative_hits += 1
+            return entry[0]
+
+    def set_negative(self, key, value):
+        """
+        Store a "not found" or "not creatable" result for `negative_ttl` seconds. Nothing is stored if it is 0.
+
+        :param key: Cache key. See :meth:`make_key`
+        :type key: str
+        :param value: The result, e.g. the "not found" response
+        """
+        if self.negative_ttl <= 0:
+            return
+        with self._lock:
+            self._negatives.pop(key, None)
+            self._negatives[key] = (value, self._clock() + self.negative_ttl)
+            while len(self._negatives) > self._max_negative_entries:
+                self._negatives.popitem(last=False)
+
+    def _invalidate_negatives(self, path, recursive):
+        prefix = path + '/'
+        with self._lock:
+            keys = []
+            for key in self._negatives:
+                url = ResponseCache._path_of(key)
+                if url == path or (recursive and url.startswith(prefix)):
+                    keys.append(key)
+            for key in keys:
+                del self._negatives[key]
+            return len(keys)
+
+    def invalidate(self, path, recursive=True):
+        """
+        Remove the cached responses of a path, whatever their query parameters.
+
+        :param path: Path of the requests, e.g. '/project/v1/projects/{project-id}/posts/{post-id}'
+        :type path: str
+        :param recursive: Also remove the responses of the paths under `path`. Defaults to True
+        :type recursive: bool, optional
+        :return: Number of the removed responses
+        """
+        prefix = path + '/'
+        with self._lock:
+            keys = []
+            for key in self._entries:
+                url = ResponseCache._path_of(key)
+                if url == path or (recursive and url.startswith(prefix)):
+                    keys.append(key)
+            for key in keys:
+                self._remove(key)
+        return len(keys) + self._invalidate_negatives(path, recursive)
+
+    def clear(self):
+        """
+        Remove all the cached responses.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._negatives.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Returns the counters of the cache.
+
+        :return: dict with 'hits', 'misses', 'evictions', 'not_modified', 'bytes_saved', 'seconds_saved', \
+            'negative_hits', 'entries', 'negative_entries' and 'bytes'
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'not_modified': self.not_modified,
+                'bytes_saved': self.bytes_saved,
+                'seconds_saved': self.seconds_saved,
+                'negative_hits': self.negative_hits,
+                'entries': len(self._entries),
+                'negative_entries': len(self._negatives),
+                'bytes': self._bytes,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _Entry:
+    def __init__(self, response, expires_at, elapsed):
+        self.response = response
+        self.expires_at = expires_at
+        self.elapsed = elapsed
+        self.size = len(response.content)
+        self.etag = response.headers.get('ETag')
+        self.last_modified = response.headers.get('Last-Modified')
+
+
+def _default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'pydooray')
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    Persistent cache of GET responses in a SQLite database, shared by the processes using the same file.
+
+    It works like :class:`ResponseCache`, so that short-lived processes start with the responses cached by the
+    previous ones. The database is in WAL mode, and writers wait up to `busy_timeout` seconds for each other.
+    The least recently used responses are removed beyond `max_entries` and `max_bytes`.
+    Use :meth:`compact` to remove the expired responses and shrink the file.
+
+    The cached responses are readable by anyone who can read the file.
+    Use one file per API token, as the responses depend on the permissions of the token.
+    The counters of :meth:`stats` and the "not found" results are of this process only.
+
+    Usage::
+
+        import dooray
+
+        cache = dooray.SQLiteResponseCache('/var/cache/my-tool/dooray.sqlite3', max_bytes=50 * 1024 * 1024)
+        d = dooray.Dooray(API_TOKEN, cache=cache)
+    """
+
+    def __init__(
+        self,
+        path=None,
+        ttls=None,
+        default_ttl=0,
+        max_entries=10000,
+        max_bytes=None,
+        negative_ttl=0,
+        max_negative_entries=1024,
+        busy_timeout=5.0,
+        clock=time.time,
+    ):
+        """
+        :param path: Path of the database file. Defaults to `responses.sqlite3` in `$XDG_CACHE_HOME/pydooray`, \
+            or `~/.cache/pydooray`. The directory is created if it does not exist.
+        :type path: str, optional
+        :param ttls: See :class:`ResponseCache`
+        :type ttls: dict, optional
+        :param default_ttl: See :class:`ResponseCache`
+        :type default_ttl: int or float, optional
+        :param max_entries: Maximum number of cached responses. Defaults to 10000
+        :type max_entries: int, optional
+        :param max_bytes: Maximum total size of the cached response bodies. Defaults to None, which means no limit
+        :type max_bytes: int, optional
+        :param negative_ttl: See :class:`ResponseCache`
+        :type negative_ttl: int or float, optional
+        :param max_negative_entries: See :class:`ResponseCache`
+        :type max_negative_entries: int, optional
+        :param busy_timeout: Time in seconds to wait for the other processes writing to the database. Defaults to 5
+        :type busy_timeout: int or float, optional
+        :param clock: Function returning the current time in seconds. It must be the same in all the processes. \
+            Defaults to :func:`time.time`
+        :type clock: callable, optional
+        """
+        super().__init__(
+            ttls=ttls,
+            default_ttl=default_ttl,
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            negative_ttl=negative_ttl,
+            max_negative_entries=max_negative_entries,
+            clock=clock,
+        )
+        if path is not None and not isinstance(path, (str, os.PathLike)):
+            raise TypeError(path)
+        if not isinstance(busy_timeout, (int, float)):
+            raise TypeError(busy_timeout)
+
+        if path is None:
+            path = os.path.join(_default_cache_dir(), 'responses.sqlite3')
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+        self.path = path
+        """
+        Path of the database file.
+
+        :type: str
+        """
+        self._busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections = []
+
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, path TEXT NOT NULL, status INTEGER NOT NULL, url TEXT, headers TEXT NOT NULL, '
+            'encoding TEXT, content BLOB NOT NULL, size INTEGER NOT NULL, elapsed REAL NOT NULL, '
+            'etag TEXT, last_modified TEXT, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS responses_path ON responses (path)')
+        conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+
+    def _connection(self):
+        # One connection per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self._busy_timeout, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @staticmethod
+    def _response(row):
+        status, url, headers, encoding, content = row
+        resp = requests.Response()
+        resp.status_code = status
+        resp.url = url
+        resp.headers = CaseInsensitiveDict(json.loads(headers))
+        resp.encoding = encoding
+        resp._content = content
+        return resp
+
+    def get(self, key):
+        conn = self._connection()
+        row = conn.execute(
+            'SELECT status, url, headers, encoding, content, expires_at, etag, last_modified '
+            'FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+        now = self._clock()
+        if row is not None and row[5] <= now:
+            # Keep it for revalidation, if possible
+            if row[6] is None and row[7] is None:
+                conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            row = None
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+        with self._lock:
+            self.hits += 1
+        return SQLiteResponseCache._response(row[:5])
+
+    def conditional_headers(self, key):
+        row = self._connection().execute(
+            'SELECT etag, last_modified FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+        headers = {}
+        if row is not None:
+            if row[0] is not None:
+                headers['If-None-Match'] = row[0]
+            if row[1] is not None:
+                headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def revalidated(self, key, ttl, elapsed=0.0):
+        conn = self._connection()
+        now = self._clock()
+        conn.execute(
+            'UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?', (now + ttl, now, key)
+        )
+        row = conn.execute(
+            'SELECT status, url, headers, encoding, content, size, elapsed FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        with self._lock:
+            self.not_modified += 1
+            self.bytes_saved += row[5]
+            self.seconds_saved += max(0.0, row[6] - elapsed)
+        return SQLiteResponseCache._response(row[:5])
+
+    def set(self, key, response, ttl, elapsed=0.0):
+        content = response.content
+        size = len(content)
+        if self._max_bytes is not None and size > self._max_bytes:
+            return
+        now = self._clock()
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    key, ResponseCache._path_of(key), response.status_code, response.url,
+                    json.dumps(dict(response.headers)), response.encoding, content, size, elapsed,
+                    response.headers.get('ETag'), response.headers.get('Last-Modified'), now + ttl, now,
+                )
+            )
+            self._evict(conn)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _evict(self, conn):
+        count, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        if count <= self._max_entries and (self._max_bytes is None or total <= self._max_bytes):
+            return
+        keys = []
+        for key, size in conn.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+            if count <= self._max_entries and (self._max_bytes is None or total <= self._max_bytes):
+                break
+            keys.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany('DELETE FROM responses WHERE key = ?', keys)
+        with self._lock:
+            self.evictions += len(keys)
+
+    def invalidate(self, path, recursive=True):
+        prefix = path + '/'
+        cursor = self._connection().execute(
+            'DELETE FROM responses WHERE path = ? OR (? AND substr(path, 1, ?) = ?)',
+            (path, recursive, len(prefix), prefix)
+        )
+        return cursor.rowcount + self._invalidate_negatives(path, recursive)
+
+    def clear(self):
+        self._connection().execute('DELETE FROM responses')
+        with self._lock:
+            self._negatives.clear()
+
+    def compact(self):
+        """
+        Remove the expired responses which cannot be revalidated, and shrink the database file.
+
+        :return: Number of the removed responses
+        """
+        conn = self._connection()
+        cursor = conn.execute(
+            'DELETE FROM responses WHERE expires_at <= ? AND etag IS NULL AND last_modified IS NULL',
+            (self._clock(),)
+        )
+        conn.execute('VACUUM')
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        return cursor.rowcount
+
+    def stats(self):
+        count, total = self._connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+        ).fetchone()
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'not_modified': self.not_modified,
+                'bytes_saved': self.bytes_saved,
+                'seconds_saved': self.seconds_saved,
+                'negative_hits': self.negative_hits,
+                'entries': count,
+                'negative_entries': len(self._negatives),
+                'bytes': total,
+            }
+
+    def close(self):
+        """
+        Close the connections to the database.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+
+class SingleFlight:
+    """
+    Coalesces identical requests in flight, so that concurrent callers share one HTTP call.
+
+    The first caller of a key runs the request, and the others wait for it and get the same response,
+    or the same exception. Enable it with `singleflight=True` of :class:`dooray.Dooray`.
+    """
+
+    def __init__(self):
+        # key -> _Flight
+        self._flights = {}
+        self._lock = threading.Lock()
+
+        self.shared = 0
+        """
+        Number of requests which shared the call of another one.
+
+        :type: int
+        """
+
+    def do(self, key, fn):
+        """
+        Call `fn`, unless a call with the same key is in flight, and returns its result.
+
+        :param key: Key of the request. See :meth:`ResponseCache.make_key`
+        :type key: str
+        :param fn: Function sending the request
+        :type fn: callable
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
@@ -0,0 +1,761 @@
+import datetime
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import dooray.Messenger
+import dooray.Project
+
+
+class WorkflowRegistry:
+    """
+    Per-project index of workflows, to resolve workflow names to ids without calling the API each time.
+
+    Workflows of a project are loaded once with :meth:`dooray.DoorayProject.get_workflows`,
+    and indexed by id, name, localized display name and workflow class.
+    They are loaded again after `ttl` seconds, or when a lookup misses.
+    Use the one of the client, :attr:`dooray.DoorayProject.workflows`.
+
+    Usage::
+
+        import dooray
+
+        d = dooray.Dooray(API_TOKEN)
+        workflow = d.project.workflows.resolve(PROJECT_ID, 'Done')
+        d.project.set_post_workflow(PROJECT_ID, POST_ID, workflow='Done')
+    """
+
+    def __init__(self, project, ttl=300, clock=time.monotonic):
+        """
+        :param project: Project API to load the workflows with
+        :type project: :class:`dooray.DoorayProject`
+        :param ttl: Time in seconds after which the workflows of a project are loaded again. Defaults to 300
+        :type ttl: int or float, optional
+        :param clock: Function returning the current time in seconds. Defaults to :func:`time.monotonic`
+        :type clock: callable, optional
+        """
+        if not isinstance(ttl, (int, float)):
+            raise TypeError(ttl)
+
+        self._project = project
+        self._ttl = ttl
+        self._clock = clock
+        # project_id -> _WorkflowIndex
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def _load(self, project_id):
+        workflows = self._project.get_workflows(project_id).result
+        index = _WorkflowIndex(workflows, self._clock() + self._ttl)
+        with self._lock:
+            self._indexes[project_id] = index
+        return index
+
+    def _index(self, project_id):
+        # Returns the index, and whether it has just been loaded
+        with self._lock:
+            index = self._indexes.get(project_id)
+        if index is None or index.expires_at <= self._clock():
+            return self._load(project_id), True
+        return index, False
+
+    def get_workflows(self, project_id):
+        """
+        Returns the workflows of a project.
+
+        :param project_id: Project ID
+        :type project_id: str
+        :return: list of :class:`dooray.Project.Workflow`
+        """
+        return list(self._index(project_id)[0].workflows)
+
+    def find(self, project_id, workflow):
+        """
+        Returns the workflow matching an id, a name, a localized name or a workflow class, or None.
+
+        Names are compared case-insensitively. If several workflows have the class, the first one in order is returned.
+        The workflows are loaded again once if nothing matches.
+
+        :param project_id: Project ID
+        :type project_id: str
+        :param workflow: Workflow ID, name, localized name or class, e.g. 'Done' or 'closed'
+        :type workflow: str
+        :return: :class:`dooray.Project.Workflow` or None
+        """
+        if not isinstance(workflow, str):
+            raise TypeError(workflow)
+
+        index, loaded = self._index(project_id)
+        found = index.find(workflow)
+        if found is None and not loaded:
+            # Skip the cached response, which may be as old as the index
+            self._project._invalidate(f'/project/v1/projects/{project_id}/workflows')
+            found = self._load(project_id).find(workflow)
+        return found
+
+    def resolve(self, project_id, workflow):
+        """
+        Same as :meth:`find`, but raises ValueError if nothing matches.
+
+        :param project_id: Project ID
+        :type project_id: str
+        :param workflow: Workflow ID, name, localized name or class
+        :type workflow: str
+        :return: :class:`dooray.Project.Workflow`
+        """
+        found = self.find(project_id, workflow)
+        if found is None:
+            raise ValueError(workflow)
+        return found
+
+    def invalidate(self, project_id=None):
+        """
+        Forget the workflows of a project, or of all the projects.
+
+        :param project_id: Project ID. Defaults to None, which means all the projects
+        :type project_id: str, optional
+        """
+        with self._lock:
+            if project_id is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(project_id, None)
+
+
+class _WorkflowIndex:
+    def __init__(self, workflows, expires_at):
+        self.workflows = workflows
+        self.expires_at = expires_at
+
+        self.by_id = {}
+        self.by_name = {}
+        self.by_display_name = {}
+        self.by_class = {}
+        for e in sorted(workflows, key=lambda e: (e.order is None, e.order or 0)):
+            self.by_id[e.id] = e
+            self.by_name.setdefault(e.name.casefold(), e)
+            for name in e.names:
+                self.by_display_name.setdefault(name.name.casefold(), e)
+            if e.workflow_class is not None:
+                self.by_class.setdefault(e.workflow_class, e)
+
+    def find(self, workflow):
+        name = workflow.casefold()
+        return self.by_id.get(workflow) or self.by_name.get(name) or self.by_display_name.get(name) \
+            or self.by_class.get(workflow)
+
+
+def _normalize_name(name):
+    return ' '.join(unicodedata.normalize('NFKC', name).casefold().split())
+
+
+class MemberDirectory:
+    """
+    In-memory index of members, to map ids, user codes, external emails and names to members
+    without calling :meth:`dooray.Dooray.get_members` each time.
+
+    Members are kept for `ttl` seconds, up to `max_size` members, evicting the least recently used ones.
+    Emails are looked up by batches of up to :attr:`BATCH_SIZE`, and can be prefetched in the background.
+    Use the one of the client, :attr:`dooray.Dooray.members`.
+
+    Usage::
+
+        import dooray
+
+        d = dooray.Dooray(API_TOKEN)
+        d.members.prefetch_emails(['a@example.com', 'b@example.com'])
+        member = d.members.find_by_email('a@example.com')
+        d.messenger.send_direct_message(member.id, 'Hello')
+        print(d.members.stats())
+    """
+
+    BATCH_SIZE = 100
+    """
+    Maximum number of emails looked up with one request. It is the maximum page size of the API.
+    """
+
+    def __init__(self, client, ttl=600, max_size=10000, clock=time.monotonic):
+        """
+        :param client: Client to look up the members with
+        :type client: :class:`dooray.Dooray`
+        :param ttl: Time-to-live in seconds of the members. Defaults to 600
+        :type ttl: int or float, optional
+        :param max_size: Maximum number of members. Defaults to 10000
+        :type max_size: int, optional
+        :param clock: Function returning the current time in seconds. Defaults to :func:`time.monotonic`
+        :type clock: callable, optional
+        """
+        if not isinstance(ttl, (int, float)):
+            raise TypeError(ttl)
+        if not isinstance(max_size, int):
+            raise TypeError(max_size)
+
+        self._client = client
+        self._ttl = ttl
+        self._max_size = max_size
+        self._clock = clock
+
+        # id -> (member, expires_at)
+        self._members = OrderedDict()
+        self._by_user_code = {}
+        self._by_email = {}
+        # normalized name -> (ids, expires_at), for the names whose members have all been looked up
+        self._names = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+        self.hits = 0
+        """
+        Number of lookups answered from the directory.
+
+        :type: int
+        """
+        self.misses = 0
+        """
+        Number of lookups sent to the API.
+
+        :type: int
+        """
+
+    def _put(self, member):
+        # Called with the lock held
+        if member.id in self._members:
+            self._remove(member.id)
+        self._members[member.id] = (member, self._clock() + self._ttl)
+        if member.user_code is not None:
+            self._by_user_code[member.user_code] = member.id
+        if member.external_email_address is not None:
+            self._by_email[member.external_email_address.casefold()] = member.id
+        while len(self._members) > self._max_size:
+            self._remove(next(iter(self._members)))
+
+    def _remove(self, member_id):
+        # Called with the lock held
+        member = self._members.pop(member_id)[0]
+        if member.user_code is not None and self._by_user_code.get(member.user_code) == member_id:
+            del self._by_user_code[member.user_code]
+        email = member.external_email_address.casefold() if member.external_email_address is not None else None
+        if email is not None and self._by_email.get(email) == member_id:
+            del self._by_email[email]
+
+    def _get(self, member_id, count=True):
+        # Called with the lock held
+        entry = self._members.get(member_id)
+        if entry is not None and entry[1] <= self._clock():
+            self._remove(member_id)
+            entry = None
+        if count:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if entry is None:
+            return None
+        self._members.move_to_end(member_id)
+        return entry[0]
+
+    def _fill(self, members):
+        with self._lock:
+            for member in members:
+                self._put(member)
+
+    def get(self, member_id):
+        """
+        Returns a member already in the directory, or None. The API cannot look up members by id.
+
+        :param member_id: Member ID
+        :type member_id: str
+        :return: :class:`dooray.Member.Member` or None
+        """
+        with self._lock:
+            return self._get(member_id)
+
+    def find_by_user_code(self, user_code):
+        """
+        Returns the member of a user code, or None.
+
+        :param user_code: User code of the member, exact match
+        :type user_code: str
+        :return: :class:`dooray.Member.Member` or None
+        """
+        if not isinstance(user_code, str):
+            raise TypeError(user_code)
+
+        with self._lock:
+            member_id = self._by_user_code.get(user_code)
+            member = self._get(member_id) if member_id is not None else None
+            if member_id is None:
+                self.misses += 1
+        if member is not None:
+            return member
+
+        members = self._client.get_members(user_code_exact=user_code).result
+        self._fill(members)
+        return next((e for e in members if e.user_code == user_code), None)
+
+    def find_by_email(self, email):
+        """
+        Returns the member of an external email address, or None.
+
+        :param email: External email address of the member, case-insensitive
+        :type email: str
+        :return: :class:`dooray.Member.Member` or None
+        """
+        return self.find_by_emails([email]).get(email)
+
+    def find_by_emails(self, emails):
+        """
+        Returns the members of external email addresses. The missing ones are looked up by batches.
+
+        :param emails: External email addresses of the members, case-insensitive
+        :type emails: list of str
+        :return: dict of email -> :class:`dooray.Member.Member`, without the emails of no member
+        """
+        if not isinstance(emails, (list, tuple, set)):
+            raise TypeError(emails)
+
+        found = {}
+        missing = []
+        with self._lock:
+            for email in emails:
+                member_id = self._by_email.get(email.casefold())
+                member = self._get(member_id) if member_id is not None else None
+                if member is not None:
+                    found[email] = member
+                else:
+                    if member_id is None:
+                        self.misses += 1
+                    missing.append(email)
+
+        for i in range(0, len(missing), MemberDirectory.BATCH_SIZE):
+            batch = missing[i:i + MemberDirectory.BATCH_SIZE]
+            members = self._client.get_members(external_emails=batch, size=MemberDirectory.BATCH_SIZE).result
+            self._fill(members)
+            by_email = {
+                e.external_email_address.casefold(): e for e in members if e.external_email_address is not None
+            }
+            for email in batch:
+                if email.casefold() in by_email:
+                    found[email] = by_email[email.casefold()]
+        return found
+
+    def find_by_name(self, name):
+        """
+        Returns the members of a name.
+
+        Names are compared after Unicode normalization, case folding and whitespace collapsing.
+        All the members of the name are looked up, by pages, and are returned from the directory
+        until the first of them expires. Members found by other lookups do not answer this one.
+
+        :param name: Name of the members
+        :type name: str
+        :return: list of :class:`dooray.Member.Member`
+        """
+        if not isinstance(name, str):
+            raise TypeError(name)
+
+        key = _normalize_name(name)
+        with self._lock:
+            entry = self._names.get(key)
+            if entry is not None and entry[1] > self._clock():
+                members = [self._get(e, count=False) for e in entry[0]]
+                if all(e is not None for e in members):
+                    self._names.move_to_end(key)
+                    self.hits += 1
+                    return members
+            self.misses += 1
+
+        members = []
+        page = 0
+        while True:
+            resp = self._client.get_members(name=name, page=page, size=MemberDirectory.BATCH_SIZE)
+            members.extend(resp.result)
+            if not resp.result or len(members) >= resp.total_count:
+                break
+            page += 1
+        self._fill(members)
+        members = [e for e in members if _normalize_name(e.name) == key]
+        with self._lock:
+            self._names[key] = ([e.id for e in members], self._clock() + self._ttl)
+            self._names.move_to_end(key)
+            while len(self._names) > self._max_size:
+                self._names.popitem(last=False)
+        return members
+
+    def prefetch_emails(self, emails):
+        """
+        Look up the members of external email addresses in the background, by batches.
+
+        :param emails: External email addresses of the members
+        :type emails: list of str
+        :return: :class:`concurrent.futures.Future` of the result of :meth:`find_by_emails`
+        """
+        if not isinstance(emails, (list, tuple, set)):
+            raise TypeError(emails)
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='MemberDirectory')
+            executor = self._executor
+        return executor.submit(self.find_by_emails, list(emails))
+
+    def close(self):
+        """
+        Wait for the prefetches in progress, and stop the background thread.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def clear(self):
+        """
+        Remove all the members.
+        """
+        with self._lock:
+            self._members.clear()
+            self._by_user_code.clear()
+            self._by_email.clear()
+            self._names.clear()
+
+    def stats(self):
+        """
+        Returns the counters of the directory.
+
+        :return: dict with 'hits', 'misses', 'hit_rate' and 'members'
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'members': len(self._members),
+            }
+
+    def __len__(self):
+        return len(self._members)
+
+
+class ChannelDirectory:
+    """
+    Index of the messenger channels, by id, title, type and participant member id.
+
+    The channel list is loaded again after `ttl` seconds, or after the channels are changed by this client.
+    Only the channels whose `updatedAt` changed are parsed and indexed again.
+    Use the one of the client, :attr:`dooray.DoorayMessenger.channels`.
+
+    Usage::
+
+        import dooray
+
+        d = dooray.Dooray(API_TOKEN)
+        channel = d.messenger.channels.direct_channel(MEMBER_ID)
+        shared = d.messenger.channels.channels_with_member(MEMBER_ID)
+    """
+
+    def __init__(self, messenger, ttl=60, clock=time.monotonic):
+        """
+        :param messenger: Messenger API to load the channels with
+        :type messenger: :class:`dooray.DoorayMessenger`
+        :param ttl: Time in seconds after which the channels are loaded again. Defaults to 60
+        :type ttl: int or float, optional
+        :param clock: Function returning the current time in seconds. Defaults to :func:`time.monotonic`
+        :type clock: callable, optional
+        """
+        if not isinstance(ttl, (int, float)):
+            raise TypeError(ttl)
+
+        self._messenger = messenger
+        self._ttl = ttl
+        self._clock = clock
+        self._expires_at = None
+        self._response = None
+
+        # id -> (channel, updatedAt)
+        self._channels = {}
+        self._by_title = {}
+        self._by_type = {}
+        self._by_member = {}
+        self._lock = threading.Lock()
+
+    def _add(self, channel):
+        self._by_title.setdefault(channel.title, set()).add(channel.id)
+        self._by_type.setdefault(channel.type, set()).add(channel.id)
+        for e in channel.users.participants:
+            self._by_member.setdefault(e.member.organizationMemberId, set()).add(channel.id)
+
+    def _remove(self, channel_id):
+        channel = self._channels.pop(channel_id)[0]
+        for index, key in [(self._by_title, channel.title), (self._by_type, channel.type)] + \
+                [(self._by_member, e.member.organizationMemberId) for e in channel.users.participants]:
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(channel_id)
+                if not ids:
+                    del index[key]
+
+    def refresh(self):
+        """
+        Load the channel list, and index the new and updated channels.
+
+        :return: Number of the channels added, updated or removed
+        """
+        resp = self._messenger._request('GET', f'/messenger/v1/channels', name='get_channels')
+        with self._lock:
+            self._expires_at = self._clock() + self._ttl
+            # Same response from the response cache
+            if resp is self._response:
+                return 0
+            self._response = resp
+
+            changed = 0
+            seen = set()
+            for data in resp.json()['result']:
+                seen.add(data['id'])
+                entry = self._channels.get(data['id'])
+                if entry is not None and entry[1] == data['updatedAt']:
+                    continue
+                if entry is not None:
+                    self._remove(data['id'])
+                channel = dooray.Messenger.Channel(data)
+                self._channels[channel.id] = (channel, data['updatedAt'])
+                self._add(channel)
+                changed += 1
+            for channel_id in [e for e in self._channels if e not in seen]:
+                self._remove(channel_id)
+                changed += 1
+            return changed
+
+    def _ensure_loaded(self):
+        if self._expires_at is None or self._expires_at <= self._clock():
+            self.refresh()
+
+    def _channels_of(self, index, key):
+        self._ensure_loaded()
+        with self._lock:
+            return [self._channels[e][0] for e in index.get(key, ())]
+
+    def get(self, channel_id):
+        """
+        Returns a channel, or None.
+
+        :param channel_id: Channel ID
+        :type channel_id: str
+        :return: :class:`dooray.Messenger.Channel` or None
+        """
+        self._ensure_loaded()
+        with self._lock:
+            entry = self._channels.get(channel_id)
+            return entry[0] if entry is not None else None
+
+    def find_by_title(self, title):
+        """
+        Returns the channels of a title.
+
+        :param title: Title of the channels, exact match
+        :type title: str
+        :return: list of :class:`dooray.Messenger.Channel`
+        """
+        return self._channels_of(self._by_title, title)
+
+    def channels_of_type(self, channel_type):
+        """
+        Returns the channels of a type.
+
+        :param channel_type: Type of the channels
+        :type channel_type: 'direct' | 'private' | 'me' | 'bot'
+        :return: list of :class:`dooray.Messenger.Channel`
+        """
+        return self._channels_of(self._by_type, channel_type)
+
+    def channels_with_member(self, member_id):
+        """
+        Returns the channels shared with a member.
+
+        :param member_id: Member ID
+        :type member_id: str
+        :return: list of :class:`dooray.Messenger.Channel`
+        """
+        return self._channels_of(self._by_member, member_id)
+
+    def direct_channel(self, member_id):
+        """
+        Returns the direct channel with a member, or None.
+
+        :param member_id: Member ID
+        :type member_id: str
+        :return: :class:`dooray.Messenger.Channel` or None
+        """
+        return next((e for e in self.channels_with_member(member_id) if e.type == 'direct'), None)
+
+    def invalidate(self):
+        """
+        Load the channel list again on the next lookup.
+        """
+        with self._lock:
+            self._expires_at = None
+
+    def __len__(self):
+        return len(self._channels)
+
+
+_PLACEHOLDER = re.compile(r'\$\{([^}]*)\}')
+
+
+class TemplateCache:
+    """
+    Cache of post templates, which renders their placeholders locally.
+
+    Templates are loaded with :meth:`dooray.DoorayProject.get_template` without interpolation, and kept for
+    `ttl` seconds. :meth:`render` replaces the placeholders of :attr:`PLACEHOLDERS` in the subject and the body,
+    in Korea Standard Time, and the results are kept for each loaded template and date.
+    Templates with any other placeholder are interpolated by the server instead.
+    Use the one of the client, :attr:`dooray.DoorayProject.templates`.
+
+    Usage::
+
+        import dooray
+
+        d = dooray.Dooray(API_TOKEN)
+        template = d.project.templates.render(PROJECT_ID, TEMPLATE_ID)
+        post = dooray.PostBuilder().set_subject(template.subject).set_body(template.body.content).create()
+    """
+
+    TIMEZONE = datetime.timezone(datetime.timedelta(hours=9), 'KST')
+    """
+    Time zone of the placeholders.
+    """
+
+    PLACEHOLDERS = {
+        'year': lambda now: f'{now.year:04d}',
+        'month': lambda now: f'{now.month:02d}',
+        'day': lambda now: f'{now.day:02d}',
+        'date': lambda now: now.strftime('%Y-%m-%d'),
+    }
+    """
+    Placeholders rendered locally, as a dict of name to function of the current time.
+    """
+
+    def __init__(self, project, ttl=300, clock=time.monotonic):
+        """
+        :param project: Project API to load the templates with
+        :type project: :class:`dooray.DoorayProject`
+        :param ttl: Time in seconds after which a template is loaded again. Defaults to 300
+        :type ttl: int or float, optional
+        :param clock: Function returning the current time in seconds. Defaults to :func:`time.monotonic`
+        :type clock: callable, optional
+        """
+        if not isinstance(ttl, (int, float)):
+            raise TypeError(ttl)
+
+        self._project = project
+        self._ttl = ttl
+        self._clock = clock
+        # (project_id, template_id) -> _TemplateEntry
+        self._entries = {}
+        self._lock = threading.Lock()
+
+        self.rendered = 0
+        """
+        Number of templates rendered locally, including the memoized ones.
+
+        :type: int
+        """
+        self.interpolated = 0
+        """
+        Number of templates interpolated by the server.
+
+        :type: int
+        """
+
+    def _entry(self, project_id, template_id):
+        key = (project_id, template_id)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= self._clock():
+            template = self._project.get_template(project_id, template_id).result
+            entry = _TemplateEntry(template, self._clock() + self._ttl)
+            with self._lock:
+                self._entries[key] = entry
+        return entry
+
+    def get(self, project_id, template_id):
+        """
+        Returns a template as it is, with its placeholders.
+
+        :param project_id: Project ID
+        :type project_id: str
+        :param template_id: Template ID
+        :type template_id: str
+        :return: :class:`dooray.Project.ReadTemplate`
+        """
+        return self._entry(project_id, template_id).template
+
+    def render(self, project_id, template_id, now=None):
+        """
+        Returns a template with its placeholders replaced, as `get_template(..., interpolation=True)` does.
+
+        :param project_id: Project ID
+        :type project_id: str
+        :param template_id: Template ID
+        :type template_id: str
+        :param now: Time to render the placeholders with. Defaults to the current time
+        :type now: :class:`datetime.datetime`, optional
+        :return: :class:`dooray.Project.ReadTemplate`. Do not modify it, as it is shared by the other calls.
+        """
+        entry = self._entry(project_id, template_id)
+        if not entry.renderable:
+            self.interpolated += 1
+            return self._project.get_template(project_id, template_id, interpolation=True).result
+
+        now = (now or datetime.datetime.now(datetime.timezone.utc)).astimezone(TemplateCache.TIMEZONE)
+        date = now.date()
+        with self._lock:
+            rendered = entry.rendered.get(date)
+        if rendered is None:
+            rendered = entry.template.fork()
+            rendered.subject = TemplateCache._substitute(rendered.subject, now)
+            if rendered.body is not None:
+                rendered.body = dooray.Project.PostBody({
+                    'mimeType': rendered.body.mime_type,
+                    'content': TemplateCache._substitute(rendered.body.content, now),
+                })
+            with self._lock:
+                entry.rendered[date] = rendered
+        self.rendered += 1
+        return rendered
+
+    @staticmethod
+    def _substitute(text, now):
+        if text is None:
+            return None
+        return _PLACEHOLDER.sub(lambda m: TemplateCache.PLACEHOLDERS[m.group(1)](now), text)
+
+    def invalidate(self, project_id=None, template_id=None):
+        """
+        Forget a template, the templates of a project, or all the templates.
+
+        :param project_id: Project ID. Defaults to None, which means all the projects
+        :type project_id: str, optional
+        :param template_id: Template ID. Defaults to None, which means all the templates of the project
+        :type template_id: str, optional
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if project_id is None or (key[0] == project_id and template_id in (None, key[1])):
+                    del self._entries[key]
+
+
+class _TemplateEntry:
+    def __init__(self, template, expires_at):
+        self.template = template
+        self.expires_at = expires_at
+        # date -> rendered template
+        self.rendered = {}
+        texts = [template.subject, template.body.content if template.body is not None else '']
+        self.renderable = all(
+            name in TemplateCache.PLACEHOLDERS for text in texts for name in _PLACEHOLDER.findall(text or '')
+        )
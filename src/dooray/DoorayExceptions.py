@@ -8,6 +8,7 @@ class DoorayException(Exception):
 class BadHttpResponseStatusCode(DoorayException):
     def __init__(self, resp):
         self.message = f'Server has returned HTTP Response Status Code {resp.status_code}'
+        self.status_code = resp.status_code
 
 
 class ServerGeneralError(DoorayException):
@@ -1,3 +1,8 @@
+import datetime
+import threading
+from collections import OrderedDict
+
+
 class ResponseHeader:
     def __init__(self, data):
         self.is_successful = data['isSuccessful']
@@ -41,7 +46,7 @@ class DoorayResponse:
         response = d.messenger.create_channel(title='test', ...)
         channel_id = response.result.id
     """
-    def __init__(self, data, obj=None):
+    def __init__(self, data, obj=None, interner=None):
         self.header = ResponseHeader(data['header'])
         """
         The header of the response.
@@ -49,7 +54,7 @@ class DoorayResponse:
         :type: :class:`dooray.DoorayObjects.ResponseHeader`
         """
         if obj is not None:
-            self.result = obj(data['result'])
+            self.result = obj(data['result']) if interner is None else obj(data['result'], interner)
             """
             The result of the response.
             
@@ -79,7 +84,7 @@ class DoorayListResponse(DoorayResponse):
         for channel in response.result:
             print(channel.title)
     """
-    def __init__(self, data, obj, page=0, size=20):
+    def __init__(self, data, obj, page=0, size=20, interner=None):
         super().__init__(data)
         self.total_count = data['totalCount']
         """
@@ -105,11 +110,46 @@ class DoorayListResponse(DoorayResponse):
         
         :type: list of response objects which differ by the request.
         """
-        for e in data['result']:
-            self.result.append(obj(e))
+        if interner is None:
+            for e in data['result']:
+                self.result.append(obj(e))
+        else:
+            for e in data['result']:
+                self.result.append(obj(e, interner))
         if self.size is None:
             self.page = 0
             self.size = self.total_count
+        self._result_type = obj
+
+    def to_columns(self, columns=None):
+        """
+        Returns the result as columns. See :func:`dooray.DoorayObjects.to_columns`.
+
+        :param columns: Names of the columns to export. Defaults to None, which means all the columns
+        :type columns: list of str, optional
+        :return: dict of column name to list of values
+        """
+        return to_columns(self.result, columns, result_type=self._result_type)
+
+    def to_numpy(self, columns=None):
+        """
+        Returns the result as NumPy arrays. See :func:`dooray.DoorayObjects.to_numpy`.
+
+        :param columns: Names of the columns to export. Defaults to None, which means all the columns
+        :type columns: list of str, optional
+        :return: dict of column name to :class:`numpy.ndarray`
+        """
+        return to_numpy(self.result, columns, result_type=self._result_type)
+
+    def to_arrow(self, columns=None):
+        """
+        Returns the result as an Arrow table. See :func:`dooray.DoorayObjects.to_arrow`.
+
+        :param columns: Names of the columns to export. Defaults to None, which means all the columns
+        :type columns: list of str, optional
+        :return: :class:`pyarrow.Table`
+        """
+        return to_arrow(self.result, columns, result_type=self._result_type)
 
     def __repr__(self):
         return f"{{ 'header': {self.header}, 'result': {[e for e in self.result]}, " \
@@ -125,3 +165,243 @@ class Relation:
 
     def __repr__(self):
         return f"{{ 'id': '{self.id}' }}"
+
+
+class ObjectInterner:
+    """
+    Shares one instance per (type, id) among the objects parsed from responses.
+
+    A page of posts usually refers to a handful of distinct projects, workflows, milestones and tags.
+    With an interner, each of them is built once and the same instance is handed to every post
+    which refers to it. Repeated strings like workflow classes, and the ids of the objects and of the objects
+    nested in them, such as member ids, are shared as well.
+
+    An interned object is rebuilt if the server returns different data for the same id,
+    so a long-lived interner never hands out stale objects.
+    Interned objects are shared, so treat them as read-only.
+
+    See ``interning`` parameter of :class:`dooray.Dooray`.
+    """
+    def __init__(self, max_size=None):
+        """
+        :param max_size: Maximum number of objects, and of strings, to keep. The least recently used ones are \
+            dropped first. Defaults to None, which means no limit
+        :type max_size: int, optional
+        """
+        if max_size is not None and not isinstance(max_size, int):
+            raise TypeError(max_size)
+
+        self._max_size = max_size
+        self._objects = OrderedDict()
+        self._strings = OrderedDict()
+        self._lock = threading.Lock()
+
+    def intern(self, cls, data, key=None):
+        """
+        Returns the shared instance of `cls` for the given data, building it if needed.
+
+        :param cls: Class of the object
+        :type cls: type
+        :param data: Response data to build the object from
+        :type data: dict
+        :param key: Identity of the object. Defaults to `data['id']`
+        :return: Instance of `cls`
+        """
+        k = (cls, self.intern_string(data['id']) if key is None else key)
+        with self._lock:
+            entry = self._objects.get(k)
+            if entry is not None and entry[0] == data:
+                self._objects.move_to_end(k)
+                return entry[1]
+
+        obj = cls(data)
+        self._intern_ids(obj)
+        with self._lock:
+            self._objects[k] = (data, obj)
+            self._objects.move_to_end(k)
+            if self._max_size is not None and len(self._objects) > self._max_size:
+                self._objects.popitem(last=False)
+        return obj
+
+    def intern_string(self, s):
+        """
+        Returns the shared instance of the given string.
+
+        :param s: String to intern
+        :type s: str
+        :return: The shared string, or None if `s` is None
+        """
+        if s is None:
+            return None
+        with self._lock:
+            shared = self._strings.get(s)
+            if shared is not None:
+                self._strings.move_to_end(s)
+                return shared
+            self._strings[s] = s
+            if self._max_size is not None and len(self._strings) > self._max_size:
+                self._strings.popitem(last=False)
+            return s
+
+    def _intern_ids(self, obj, depth=2):
+        # Shares the ids of the object, and of the objects nested in it.
+        # The shared string is equal to the id, so read-only objects are updated too.
+        for name, value in vars(obj).items():
+            if isinstance(value, str):
+                if name == 'id' or name.endswith('_id'):
+                    object.__setattr__(obj, name, self.intern_string(value))
+            elif depth > 0 and hasattr(value, '__dict__') and not isinstance(value, type):
+                self._intern_ids(value, depth - 1)
+
+    def clear(self):
+        """
+        Drop all the interned objects and strings.
+        """
+        with self._lock:
+            self._objects.clear()
+            self._strings.clear()
+
+    def __len__(self):
+        return len(self._objects)
+
+
+def _parse_timestamp(value):
+    if value is None:
+        return None
+    # datetime.fromisoformat() does not accept 'Z' before Python 3.11
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    ts = datetime.datetime.fromisoformat(value)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=datetime.timezone.utc)
+    return ts.astimezone(datetime.timezone.utc)
+
+
+def _column_specs(result_type, columns):
+    specs = getattr(result_type, 'COLUMNS', None)
+    if specs is None:
+        raise TypeError(f'{result_type.__name__} does not support columnar export')
+    if columns is None:
+        return specs
+    for name in columns:
+        if name not in specs:
+            raise ValueError(f"Unknown column '{name}' for {result_type.__name__}")
+    return {name: specs[name] for name in columns}
+
+
+def to_columns(objects, columns=None, result_type=None):
+    """
+    Returns the given response objects as columns, one list of values per field.
+
+    The available columns are defined by the `COLUMNS` attribute of the object type,
+    for example :attr:`dooray.Project.ReadPost.COLUMNS`. Timestamps are returned as
+    timezone aware :class:`datetime.datetime` objects in UTC.
+
+    The objects may come from several pages. For example::
+
+        import itertools
+        import dooray
+
+        d = dooray.Dooray(API_TOKEN)
+        pages = [d.project.get_posts(PROJECT_ID, page=p, size=100).result for p in range(3)]
+        columns = dooray.DoorayObjects.to_columns(itertools.chain(*pages), result_type=dooray.Project.ReadPost)
+
+    :param objects: Response objects of the same type
+    :type objects: iterable
+    :param columns: Names of the columns to export. Defaults to None, which means all the columns
+    :type columns: list of str, optional
+    :param result_type: Type of the objects. Defaults to None, which means the type of the first object
+    :type result_type: type, optional
+    :return: dict of column name to list of values
+    """
+    objects = list(objects)
+    if result_type is None:
+        if len(objects) == 0:
+            raise ValueError('result_type is required to export an empty result')
+        result_type = type(objects[0])
+    specs = _column_specs(result_type, columns)
+
+    ret = {}
+    for name, (kind, getter) in specs.items():
+        values = [getter(o) for o in objects]
+        if kind == 'timestamp':
+            values = [_parse_timestamp(v) for v in values]
+        ret[name] = values
+    return ret
+
+
+def to_numpy(objects, columns=None, result_type=None):
+    """
+    Returns the given response objects as NumPy arrays, one array per field.
+
+    String columns are object arrays, timestamps are `datetime64[ms]` in UTC, and missing timestamps are `NaT`.
+    Integer and boolean columns fall back to object arrays if some values are missing.
+    Requires `numpy`, which could be installed with ``pip install PyDooray[numpy]``.
+
+    :param objects: Response objects of the same type
+    :type objects: iterable
+    :param columns: Names of the columns to export. Defaults to None, which means all the columns
+    :type columns: list of str, optional
+    :param result_type: Type of the objects. Defaults to None, which means the type of the first object
+    :type result_type: type, optional
+    :return: dict of column name to :class:`numpy.ndarray`
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('to_numpy() requires numpy. Install it with `pip install PyDooray[numpy]`') from None
+
+    objects = list(objects)
+    values = to_columns(objects, columns, result_type)
+    specs = _column_specs(result_type if result_type is not None else type(objects[0]), columns)
+
+    ret = {}
+    for name, (kind, _) in specs.items():
+        column = values[name]
+        if kind == 'timestamp':
+            ret[name] = numpy.array(
+                [None if v is None else v.replace(tzinfo=None) for v in column], dtype='datetime64[ms]'
+            )
+        elif kind in ('int', 'bool') and None not in column:
+            ret[name] = numpy.array(column, dtype=numpy.int64 if kind == 'int' else numpy.bool_)
+        else:
+            ret[name] = numpy.empty(len(column), dtype=object)
+            ret[name][:] = column
+    return ret
+
+
+def to_arrow(objects, columns=None, result_type=None):
+    """
+    Returns the given response objects as an Arrow table.
+
+    Timestamps are `timestamp[ms, tz=UTC]`, tag ids are `list<string>` and missing values are nulls.
+    Requires `pyarrow`, which could be installed with ``pip install PyDooray[arrow]``.
+
+    :param objects: Response objects of the same type
+    :type objects: iterable
+    :param columns: Names of the columns to export. Defaults to None, which means all the columns
+    :type columns: list of str, optional
+    :param result_type: Type of the objects. Defaults to None, which means the type of the first object
+    :type result_type: type, optional
+    :return: :class:`pyarrow.Table`
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('to_arrow() requires pyarrow. Install it with `pip install PyDooray[arrow]`') from None
+
+    types = {
+        'str': pyarrow.string(),
+        'int': pyarrow.int64(),
+        'bool': pyarrow.bool_(),
+        'timestamp': pyarrow.timestamp('ms', tz='UTC'),
+        'str_list': pyarrow.list_(pyarrow.string()),
+    }
+
+    objects = list(objects)
+    values = to_columns(objects, columns, result_type)
+    specs = _column_specs(result_type if result_type is not None else type(objects[0]), columns)
+
+    return pyarrow.table({
+        name: pyarrow.array(values[name], type=types[kind]) for name, (kind, _) in specs.items()
+    })
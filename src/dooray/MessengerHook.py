@@ -1,11 +1,266 @@
-import copy
+import email.utils
+import json
+import random
+import re
+import threading
+import time
+import weakref
 
 import requests
+from requests.adapters import HTTPAdapter
 
 
-class MessengerHook:
+class _TokenBucket:
+    # Allows `rate` sends per second on average, and bursts of up to `burst` sends.
+    # Each send reserves a token and waits until it is available, so the waiting threads keep their turns.
+    def __init__(self, rate, burst, clock):
+        self._rate = rate
+        self._burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._not_before = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        # Returns the time to wait in seconds before sending
+        with self._lock:
+            now = self._clock()
+            wait = max(0.0, self._not_before - now)
+            if self._rate is None:
+                return wait
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self._rate)
+            return wait
+
+    def pause(self, seconds):
+        # Nothing is sent for `seconds`, as asked by the hook
+        with self._lock:
+            self._not_before = max(self._not_before, self._clock() + seconds)
+
+
+def _retry_after(headers):
+    # Seconds in the Retry-After header, which is either a number of seconds or an HTTP date
+    value = headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _Delivery:
+    # Rate limit, retries and counters of the hooks. Shared by MessengerHook and AsyncMessengerHook,
+    # which only differ by how they post and wait.
+
+    RETRY_STATUS_CODES = (429, 503)
+    """
+    Status codes of the responses which are retried. The hook has not processed the message with them.
+    """
+
+    def __init__(self, rate, burst, max_retries, backoff, max_backoff, max_retry_wait, clock):
+        if rate is not None and not isinstance(rate, (int, float)):
+            raise TypeError(rate)
+        if not isinstance(burst, int):
+            raise TypeError(burst)
+        if not isinstance(max_retries, int):
+            raise TypeError(max_retries)
+        if rate is not None and rate <= 0:
+            raise ValueError(rate)
+        if burst < 1:
+            raise ValueError(burst)
+        if max_retries < 0:
+            raise ValueError(max_retries)
+
+        self._bucket = _TokenBucket(rate, burst, clock)
+        self._max_retries = max_retries
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._max_retry_wait = max_retry_wait
+        self._lock = threading.Lock()
+
+        self.sent = 0
+        """
+        Number of messages accepted by the hook.
+
+        :type: int
+        """
+        self.throttled = 0
+        """
+        Number of responses in :attr:`RETRY_STATUS_CODES`.
+
+        :type: int
+        """
+        self.retried = 0
+        """
+        Number of retries of the throttled messages.
+
+        :type: int
+        """
+        self.dropped = 0
+        """
+        Number of messages not accepted by the hook, including the throttled ones given up.
+
+        :type: int
+        """
+
+    def stats(self):
+        """
+        Returns the counters of the hook.
+
+        :return: dict with 'sent', 'throttled', 'retried' and 'dropped'
+        """
+        with self._lock:
+            return {
+                'sent': self.sent,
+                'throttled': self.throttled,
+                'retried': self.retried,
+                'dropped': self.dropped,
+            }
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _wait_before_send(self):
+        # Time to wait in seconds before sending, for the rate limit and Retry-After
+        return self._bucket.reserve()
+
+    def _wait_before_retry(self, status_code, headers, attempt):
+        # Counts the response of an attempt. Returns the time to wait before retrying the message,
+        # or None if it is done, either accepted or given up
+        if status_code == 200:
+            self._count('sent')
+            return None
+        if status_code not in _Delivery.RETRY_STATUS_CODES:
+            self._count('dropped')
+            return None
+
+        self._count('throttled')
+        wait = None
+        if attempt < self._max_retries:
+            retry_after = _retry_after(headers)
+            if retry_after is None:
+                wait = random.uniform(0, min(self._max_backoff, self._backoff * 2 ** attempt))
+            elif retry_after <= self._max_retry_wait:
+                # The other senders wait as well, and the jitter spreads their retries
+                self._bucket.pause(retry_after)
+                wait = retry_after + random.uniform(0, self._backoff)
+        self._count('dropped' if wait is None else 'retried')
+        return wait
+
+
+# Fields are serialized as this marker first, and the payload is split around the markers
+_FIELD_MARKER = re.compile(rb'"\\u0000(\w+)\\u0000"')
+_FIELD_NAME = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_encode_str = json.encoder.encode_basestring_ascii
+
+
+class MessengerHookField:
+    """
+    Variable part of a message compiled by :meth:`MessengerHook.compile`, given when the message is sent.
+    """
+
+    def __init__(self, name):
+        """
+        :param name: Name of the field, given as a keyword argument of :meth:`MessengerHookMessage.send`. \
+            ASCII letters, digits and underscores, not starting with a digit
+        :type name: str
+        """
+        if not isinstance(name, str):
+            raise TypeError(name)
+        # Non-ASCII names would be escaped in the compiled payload, and never match the marker
+        if not _FIELD_NAME.fullmatch(name) or name == 'text':
+            raise ValueError(name)
+        self.name = name
+        """"""
+
+    def __repr__(self):
+        return f"MessengerHookField('{self.name}')"
+
+
+class MessengerHookMessage:
+    """
+    Message of a :class:`MessengerHook` whose constant parts are serialized once. See :meth:`MessengerHook.compile`.
+    """
+
+    def __init__(self, hook, chunks, names):
+        self._hook = hook
+        self._chunks = chunks
+        self._names = names
+
+    @property
+    def fields(self):
+        """
+        Names of the fields of the message, other than the text.
+
+        :type: list of str
+        """
+        return [e for e in dict.fromkeys(self._names) if e != 'text']
+
+    def encode(self, text, **fields):
+        """
+        Returns the payload of the message with the text and fields, as JSON bytes.
+
+        :param text: Message text
+        :type text: str
+        :param fields: Values of the fields. They can be any JSON value
+        :return: bytes
+        """
+        if not isinstance(text, str):
+            raise TypeError(text)
+        fields['text'] = text
+        parts = [self._chunks[0]]
+        for name, chunk in zip(self._names, self._chunks[1:]):
+            if name not in fields:
+                raise ValueError(name)
+            value = fields[name]
+            parts.append((_encode_str(value) if isinstance(value, str) else json.dumps(value)).encode('ascii'))
+            parts.append(chunk)
+        return b''.join(parts)
+
+    def send(self, text, **fields):
+        """
+        Send the message to the hook.
+
+        :param text: Message text
+        :type text: str
+        :param fields: Values of the fields. They can be any JSON value
+        :return: True if the hook has accepted the message
+        """
+        hook = self._hook
+        return hook._post(hook._session(), data=self.encode(text, **fields), headers=hook._json_header)
+
+
+class MessengerHook(_Delivery):
     """
     Dooray! messenger incoming hook helper class.
+
+    Connections to the hook host are kept in a pool and reused by the following messages.
+    An instance can be shared by threads. Close it when it is no longer used, or use it as a context manager.
+
+    With `rate`, :meth:`send` waits so that no more than `rate` messages per second are sent to the hook URL,
+    after a burst of `burst` messages. Responses in :attr:`RETRY_STATUS_CODES` are retried up to `max_retries`
+    times, after the time in their Retry-After header or a jittered exponential backoff.
+    Other sends of the instance wait for the Retry-After time as well.
+
+    Usage::
+
+        import dooray
+
+        with dooray.MessengerHook(HOOK_URL, hook_name='Alert Bot') as hook:
+            hook.send('Disk usage is over 90%')
+
+        # At most one message per second, waiting up to a minute when throttled by the hook
+        hook = dooray.MessengerHook(HOOK_URL, rate=1, max_retry_wait=60)
     """
 
     def __init__(
@@ -14,6 +269,15 @@ class MessengerHook:
         hook_name="My Bot",
         hook_icon="https://static.dooray.com/static_images/dooray-bot.png",
         user_agent="PyDooray/Python",
+        timeout=10,
+        pool_maxsize=10,
+        rate=None,
+        burst=1,
+        max_retries=3,
+        backoff=1.0,
+        max_backoff=30.0,
+        max_retry_wait=60.0,
+        clock=time.monotonic,
     ):
         """
         :param hook_url: Hook URL
@@ -24,6 +288,26 @@ class MessengerHook:
         :type hook_icon: str, optional
         :param user_agent: User agent of the request. Defaults to "PyDooray/Python"
         :type user_agent: str, optional
+        :param timeout: Timeout of the request in seconds, or a (connect, read) tuple. Defaults to 10
+        :type timeout: float or tuple, optional
+        :param pool_maxsize: Maximum number of connections kept to the hook host. Defaults to 10
+        :type pool_maxsize: int, optional
+        :param rate: Maximum number of messages sent per second. Defaults to None, which does not limit the rate
+        :type rate: float, optional
+        :param burst: Number of messages sent at once before the rate applies. Defaults to 1
+        :type burst: int, optional
+        :param max_retries: Maximum number of retries of a throttled message. Defaults to 3
+        :type max_retries: int, optional
+        :param backoff: Time in seconds to wait before the first retry without Retry-After. \
+            It doubles for each retry, and a random part of it is waited. Defaults to 1
+        :type backoff: float, optional
+        :param max_backoff: Maximum time in seconds to wait before a retry without Retry-After. Defaults to 30
+        :type max_backoff: float, optional
+        :param max_retry_wait: Maximum time in seconds to wait before a retry. The message is given up \
+            when Retry-After asks for longer. Defaults to 60
+        :type max_retry_wait: float, optional
+        :param clock: Function returning the current time in seconds. Defaults to :func:`time.monotonic`
+        :type clock: callable, optional
         """
         if not isinstance(hook_url, str):
             raise TypeError(hook_url)
@@ -33,6 +317,11 @@ class MessengerHook:
             raise TypeError(hook_icon)
         if user_agent is not None and not isinstance(user_agent, str):
             raise TypeError(user_agent)
+        if timeout is not None and not isinstance(timeout, (int, float, tuple)):
+            raise TypeError(timeout)
+        if not isinstance(pool_maxsize, int):
+            raise TypeError(pool_maxsize)
+        super().__init__(rate, burst, max_retries, backoff, max_backoff, max_retry_wait, clock)
 
         self._hook_url = hook_url
         self._hook_name = hook_name
@@ -40,6 +329,49 @@ class MessengerHook:
         self._request_header = {
             'User-Agent': user_agent
         }
+        self._json_header = {**self._request_header, 'Content-Type': 'application/json'}
+        # Start of the payloads serialized by others, such as MessengerHookPool, up to the comma before 'text'
+        self._payload_prefix = json.dumps(
+            {'botName': hook_name, 'botIconImage': hook_icon}, separators=(',', ':')
+        ).encode('utf-8')[:-1] + b','
+        self._timeout = timeout
+        self._pool_maxsize = pool_maxsize
+
+        # requests.Session is not thread-safe, so each thread has its own session.
+        # They share the adapter, which holds the connection pool. A session is only referenced
+        # by its thread, so it goes away with the thread.
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self._local = threading.local()
+        self._sessions = weakref.WeakSet()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            with self._lock:
+                session.mount('https://', self._adapter)
+                session.mount('http://', self._adapter)
+                self._sessions.add(session)
+            self._local.session = session
+        return session
+
+    def close(self):
+        """
+        Close the pooled connections. The hook can still be used, with new connections.
+        """
+        with self._lock:
+            sessions, self._sessions = list(self._sessions), weakref.WeakSet()
+            adapter, self._adapter = self._adapter, HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_maxsize)
+            self._local = threading.local()
+        for session in sessions:
+            session.close()
+        adapter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def send(self, text, attachments=None):
         """
@@ -54,12 +386,17 @@ class MessengerHook:
             You may also use :obj:`dooray.MessengerHookAttachments` to create an input for this parameter. \
             Defaults to None
         :type attachments: list, optional
+        :return: True if the hook has accepted the message
         """
         if not isinstance(text, str):
             raise TypeError(text)
         if attachments is not None and not isinstance(attachments, list):
             raise TypeError(attachments)
 
+        return self._send_status(text, attachments) == 200
+
+    def _send_status(self, text, attachments):
+        # Sends a checked message. Returns the status code of the last response
         payload = {
             'botName': self._hook_name,
             'botIconImage': self._hook_icon,
@@ -67,8 +404,62 @@ class MessengerHook:
         }
         if attachments is not None:
             payload['attachments'] = attachments
-        resp = requests.post(self._hook_url, json=payload, headers=self._request_header)
-        return resp.status_code == 200
+        return self._post_status(self._session(), json=payload, headers=self._request_header)
+
+    def compile(self, attachments=None):
+        """
+        Serialize the constant parts of a message once, to send it many times with other values.
+        The text and the :class:`MessengerHookField` values in the attachments are given by
+        :meth:`MessengerHookMessage.send`.
+
+        Usage::
+
+            alert = hook.compile([{'title': 'CPU usage', 'text': dooray.MessengerHookField('usage'), 'color': 'red'}])
+            alert.send('db-1 is busy', usage='93%')
+
+        :param attachments: List of dictionaries of attachments. See :meth:`send`. Defaults to None
+        :type attachments: list, optional
+        :return: :class:`MessengerHookMessage`
+        """
+        if attachments is not None and not isinstance(attachments, list):
+            raise TypeError(attachments)
+
+        def marker(o):
+            if isinstance(o, MessengerHookField):
+                return f'\0{o.name}\0'
+            raise TypeError(o)
+
+        payload = {
+            'botName': self._hook_name,
+            'botIconImage': self._hook_icon,
+            'text': '\0text\0',
+        }
+        if attachments is not None:
+            payload['attachments'] = attachments
+        parts = _FIELD_MARKER.split(json.dumps(payload, default=marker, separators=(',', ':')).encode('ascii'))
+        return MessengerHookMessage(self, parts[0::2], [e.decode('ascii') for e in parts[1::2]])
+
+    def _post(self, session, **kwargs):
+        # Returns True if the hook has accepted the message
+        return self._post_status(session, **kwargs) == 200
+
+    def _post_status(self, session, **kwargs):
+        # Posts with the rate limit and the retries. Returns the status code of the last response
+        attempt = 0
+        while True:
+            wait = self._wait_before_send()
+            if wait > 0:
+                time.sleep(wait)
+            resp = session.post(self._hook_url, timeout=self._timeout, **kwargs)
+            wait = self._wait_before_retry(resp.status_code, resp.headers, attempt)
+            if wait is None:
+                return resp.status_code
+            time.sleep(wait)
+            attempt += 1
+
+    def _post_serialized(self, session, body):
+        # Posts a payload serialized without the bot name and icon, as a JSON object starting with 'text'
+        return self._post(session, data=self._payload_prefix + body[1:], headers=self._json_header)
 
 
 class MessengerHookAttachments:
@@ -138,7 +529,16 @@ class MessengerHookAttachments:
         """
         Create a list of attachments.
 
-        Returns a deep copy of the internal state, allowing the builder
+        Returns a copy of the internal state, allowing the builder
         to be reused as a template for creating multiple similar attachments.
         """
-        return copy.deepcopy(self._attachments)
+        # Attachments hold only strings, so copying each dict is enough to keep the builder intact.
+        return [dict(e) for e in self._attachments]
+
+    def fork(self):
+        """
+        Create a new builder which starts from the current state of this builder.
+        """
+        forked = MessengerHookAttachments()
+        forked._attachments = list(self._attachments)
+        return forked
@@ -0,0 +1,265 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from .MessengerHook import MessengerHook
+
+_logger = logging.getLogger(__name__)
+
+
+class _Window:
+    def __init__(self, text, closes_at):
+        self.text = text
+        self.closes_at = closes_at
+        self.repeated = 0
+
+
+class DedupingMessengerHook:
+    """
+    Sends messages of a :class:`dooray.MessengerHook`, suppressing the repeated ones.
+
+    The first message with a key is sent, and opens a window of `window` seconds. The messages with the same key
+    are not sent until the window closes. Then, if any was suppressed, a summary formatted from `summary_text`
+    is sent instead. If the hook does not accept the first message, the window is closed without a summary,
+    so that the next message with the key is sent. The repeats which came while the first message was being sent
+    are not suppressed then: the message is sent again for them, with all but one of them as its repeats.
+    The key is a hash of the text and the attachments, unless given by the caller.
+
+    At most `max_keys` windows are kept. When there are more, the oldest one is closed early.
+    The closed windows are summarized by a background thread every `check_interval` seconds,
+    by :meth:`expire`, or by :meth:`close`.
+
+    Usage::
+
+        import dooray
+
+        with dooray.DedupingMessengerHook(dooray.MessengerHook(HOOK_URL), window=300) as hook:
+            hook.send(f'{host} is down', key=f'down:{host}')
+    """
+
+    def __init__(
+        self,
+        hook,
+        window=60.0,
+        max_keys=10000,
+        summary_text='{text} (repeated {count} times)',
+        check_interval=1.0,
+        clock=time.monotonic,
+    ):
+        """
+        :param hook: Hook to send the messages with
+        :type hook: :class:`dooray.MessengerHook`
+        :param window: Time in seconds during which the repeated messages are suppressed. Defaults to 60
+        :type window: float, optional
+        :param max_keys: Maximum number of the open windows. Defaults to 10000
+        :type max_keys: int, optional
+        :param summary_text: Text of the summaries, formatted with the `text` of the first message and \
+            the `count` of the suppressed ones. Defaults to '{text} (repeated {count} times)'
+        :type summary_text: str, optional
+        :param check_interval: Interval in seconds of the background thread sending the summaries. \
+            Defaults to 1. If None, no thread is started and :meth:`expire` must be called.
+        :type check_interval: float, optional
+        :param clock: Function returning the current time in seconds. Defaults to :func:`time.monotonic`
+        :type clock: callable, optional
+        """
+        if not isinstance(hook, MessengerHook):
+            raise TypeError(hook)
+        if not isinstance(window, (int, float)):
+            raise TypeError(window)
+        if not isinstance(max_keys, int):
+            raise TypeError(max_keys)
+        if not isinstance(summary_text, str):
+            raise TypeError(summary_text)
+        if check_interval is not None and not isinstance(check_interval, (int, float)):
+            raise TypeError(check_interval)
+        if max_keys < 1:
+            raise ValueError(max_keys)
+
+        self._hook = hook
+        self._window = window
+        self._max_keys = max_keys
+        self._summary_text = summary_text
+        self._clock = clock
+
+        # Opened in time order, so the windows close in the order of the dict
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.sent = 0
+        """
+        Number of messages accepted by the hook, not including the summaries.
+
+        :type: int
+        """
+        self.suppressed = 0
+        """
+        Number of messages not sent because they are repeated.
+
+        :type: int
+        """
+        self.summaries = 0
+        """
+        Number of summaries sent.
+
+        :type: int
+        """
+
+        self._closed = threading.Event()
+        self._thread = None
+        if check_interval is not None:
+            self._thread = threading.Thread(
+                target=self._expire_periodically, args=(check_interval,), name='DedupingMessengerHook', daemon=True
+            )
+            self._thread.start()
+
+    @staticmethod
+    def make_key(text, attachments=None):
+        """
+        Returns the key of a message, a hash of its text and attachments.
+
+        :param text: Message text
+        :type text: str
+        :param attachments: List of dictionaries of attachments. Defaults to None
+        :type attachments: list, optional
+        :return: str
+        """
+        content = json.dumps([text, attachments], sort_keys=True, separators=(',', ':'))
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+    def send(self, text, attachments=None, key=None):
+        """
+        Send a message to the hook, unless the same key was sent within the window.
+
+        :param text: Message text
+        :type text: str
+        :param attachments: List of dictionaries of attachments. See :meth:`dooray.MessengerHook.send`
+        :type attachments: list, optional
+        :param key: Key of the message. Defaults to None, which is :meth:`make_key` of the message
+        :type key: str, optional
+        :return: True if sent, False if suppressed or not accepted by the hook
+        """
+        if not isinstance(text, str):
+            raise TypeError(text)
+        if attachments is not None and not isinstance(attachments, list):
+            raise TypeError(attachments)
+        if key is not None and not isinstance(key, str):
+            raise TypeError(key)
+        if key is None:
+            key = DedupingMessengerHook.make_key(text, attachments)
+
+        now = self._clock()
+        window = None
+        with self._lock:
+            closed = self._close_windows(now)
+            opened = self._windows.get(key)
+            if opened is not None:
+                opened.repeated += 1
+                self.suppressed += 1
+            else:
+                window = self._windows[key] = _Window(text, now + self._window)
+                while len(self._windows) > self._max_keys:
+                    closed.append(self._windows.popitem(last=False)[1])
+
+        self._summarize(closed)
+        if window is None:
+            return False
+        while True:
+            try:
+                ok = self._hook.send(text, attachments)
+            except BaseException:
+                with self._lock:
+                    self._discard(key, window)
+                raise
+            with self._lock:
+                if ok:
+                    self.sent += 1
+                    return True
+                repeated = self._discard(key, window)
+                if repeated == 0:
+                    return False
+                # Send it again for one of the repeats, with the others as its repeats
+                window = self._windows[key] = _Window(text, self._clock() + self._window)
+                window.repeated = repeated - 1
+                self.suppressed += window.repeated
+
+    def _discard(self, key, window):
+        # Called with the lock held, when the first message of a window was not delivered. Closes the window
+        # without a summary, so that the next repeat is sent, and returns the number of the repeats it suppressed.
+        if self._windows.get(key) is not window:
+            # Closed already, and summarized
+            return 0
+        del self._windows[key]
+        self.suppressed -= window.repeated
+        return window.repeated
+
+    def _close_windows(self, now):
+        # Called with the lock held. Removes the closed windows, and returns the ones to summarize
+        closed = []
+        while self._windows:
+            key, window = next(iter(self._windows.items()))
+            if window.closes_at > now:
+                break
+            del self._windows[key]
+            closed.append(window)
+        return closed
+
+    def _summarize(self, windows):
+        for window in windows:
+            if window.repeated == 0:
+                continue
+            try:
+                ok = self._hook.send(self._summary_text.format(text=window.text, count=window.repeated))
+            except Exception:
+                _logger.exception('Summary of DedupingMessengerHook failed')
+                continue
+            if ok:
+                with self._lock:
+                    self.summaries += 1
+
+    def expire(self):
+        """
+        Close the windows which are over, and send their summaries.
+        """
+        with self._lock:
+            closed = self._close_windows(self._clock())
+        self._summarize(closed)
+
+    def _expire_periodically(self, interval):
+        while not self._closed.wait(interval):
+            self.expire()
+
+    def close(self):
+        """
+        Stop the background thread, close all the windows and send their summaries.
+        """
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            closed = list(self._windows.values())
+            self._windows.clear()
+        self._summarize(closed)
+
+    def stats(self):
+        """
+        Returns the counters of the hook.
+
+        :return: dict with 'sent', 'suppressed', 'summaries' and 'windows'
+        """
+        with self._lock:
+            return {
+                'sent': self.sent,
+                'suppressed': self.suppressed,
+                'summaries': self.summaries,
+                'windows': len(self._windows),
+            }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,160 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .MessengerHook import MessengerHook
+
+
+class MessengerHookPoolResult:
+    """
+    Result of a message sent to one of the hooks of :class:`MessengerHookPool`.
+    """
+
+    def __init__(self, hook, ok=False, error=None, elapsed=0.0):
+        self.hook = hook
+        """
+        The hook the message was sent to.
+
+        :type: :class:`dooray.MessengerHook`
+        """
+        self.ok = ok
+        """
+        True if the hook has accepted the message.
+
+        :type: bool
+        """
+        self.error = error
+        """
+        The exception raised while sending the message, if any.
+
+        :type: Exception
+        """
+        self.elapsed = elapsed
+        """
+        Time in seconds taken to send the message, including the retries.
+
+        :type: float
+        """
+
+    def __repr__(self):
+        return f"{{ 'hook': '{self.hook._hook_url}', 'ok': '{self.ok}', 'error': '{self.error}', " \
+               f"'elapsed': '{self.elapsed}' }}"
+
+
+class MessengerHookPool:
+    """
+    Sends the same message to many :class:`dooray.MessengerHook`, concurrently.
+
+    The message is serialized once, and only the name and icon of each hook are put before it.
+    Up to `max_workers` requests are sent at a time, on connections kept per host and shared by all the hooks,
+    so that sending to every hook takes about as long as the slowest one.
+    The rate limit and the retries of each hook apply.
+
+    Usage::
+
+        import dooray
+
+        hooks = [dooray.MessengerHook(url, hook_name='Alert Bot') for url in HOOK_URLS]
+        with dooray.MessengerHookPool(hooks, max_workers=32) as pool:
+            results = pool.send('Service is down')
+            failed = [e.hook for e in results if not e.ok]
+    """
+
+    def __init__(self, hooks, max_workers=16):
+        """
+        :param hooks: Hooks to send the messages to
+        :type hooks: list of :class:`dooray.MessengerHook`
+        :param max_workers: Maximum number of requests sent at a time. Defaults to 16
+        :type max_workers: int, optional
+        """
+        if not isinstance(hooks, (list, tuple)):
+            raise TypeError(hooks)
+        if not all(isinstance(e, MessengerHook) for e in hooks):
+            raise TypeError(hooks)
+        if not isinstance(max_workers, int):
+            raise TypeError(max_workers)
+        if max_workers < 1:
+            raise ValueError(max_workers)
+
+        self._hooks = list(hooks)
+        self._hosts = len({urlsplit(e._hook_url).netloc for e in self._hooks}) or 1
+
+        # As in MessengerHook, each thread has its own session, and they share the adapter.
+        # The adapter keeps a connection pool per host.
+        self._adapter = HTTPAdapter(pool_connections=self._hosts, pool_maxsize=max_workers)
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='MessengerHookPool')
+
+    @property
+    def hooks(self):
+        """
+        The hooks of the pool, in the order of the results.
+
+        :type: list of :class:`dooray.MessengerHook`
+        """
+        return list(self._hooks)
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            with self._lock:
+                session.mount('https://', self._adapter)
+                session.mount('http://', self._adapter)
+                self._sessions.append(session)
+            self._local.session = session
+        return session
+
+    def _send_one(self, hook, body):
+        start = time.monotonic()
+        try:
+            ok = hook._post_serialized(self._session(), body)
+            return MessengerHookPoolResult(hook, ok=ok, elapsed=time.monotonic() - start)
+        except Exception as e:
+            return MessengerHookPoolResult(hook, error=e, elapsed=time.monotonic() - start)
+
+    def send(self, text, attachments=None):
+        """
+        Send a message to all the hooks, and wait for the results.
+
+        :param text: Message text
+        :type text: str
+        :param attachments: List of dictionaries of attachments. See :meth:`dooray.MessengerHook.send`
+        :type attachments: list, optional
+        :return: list of :class:`MessengerHookPoolResult`, in the order of the hooks
+        """
+        if not isinstance(text, str):
+            raise TypeError(text)
+        if attachments is not None and not isinstance(attachments, list):
+            raise TypeError(attachments)
+
+        payload = {'text': text}
+        if attachments is not None:
+            payload['attachments'] = attachments
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        futures = [self._executor.submit(self._send_one, hook, body) for hook in self._hooks]
+        return [e.result() for e in futures]
+
+    def close(self):
+        """
+        Stop the workers and close the pooled connections.
+        """
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._adapter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,438 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+from .MessengerHook import MessengerHook, MessengerHookAttachments
+
+_logger = logging.getLogger(__name__)
+
+POLICIES = ('block', 'drop_oldest', 'drop_newest')
+"""
+What :meth:`QueuedMessengerHook.send` does when the queue is full.
+
+* 'block': waits until a message is sent, up to `block_timeout`. The new message is dropped on timeout.
+* 'drop_oldest': drops the oldest queued message.
+* 'drop_newest': drops the new message.
+
+A message of a higher priority than some queued ones is queued anyway, dropping the oldest one of the lowest priority.
+"""
+
+PRIORITIES = ('high', 'normal', 'low')
+"""
+Priorities of the messages of :class:`QueuedMessengerHook`, from the highest.
+"""
+
+
+class MessengerHookResult:
+    """
+    Result of a message queued to :class:`QueuedMessengerHook`, passed to the callbacks.
+    """
+
+    def __init__(self, text, attachments, ok=False, error=None, dropped=False):
+        self.text = text
+        """"""
+        self.attachments = attachments
+        """"""
+        self.ok = ok
+        """
+        True if the hook has accepted the message.
+
+        :type: bool
+        """
+        self.error = error
+        """
+        The exception raised while sending the message, if any.
+
+        :type: Exception
+        """
+        self.dropped = dropped
+        """
+        True if the message was dropped because the queue was full, or closed before it was sent.
+
+        :type: bool
+        """
+
+    def __repr__(self):
+        return f"{{ 'text': '{self.text}', 'attachments': '{self.attachments}', 'ok': '{self.ok}', " \
+               f"'error': '{self.error}', 'dropped': '{self.dropped}' }}"
+
+
+class _Message:
+    def __init__(self, text, attachments, callback, lane=1):
+        self.text = text
+        self.attachments = attachments
+        self.callback = callback
+        self.lane = lane
+        self._size = None
+
+    def merged_attachments(self):
+        # The text becomes an attachment, followed by the attachments of the message
+        merged = MessengerHookAttachments.builder().add_attachment(text=self.text).create()
+        if self.attachments is not None:
+            merged.extend(self.attachments)
+        return merged
+
+    def size(self):
+        # Size of the merged attachments in the payload
+        if self._size is None:
+            self._size = len(json.dumps(self.merged_attachments()).encode('utf-8'))
+        return self._size
+
+
+class QueuedMessengerHook:
+    """
+    Sends messages of a :class:`dooray.MessengerHook` in the background.
+
+    :meth:`send` puts a message onto a bounded queue and returns at once, and worker threads send the queued
+    messages. What happens when the queue is full is chosen by `policy`. See :data:`POLICIES`.
+    The results are passed to the callbacks on the worker threads.
+
+    Each message has one of :data:`PRIORITIES`, and is queued in the lane of its priority. The workers take
+    the messages of the highest lane first, and a full queue makes room for a message by dropping one of
+    a lower lane. So that the lower lanes still move, a lane whose messages have been passed over
+    `starvation_limit` times in a row sends the next one. This leaves the 'high' lane at least
+    `starvation_limit` of every `starvation_limit` + 2 sends.
+
+    With `coalesce_window`, a worker waits up to that many seconds for more messages after taking one,
+    and sends up to `coalesce_max_items` messages in one request. Each message becomes an attachment,
+    followed by its own attachments, as long as the payload stays within `max_payload_bytes`.
+
+    Usage::
+
+        import dooray
+
+        hook = dooray.QueuedMessengerHook(dooray.MessengerHook(HOOK_URL), workers=2, policy='drop_oldest')
+        hook.send('Deployed', callback=lambda result: print(result.ok))
+        hook.send('Service is down', priority='high')
+        hook.close(timeout=5)
+
+        # During bursts, send up to 50 alerts per request
+        alerts = dooray.QueuedMessengerHook(dooray.MessengerHook(HOOK_URL), coalesce_window=2, coalesce_max_items=50)
+    """
+
+    def __init__(
+        self,
+        hook,
+        max_queue_size=1000,
+        workers=1,
+        policy='block',
+        block_timeout=None,
+        callback=None,
+        coalesce_window=None,
+        coalesce_max_items=20,
+        coalesce_text='{count} messages',
+        max_payload_bytes=65536,
+        starvation_limit=10,
+    ):
+        """
+        :param hook: Hook to send the messages with
+        :type hook: :class:`dooray.MessengerHook`
+        :param max_queue_size: Maximum number of the queued messages. Defaults to 1000
+        :type max_queue_size: int, optional
+        :param workers: Number of the worker threads. Defaults to 1, which keeps the messages in order
+        :type workers: int, optional
+        :param policy: What to do when the queue is full. See :data:`POLICIES`. Defaults to 'block'
+        :type policy: 'block' | 'drop_oldest' | 'drop_newest', optional
+        :param block_timeout: Maximum time in seconds to wait with the 'block' policy. \
+            Defaults to None, which waits forever
+        :type block_timeout: float, optional
+        :param callback: Function called with the :class:`MessengerHookResult` of every message, \
+            unless the message has its own callback. Defaults to None
+        :type callback: callable, optional
+        :param coalesce_window: Time in seconds to wait for more messages to send together. \
+            Defaults to None, which sends every message on its own
+        :type coalesce_window: float, optional
+        :param coalesce_max_items: Maximum number of messages sent together. Defaults to 20
+        :type coalesce_max_items: int, optional
+        :param coalesce_text: Text of the messages sent together, formatted with `count`. \
+            Defaults to '{count} messages'
+        :type coalesce_text: str, optional
+        :param max_payload_bytes: Maximum size of the attachments of the messages sent together. \
+            A larger message is still sent on its own. Defaults to 65536
+        :type max_payload_bytes: int, optional
+        :param starvation_limit: Number of messages of the higher lanes sent in a row, \
+            after which a waiting message of a lower lane is sent. Defaults to 10
+        :type starvation_limit: int, optional
+        """
+        if not isinstance(hook, MessengerHook):
+            raise TypeError(hook)
+        if not isinstance(max_queue_size, int):
+            raise TypeError(max_queue_size)
+        if not isinstance(workers, int):
+            raise TypeError(workers)
+        if policy not in POLICIES:
+            raise ValueError(policy)
+        if max_queue_size < 1:
+            raise ValueError(max_queue_size)
+        if workers < 1:
+            raise ValueError(workers)
+        if coalesce_window is not None and not isinstance(coalesce_window, (int, float)):
+            raise TypeError(coalesce_window)
+        if not isinstance(coalesce_max_items, int):
+            raise TypeError(coalesce_max_items)
+        if not isinstance(coalesce_text, str):
+            raise TypeError(coalesce_text)
+        if not isinstance(max_payload_bytes, int):
+            raise TypeError(max_payload_bytes)
+        if not isinstance(starvation_limit, int):
+            raise TypeError(starvation_limit)
+        if starvation_limit < 1:
+            raise ValueError(starvation_limit)
+
+        self._hook = hook
+        self._max_queue_size = max_queue_size
+        self._policy = policy
+        self._block_timeout = block_timeout
+        self._callback = callback
+        self._coalesce_window = coalesce_window
+        self._coalesce_max_items = coalesce_max_items
+        self._coalesce_text = coalesce_text
+        self._max_payload_bytes = max_payload_bytes
+        self._starvation_limit = starvation_limit
+
+        # A queue per priority, and the number of times each one has been passed over
+        self._lanes = [deque() for _ in PRIORITIES]
+        self._skipped = [0 for _ in PRIORITIES]
+        self._queued = 0
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self.sent = 0
+        """
+        Number of messages accepted by the hook.
+
+        :type: int
+        """
+        self.failed = 0
+        """
+        Number of messages rejected by the hook, or failed with an exception.
+
+        :type: int
+        """
+        self.dropped = 0
+        """
+        Number of messages dropped without being sent.
+
+        :type: int
+        """
+        self.requests = 0
+        """
+        Number of requests sent to the hook. Less than the number of messages if they are coalesced.
+
+        :type: int
+        """
+
+        self._workers = [
+            threading.Thread(target=self._work, name=f'QueuedMessengerHook-{i}', daemon=True) for i in range(workers)
+        ]
+        for t in self._workers:
+            t.start()
+
+    def send(self, text, attachments=None, callback=None, priority='normal'):
+        """
+        Queue a message to the hook.
+
+        :param text: Message text
+        :type text: str
+        :param attachments: List of dictionaries of attachments. See :meth:`dooray.MessengerHook.send`
+        :type attachments: list, optional
+        :param callback: Function called with the :class:`MessengerHookResult` of this message. \
+            Defaults to the callback of the queue
+        :type callback: callable, optional
+        :param priority: Priority of the message. See :data:`PRIORITIES`. Defaults to 'normal'
+        :type priority: 'high' | 'normal' | 'low', optional
+        :return: True if queued, False if dropped
+        """
+        if not isinstance(text, str):
+            raise TypeError(text)
+        if attachments is not None and not isinstance(attachments, list):
+            raise TypeError(attachments)
+        if priority not in PRIORITIES:
+            raise ValueError(priority)
+
+        message = _Message(text, attachments, callback, PRIORITIES.index(priority))
+        dropped = None
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('QueuedMessengerHook is closed')
+            if self._queued >= self._max_queue_size:
+                lowest = max(i for i, e in enumerate(self._lanes) if e)
+                if lowest > message.lane:
+                    dropped = self._remove(lowest)
+                elif self._policy == 'block':
+                    deadline = None if self._block_timeout is None else time.monotonic() + self._block_timeout
+                    while self._queued >= self._max_queue_size and not self._closed:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    if self._queued >= self._max_queue_size or self._closed:
+                        dropped = message
+                elif self._policy == 'drop_oldest' and lowest == message.lane:
+                    dropped = self._remove(lowest)
+                else:
+                    dropped = message
+            if dropped is not message:
+                self._lanes[message.lane].append(message)
+                self._queued += 1
+                self._cond.notify_all()
+            if dropped is not None:
+                self.dropped += 1
+
+        if dropped is not None:
+            self._notify(dropped, MessengerHookResult(dropped.text, dropped.attachments, dropped=True))
+        return dropped is not message
+
+    def _remove(self, lane):
+        # Called with the lock held. Removes the oldest message of the lane
+        self._queued -= 1
+        return self._lanes[lane].popleft()
+
+    def _next_lane(self):
+        # Called with the lock held, when a message is queued. The highest lane with messages,
+        # unless a lower one has been passed over `starvation_limit` times
+        lanes = [i for i, e in enumerate(self._lanes) if e]
+        return next((i for i in lanes[1:] if self._skipped[i] >= self._starvation_limit), lanes[0])
+
+    def _pop(self):
+        # Called with the lock held, when a message is queued
+        lane = self._next_lane()
+        for i, e in enumerate(self._lanes):
+            if i > lane and e:
+                self._skipped[i] += 1
+        self._skipped[lane] = 0
+        return self._remove(lane)
+
+    def _take(self):
+        # Returns the messages to send together, or None when closed
+        with self._cond:
+            while not self._queued and not self._closed:
+                self._cond.wait()
+            if not self._queued:
+                return None
+            batch = [self._pop()]
+            self._in_flight += 1
+            # Room for the blocked senders
+            self._cond.notify_all()
+
+            if self._coalesce_window is not None:
+                size = batch[0].size()
+                deadline = time.monotonic() + self._coalesce_window
+                while len(batch) < self._coalesce_max_items:
+                    if not self._queued:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0 or self._closed:
+                            break
+                        self._cond.wait(remaining)
+                        continue
+                    if size + self._lanes[self._next_lane()][0].size() > self._max_payload_bytes:
+                        break
+                    message = self._pop()
+                    batch.append(message)
+                    size += message.size()
+                    self._in_flight += 1
+                    self._cond.notify_all()
+            return batch
+
+    def _work(self):
+        while True:
+            batch = self._take()
+            if batch is None:
+                return
+
+            if len(batch) == 1:
+                text, attachments = batch[0].text, batch[0].attachments
+            else:
+                text = self._coalesce_text.format(count=len(batch))
+                attachments = [e for message in batch for e in message.merged_attachments()]
+            ok = False
+            error = None
+            try:
+                ok = self._hook.send(text, attachments)
+            except Exception as e:
+                error = e
+
+            with self._cond:
+                self.requests += 1
+                if ok:
+                    self.sent += len(batch)
+                else:
+                    self.failed += len(batch)
+            for message in batch:
+                self._notify(message, MessengerHookResult(message.text, message.attachments, ok=ok, error=error))
+
+            with self._cond:
+                self._in_flight -= len(batch)
+                self._cond.notify_all()
+
+    def _notify(self, message, result):
+        callback = message.callback or self._callback
+        if callback is None:
+            return
+        try:
+            callback(result)
+        except Exception:
+            _logger.exception('Callback of QueuedMessengerHook failed')
+
+    def flush(self, timeout=None):
+        """
+        Wait until all the queued messages are sent.
+
+        :param timeout: Maximum time to wait in seconds. Defaults to None, which waits forever
+        :type timeout: float, optional
+        :return: True if all the messages are sent, False on timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queued and self._in_flight == 0, timeout)
+
+    def close(self, timeout=None):
+        """
+        Stop accepting messages, send the queued ones and stop the workers.
+        Messages still queued after `timeout` are dropped.
+
+        :param timeout: Maximum time to wait in seconds. Defaults to None, which waits forever
+        :type timeout: float, optional
+        :return: True if all the messages are sent, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            remaining = [message for lane in self._lanes for message in lane]
+            for lane in self._lanes:
+                lane.clear()
+            self._queued = 0
+            self.dropped += len(remaining)
+            self._cond.notify_all()
+        for message in remaining:
+            self._notify(message, MessengerHookResult(message.text, message.attachments, dropped=True))
+        for t in self._workers:
+            t.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return flushed
+
+    def stats(self):
+        """
+        Returns the counters of the queue.
+
+        :return: dict with 'queued', 'in_flight', 'sent', 'failed', 'dropped', 'requests', \
+            and 'lanes', the number of the queued messages of each priority
+        """
+        with self._cond:
+            return {
+                'queued': self._queued,
+                'in_flight': self._in_flight,
+                'sent': self.sent,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'requests': self.requests,
+                'lanes': {priority: len(lane) for priority, lane in zip(PRIORITIES, self._lanes)},
+            }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
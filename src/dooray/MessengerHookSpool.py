@@ -0,0 +1,344 @@
+import json
+import os
+import threading
+import time
+
+from .MessengerHook import MessengerHook
+
+
+class MessengerHookSpool:
+    """
+    Sends messages of a :class:`dooray.MessengerHook`, and keeps the undelivered ones on disk.
+
+    A message which can not be delivered because the hook is unreachable, fails with a 5xx status,
+    or still throttles it after the retries, is appended to a spool file, one JSON line per message.
+    The spooled messages are sent again in order, by :meth:`replay` or the background thread,
+    waiting longer after each failure. New messages are spooled behind them to keep the order.
+    The position of the next message is kept in an offset file, so that a restarted process resumes
+    where the previous one stopped.
+
+    Messages which the hook rejects with another status, e.g. 400 or 404, would be rejected again, so they are
+    dropped instead of being spooled or blocking the ones behind them.
+    Messages older than `max_age` are dropped instead of being sent, and new messages are dropped
+    while the undelivered ones take `max_bytes` of the spool. Delivered messages are removed from the file
+    once they take more than half of it.
+
+    A spool directory must be used by one process at a time.
+
+    Usage::
+
+        import dooray
+
+        with dooray.MessengerHookSpool(dooray.MessengerHook(HOOK_URL), '/var/spool/my-bot') as hook:
+            hook.send('Backup finished')
+    """
+
+    SPOOL_FILE = 'spool.jsonl'
+    """"""
+    OFFSET_FILE = 'spool.offset'
+    """"""
+
+    def __init__(
+        self,
+        hook,
+        directory,
+        max_bytes=10 * 1024 * 1024,
+        max_age=24 * 60 * 60,
+        backoff=1.0,
+        max_backoff=300.0,
+        replay_interval=5.0,
+        clock=time.time,
+    ):
+        """
+        :param hook: Hook to send the messages with
+        :type hook: :class:`dooray.MessengerHook`
+        :param directory: Directory of the spool. It is created if it does not exist
+        :type directory: str
+        :param max_bytes: Maximum size of the undelivered messages in the spool. Defaults to 10 MiB
+        :type max_bytes: int, optional
+        :param max_age: Maximum age in seconds of the undelivered messages. Defaults to 1 day
+        :type max_age: int or float, optional
+        :param backoff: Time in seconds to wait before replaying after the first failure. \
+            It doubles after each failure. Defaults to 1
+        :type backoff: float, optional
+        :param max_backoff: Maximum time in seconds to wait before replaying. Defaults to 300
+        :type max_backoff: float, optional
+        :param replay_interval: Interval in seconds of the background thread replaying the spool. \
+            Defaults to 5. If None, no thread is started and :meth:`replay` must be called.
+        :type replay_interval: float, optional
+        :param clock: Function returning the current time in seconds. It is stored in the spool, \
+            so it must survive restarts. Defaults to :func:`time.time`
+        :type clock: callable, optional
+        """
+        if not isinstance(hook, MessengerHook):
+            raise TypeError(hook)
+        if not isinstance(directory, (str, os.PathLike)):
+            raise TypeError(directory)
+        if not isinstance(max_bytes, int):
+            raise TypeError(max_bytes)
+        if not isinstance(max_age, (int, float)):
+            raise TypeError(max_age)
+        if replay_interval is not None and not isinstance(replay_interval, (int, float)):
+            raise TypeError(replay_interval)
+
+        self._hook = hook
+        self._max_bytes = max_bytes
+        self._max_age = max_age
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._clock = clock
+
+        os.makedirs(directory, exist_ok=True)
+        self._spool_path = os.path.join(directory, MessengerHookSpool.SPOOL_FILE)
+        self._offset_path = os.path.join(directory, MessengerHookSpool.OFFSET_FILE)
+        self._lock = threading.RLock()
+
+        self._offset = self._read_offset()
+        self._size = self._truncate_torn_line()
+        if self._offset > self._size:
+            self._write_offset(0)
+        self._next_replay = 0.0
+        self._current_backoff = backoff
+
+        self.delivered = 0
+        """
+        Number of messages accepted by the hook, including the replayed ones.
+
+        :type: int
+        """
+        self.spooled = 0
+        """
+        Number of messages written to the spool.
+
+        :type: int
+        """
+        self.dropped = 0
+        """
+        Number of messages dropped because of `max_bytes` or `max_age`, or rejected by the hook.
+
+        :type: int
+        """
+
+        self._closed = threading.Event()
+        self._thread = None
+        if replay_interval is not None:
+            self._thread = threading.Thread(
+                target=self._replay_periodically, args=(replay_interval,), name='MessengerHookSpool', daemon=True
+            )
+            self._thread.start()
+
+    def _truncate_torn_line(self):
+        # A crash while appending may leave a partly written last line. It is removed, so that the next
+        # message does not get appended to it. Returns the size of the spool.
+        if not os.path.exists(self._spool_path):
+            return 0
+        with open(self._spool_path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            end = size
+            while end > 0:
+                f.seek(max(0, end - 65536))
+                chunk = f.read(end - f.tell())
+                i = chunk.rfind(b'\n')
+                if i >= 0:
+                    end = end - len(chunk) + i + 1
+                    break
+                end -= len(chunk)
+            if end != size:
+                f.truncate(end)
+        return end
+
+    def _read_offset(self):
+        try:
+            with open(self._offset_path, 'r') as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_offset(self, offset):
+        tmp = self._offset_path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(str(offset))
+        os.replace(tmp, self._offset_path)
+        self._offset = offset
+
+    def pending_bytes(self):
+        """
+        Returns the size of the undelivered messages in the spool.
+
+        :return: int
+        """
+        with self._lock:
+            return self._size - self._offset
+
+    def _deliver(self, text, attachments):
+        # Returns the status code of the hook, or None if it could not be reached
+        try:
+            return self._hook._send_status(text, attachments)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _is_outage(status_code):
+        # Outages are spooled and replayed later. The other failures are rejections of the message itself.
+        return status_code is None or status_code >= 500 or status_code in MessengerHook.RETRY_STATUS_CODES
+
+    def _append(self, text, attachments):
+        record = {'t': self._clock(), 'text': text}
+        if attachments is not None:
+            record['attachments'] = attachments
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+        if self._size - self._offset + len(line) > self._max_bytes:
+            self.dropped += 1
+            return False
+        with open(self._spool_path, 'ab') as f:
+            try:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            except OSError:
+                # Do not leave a partly written line in front of the next message
+                f.truncate(self._size)
+                raise
+        self._size += len(line)
+        self.spooled += 1
+        return True
+
+    def send(self, text, attachments=None):
+        """
+        Send a message to the hook, or spool it if the hook does not accept it or older messages are spooled.
+
+        :param text: Message text
+        :type text: str
+        :param attachments: List of dictionaries of attachments. See :meth:`dooray.MessengerHook.send`
+        :type attachments: list, optional
+        :return: True if sent, False if spooled, dropped or rejected
+        """
+        if not isinstance(text, str):
+            raise TypeError(text)
+        if attachments is not None and not isinstance(attachments, list):
+            raise TypeError(attachments)
+
+        with self._lock:
+            if self._size > self._offset:
+                self.replay()
+            if self._size == self._offset:
+                status_code = self._deliver(text, attachments)
+                if status_code == 200:
+                    self.delivered += 1
+                    return True
+                if not MessengerHookSpool._is_outage(status_code):
+                    self.dropped += 1
+                    return False
+                self._failed()
+            self._append(text, attachments)
+            return False
+
+    def _failed(self):
+        self._next_replay = self._clock() + self._current_backoff
+        self._current_backoff = min(self._current_backoff * 2, self._max_backoff)
+
+    def replay(self, force=False):
+        """
+        Send the spooled messages in order, until the hook is down again. Rejected messages are dropped.
+        Nothing is sent while waiting after a failure, unless `force` is true.
+
+        :param force: Replay without waiting after a failure. Defaults to False
+        :type force: bool, optional
+        :return: Number of the messages sent
+        """
+        with self._lock:
+            if self._size == self._offset or (not force and self._clock() < self._next_replay):
+                return 0
+
+            sent = 0
+            offset = self._offset
+            with open(self._spool_path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        # Partly written by a crashed process
+                        offset += len(line)
+                        break
+                    try:
+                        record = json.loads(line)
+                        created_at, text, attachments = record['t'], record['text'], record.get('attachments')
+                        if not isinstance(created_at, (int, float)) or not isinstance(text, str):
+                            raise ValueError(record)
+                        if attachments is not None and not isinstance(attachments, list):
+                            raise ValueError(record)
+                    except (ValueError, KeyError, TypeError, AttributeError):
+                        # Not a record of the spool
+                        offset += len(line)
+                        continue
+                    if self._clock() - created_at > self._max_age:
+                        self.dropped += 1
+                    else:
+                        status_code = self._deliver(text, attachments)
+                        if status_code == 200:
+                            sent += 1
+                            self.delivered += 1
+                        elif MessengerHookSpool._is_outage(status_code):
+                            self._failed()
+                            break
+                        else:
+                            self.dropped += 1
+                    offset += len(line)
+                    self._write_offset(offset)
+            self._write_offset(offset)
+            if offset >= self._size:
+                self._current_backoff = self._backoff
+            self._compact()
+            return sent
+
+    def _compact(self):
+        # Called with the lock held. Removes the delivered messages once they take half of the file.
+        if self._offset == 0 or self._offset * 2 < self._size:
+            return
+        tmp = self._spool_path + '.tmp'
+        with open(self._spool_path, 'rb') as src, open(tmp, 'wb') as dst:
+            src.seek(self._offset)
+            while True:
+                chunk = src.read(65536)
+                if not chunk:
+                    break
+                dst.write(chunk)
+            dst.flush()
+            os.fsync(dst.fileno())
+        # The offset is reset first, so that a crash in between sends some messages twice rather than losing them
+        delivered = self._offset
+        self._write_offset(0)
+        os.replace(tmp, self._spool_path)
+        self._size -= delivered
+
+    def _replay_periodically(self, interval):
+        while not self._closed.wait(interval):
+            self.replay()
+
+    def close(self):
+        """
+        Stop the background thread. The spooled messages are kept for the next time.
+        """
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        """
+        Returns the counters of the spool.
+
+        :return: dict with 'delivered', 'spooled', 'dropped' and 'pending_bytes'
+        """
+        with self._lock:
+            return {
+                'delivered': self.delivered,
+                'spooled': self.spooled,
+                'dropped': self.dropped,
+                'pending_bytes': self._size - self._offset,
+            }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,9 +1,85 @@
 import copy
+import json
 
 import dooray.DoorayObjects
 from dooray.Member import Member
 
 
+def _build(interner, cls, data, key=None):
+    return cls(data) if interner is None else interner.intern(cls, data, key)
+
+
+def _intern_string(interner, s):
+    return s if interner is None else interner.intern_string(s)
+
+
+def _build_post_user(interner, data):
+    if interner is None:
+        return PostUser(data)
+    if 'member' in data:
+        key = ('member', data['member']['organizationMemberId'])
+    elif 'emailUser' in data:
+        key = ('emailUser', data['emailUser']['emailAddress'])
+    else:
+        return PostUser(data)
+    return interner.intern(PostUser, data, key)
+
+
+def _json_value(value):
+    if hasattr(value, 'to_json_dict'):
+        return value._json_key(), value.to_json_dict
+    if isinstance(value, list):
+        return tuple(value), lambda: list(value)
+    # bool is a subclass of int; keep True and 1 apart
+    return (type(value), value), lambda: value
+
+
+def _to_json_dict(obj, fields):
+    d = {}
+    for attr, json_key in fields:
+        value = getattr(obj, attr, None)
+        if value is not None:
+            d[json_key] = _json_value(value)[1]()
+    return d
+
+
+def _to_json_bytes(obj, fields):
+    # Each field is cached as its encoded '"key":value' fragment, along with a key to tell if it has changed.
+    # The cache is shared by the forks of an object, so the objects created from one builder
+    # only encode the fields which differ from the previous one.
+    cache = obj.__dict__.setdefault('_json_cache', {})
+    fragments = []
+    for attr, json_key in fields:
+        value = getattr(obj, attr, None)
+        if value is None:
+            continue
+        key, to_json = _json_value(value)
+        entry = cache.get(json_key)
+        if entry is None or entry[0] != key:
+            fragment = json.dumps({json_key: to_json()}, ensure_ascii=False, separators=(',', ':'))
+            entry = (key, fragment[1:-1].encode('utf-8'))
+            cache[json_key] = entry
+        fragments.append(entry[1])
+    return b'{' + b','.join(fragments) + b'}'
+
+
+class _ReadOnly:
+    # The posts created from one builder share their bodies and recipients,
+    # so these can not be changed once built; replace them instead.
+    def _freeze(self):
+        object.__setattr__(self, '_frozen', True)
+
+    def __setattr__(self, name, value):
+        if self.__dict__.get('_frozen', False):
+            raise AttributeError(f"'{type(self).__name__}' object is read-only")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        if self.__dict__.get('_frozen', False):
+            raise AttributeError(f"'{type(self).__name__}' object is read-only")
+        object.__delattr__(self, name)
+
+
 class Project:
     def __init__(self, data):
         self.id = data['id']
@@ -70,7 +146,7 @@ class Workflow:
                f"'workflow_class': '{self.workflow_class}', 'names': '{[e for e in self.names]}' }}"
 
 
-class EmailAddress:
+class EmailAddress(_ReadOnly):
     def __init__(self, data):
         self.id = data['id'] if 'id' in data else None
         """"""
@@ -78,10 +154,14 @@ class EmailAddress:
         """"""
         self.email_address = data['emailAddress']
         """"""
+        self._freeze()
 
     def __repr__(self):
         return f"{{ 'id': '{self.id}', 'name': '{self.name}', 'email_address': '{self.email_address}' }}"
 
+    def _json_key(self):
+        return self.id, self.name, self.email_address
+
     def to_json_dict(self):
         d = {
             'name': self.name,
@@ -108,6 +188,20 @@ class Tag:
 
 
 class Milestone:
+    COLUMNS = {
+        'id': ('str', lambda e: e.id),
+        'name': ('str', lambda e: e.name),
+        'status': ('str', lambda e: e.status),
+        'started_at': ('timestamp', lambda e: e.started_at),
+        'ended_at': ('timestamp', lambda e: e.ended_at),
+        'closed_at': ('timestamp', lambda e: e.closed_at),
+        'created_at': ('timestamp', lambda e: e.created_at),
+        'updated_at': ('timestamp', lambda e: e.updated_at),
+    }
+    """
+    Columns for :func:`dooray.DoorayObjects.to_columns`, as a dict of column name to (type, getter).
+    """
+
     def __init__(self, data):
         self.id = data['id']
         """"""
@@ -136,16 +230,20 @@ class Milestone:
                f"'updated_at': '{self.updated_at}'}}"
 
 
-class ProjectMember:
+class ProjectMember(_ReadOnly):
     def __init__(self, data):
         self.organization_member_id = data['organizationMemberId']
         """"""
         self.role = data['role'] if 'role' in data else None
         """"""
+        self._freeze()
 
     def __repr__(self):
         return f"{{ 'organizationMemberId': '{self.organization_member_id}', 'role': '{self.role}' }}"
 
+    def _json_key(self):
+        return self.organization_member_id, self.role
+
     def to_json_dict(self):
         d = {'organizationMemberId': self.organization_member_id}
         if self.role is not None:
@@ -191,9 +289,9 @@ class MemberGroupMember:
 
 
 class BasePost:
-    def __init__(self, data=None):
+    def __init__(self, data=None, interner=None):
         if data is not None:
-            self.users = PostUsers(data['users']) if 'users' in data else None
+            self.users = PostUsers(data['users'], interner) if 'users' in data else None
             """
             :type: :class:`dooray.Project.PostUsers`
             """
@@ -214,11 +312,27 @@ class BasePost:
             self.due_date_flag = data['dueDateFlag'] if 'dueDateFlag' in data else None
             # hightest, high, normal, low, lowest, none
             # TODO: hightest is correct?
-            self.priority = data['priority'] if 'priority' in data else None
+            self.priority = _intern_string(interner, data['priority']) if 'priority' in data else None
             """
             The priority of the post or the template.
             """
 
+    def fork(self):
+        """
+        Returns a copy which shares the unchanged sub-structures with this object.
+
+        The lists of recipients and tag ids are copied, while the recipients and the bodies are shared.
+        To change a shared recipient or body, replace it instead of modifying it in place.
+        """
+        forked = copy.copy(self)
+        users = getattr(self, 'users', None)
+        if users is not None:
+            forked.users = users.fork()
+        tag_ids = getattr(self, 'tag_ids', None)
+        if tag_ids is not None:
+            forked.tag_ids = list(tag_ids)
+        return forked
+
     def __repr__(self):
         ret = f"'users': '{self.users}', 'body': '{self.body}', 'subject': '{self.subject}', " \
               f"'due_date': '{self.due_date}', 'due_date_flag': '{self.due_date_flag}', 'priority': '{self.priority}'"
@@ -226,8 +340,24 @@ class BasePost:
 
 
 class WritePost(BasePost):
+    # (attribute, JSON key) of the request body, in order
+    _JSON_FIELDS = (
+        ('users', 'users'),
+        ('body', 'body'),
+        ('subject', 'subject'),
+        ('due_date', 'dueDate'),
+        ('due_date_flag', 'dueDateFlag'),
+        ('milestone_id', 'milestoneId'),
+        ('tag_ids', 'tagIds'),
+        ('priority', 'priority'),
+        ('version', 'version'),
+        ('parent_post_id', 'parentPostId'),
+    )
+
     def __init__(self, data=None):
         super().__init__(data)
+        # Created here so that the forks share it. See _to_json_bytes()
+        self._json_cache = {}
         if data is not None:
             self.parent_post_id = data['parentPostId']
             self.version = data['version'] if 'version' in data else None
@@ -240,28 +370,16 @@ class WritePost(BasePost):
                f"'milestone_id': '{self.milestone_id}', 'tag_ids': '{self.tag_ids}' }}"
 
     def to_json_dict(self):
-        d = {}
-        if hasattr(self, 'users') and self.users is not None:
-            d['users'] = self.users.to_json_dict()
-        if hasattr(self, 'body') and self.body is not None:
-            d['body'] = self.body.to_json_dict()
-        if hasattr(self, 'subject') and self.subject is not None:
-            d['subject'] = self.subject
-        if hasattr(self, 'due_date') and self.due_date is not None:
-            d['dueDate'] = self.due_date
-        if hasattr(self, 'due_date_flag') and self.due_date_flag is not None:
-            d['dueDateFlag'] = self.due_date_flag
-        if hasattr(self, 'milestone_id') and self.milestone_id is not None:
-            d['milestoneId'] = self.milestone_id
-        if hasattr(self, 'tag_ids') and self.tag_ids is not None:
-            d['tagIds'] = [tag_id for tag_id in self.tag_ids]
-        if hasattr(self, 'priority') and self.priority is not None:
-            d['priority'] = self.priority
-        if hasattr(self, 'version') and self.version is not None:
-            d['version'] = self.version
-        if hasattr(self, 'parent_post_id') and self.parent_post_id is not None:
-            d['parentPostId'] = self.parent_post_id
-        return d
+        return _to_json_dict(self, WritePost._JSON_FIELDS)
+
+    def to_json_bytes(self):
+        """
+        Returns the request body encoded in JSON.
+
+        The encoded fields are cached and shared with the forks of this post,
+        so that the posts created from one builder only pay for the fields which differ.
+        """
+        return _to_json_bytes(self, WritePost._JSON_FIELDS)
 
 
 class PostBuilder:
@@ -289,10 +407,19 @@ class PostBuilder:
         """
         Create a new post object to be written.
 
-        Returns a deep copy of the internal state, allowing the builder
+        Returns a copy of the internal state, allowing the builder
         to be reused as a template for creating multiple similar objects.
+        The copy shares the recipients and the body with the builder. See :meth:`dooray.Project.BasePost.fork`.
+        """
+        return self._post.fork()
+
+    def fork(self):
+        """
+        Create a new builder which starts from the current state of this builder.
         """
-        return copy.deepcopy(self._post)
+        forked = PostBuilder()
+        forked._post = self._post.fork()
+        return forked
 
     def set_parent_post_id(self, parent_post_id):
         """
@@ -456,11 +583,30 @@ class PostBuilder:
 
 
 class ReadPost(BasePost):
-    def __init__(self, data):
-        super().__init__(data)
-        self.id = data['id']
+    COLUMNS = {
+        'id': ('str', lambda e: e.id),
+        'number': ('int', lambda e: e.number),
+        'subject': ('str', lambda e: e.subject),
+        'priority': ('str', lambda e: e.priority),
+        'closed': ('bool', lambda e: e.closed),
+        'workflow_class': ('str', lambda e: e.workflow_class),
+        'workflow_id': ('str', lambda e: e.workflow.id if e.workflow is not None else None),
+        'milestone_id': ('str', lambda e: e.milestone.id if e.milestone is not None else None),
+        'tag_ids': ('str_list', lambda e: [tag.id for tag in e.tags]),
+        'due_date': ('timestamp', lambda e: e.due_date),
+        'created_at': ('timestamp', lambda e: e.created_at),
+        'updated_at': ('timestamp', lambda e: e.updated_at),
+        'closed_at': ('timestamp', lambda e: e.closed_at),
+    }
+    """
+    Columns for :func:`dooray.DoorayObjects.to_columns`, as a dict of column name to (type, getter).
+    """
+
+    def __init__(self, data, interner=None):
+        super().__init__(data, interner)
+        self.id = _intern_string(interner, data['id'])
         """"""
-        self.project = Project(data['project']) if 'project' in data else None
+        self.project = _build(interner, Project, data['project']) if 'project' in data else None
         """
         :type: :class:`dooray.Project.Project`
         """
@@ -470,28 +616,31 @@ class ReadPost(BasePost):
         """"""
         self.closed_at = data['closedAt'] if 'closedAt' in data else None
         """"""
+        self.created_at = data['createdAt'] if 'createdAt' in data else None
+        """"""
         self.updated_at = data['updatedAt'] if 'updatedAt' in data else None
         """"""
         self.number = data['number']
         """"""
-        self.parent = ReadPost(data['parent']) if 'parent' in data else None
+        self.parent = ReadPost(data['parent'], interner) if 'parent' in data else None
         """
         :type: :class:`dooray.Project.ReadPost`
         """
-        self.workflow_class = data['workflowClass'] if 'workflowClass' in data else None
+        self.workflow_class = _intern_string(interner, data['workflowClass']) if 'workflowClass' in data else None
         """
         The workflow class of the post. Possible values are `registered`, `working` and `closed`
         """
-        self.workflow = Workflow(data['workflow']) if 'workflow' in data else None
+        self.workflow = _build(interner, Workflow, data['workflow']) if 'workflow' in data else None
         """
         :type: :class:`dooray.Project.Workflow`
         """
         # 'milestone' is not returned as null if not set
-        self.milestone = Milestone(data['milestone']) if 'milestone' in data and data['milestone'] is not None else None
+        self.milestone = _build(interner, Milestone, data['milestone']) \
+            if 'milestone' in data and data['milestone'] is not None else None
         """
         :type: :class:`dooray.Project.Milestone`
         """
-        self.tags = [Tag(tag) for tag in data['tags']] if 'tags' in data else []
+        self.tags = [_build(interner, Tag, tag) for tag in data['tags']] if 'tags' in data else []
         """
         :type: list of :class:`dooray.Project.Tag`
         """
@@ -499,15 +648,32 @@ class ReadPost(BasePost):
     def __repr__(self):
         return f"{{ {super().__repr__()}, 'id': '{self.id}', 'project': '{self.project}' " \
                f"'task_number': '{self.task_number}', 'closed': '{self.closed}', " \
-               f"'closed_at': '{self.closed_at}', 'updated_at': '{self.updated_at}', " \
-               f"'number': '{self.number}', 'parent': '{self.parent}', " \
+               f"'closed_at': '{self.closed_at}', 'created_at': '{self.created_at}', " \
+               f"'updated_at': '{self.updated_at}', 'number': '{self.number}', 'parent': '{self.parent}', " \
                f"'workflow_class': '{self.workflow_class}', 'workflow': '{self.workflow}'" \
                f"'milestone': '{self.milestone}', 'tags': '{self.tags}' }}"
 
 
 class WriteTemplate(BasePost):
+    # (attribute, JSON key) of the request body, in order
+    _JSON_FIELDS = (
+        ('template_name', 'templateName'),
+        ('users', 'users'),
+        ('body', 'body'),
+        ('guide', 'guide'),
+        ('subject', 'subject'),
+        ('due_date', 'dueDate'),
+        ('due_date_flag', 'dueDateFlag'),
+        ('milestone_id', 'milestoneId'),
+        ('tag_ids', 'tagIds'),
+        ('priority', 'priority'),
+        ('is_default', 'isDefault'),
+    )
+
     def __init__(self, data=None):
         super().__init__(data)
+        # Created here so that the forks share it. See _to_json_bytes()
+        self._json_cache = {}
         if data is not None:
             self.template_name = data['templateName']
             self.guide = PostBody(data['guide'])
@@ -523,28 +689,20 @@ class WriteTemplate(BasePost):
 
     def to_json_dict(self):
         # Only 'templateName' is essential, the others are optional
-        d = {'templateName': self.template_name}
-        if hasattr(self, 'users') and self.users is not None:
-            d['users'] = self.users.to_json_dict()
-        if hasattr(self, 'body') and self.body is not None:
-            d['body'] = self.body.to_json_dict()
-        if hasattr(self, 'guide') and self.guide is not None:
-            d['guide'] = self.guide.to_json_dict()
-        if hasattr(self, 'subject') and self.subject is not None:
-            d['subject'] = self.subject
-        if hasattr(self, 'due_date') and self.due_date is not None:
-            d['dueDate'] = self.due_date
-        if hasattr(self, 'due_date_flag') and self.due_date_flag is not None:
-            d['dueDateFlag'] = self.due_date_flag
-        if hasattr(self, 'milestone_id') and self.milestone_id is not None:
-            d['milestoneId'] = self.milestone_id
-        if hasattr(self, 'tag_ids') and self.tag_ids is not None:
-            d['tagIds'] = [tag_id for tag_id in self.tag_ids]
-        if hasattr(self, 'priority') and self.priority is not None:
-            d['priority'] = self.priority
-        if hasattr(self, 'is_default') and self.is_default is not None:
-            d['isDefault'] = self.is_default
-        return d
+        if not hasattr(self, 'template_name'):
+            raise AttributeError('template_name')
+        return _to_json_dict(self, WriteTemplate._JSON_FIELDS)
+
+    def to_json_bytes(self):
+        """
+        Returns the request body encoded in JSON.
+
+        The encoded fields are cached and shared with the forks of this template,
+        so that the templates created from one builder only pay for the fields which differ.
+        """
+        if not hasattr(self, 'template_name'):
+            raise AttributeError('template_name')
+        return _to_json_bytes(self, WriteTemplate._JSON_FIELDS)
 
 
 class TemplateBuilder:
@@ -572,10 +730,20 @@ class TemplateBuilder:
         """
         Create a new template object to be written.
 
-        Returns a deep copy of the internal state, allowing the builder
+        Returns a copy of the internal state, allowing the builder
         to be reused as a template for creating multiple similar objects.
+        The copy shares the recipients, the body and the guide with the builder.
+        See :meth:`dooray.Project.BasePost.fork`.
+        """
+        return self._template.fork()
+
+    def fork(self):
+        """
+        Create a new builder which starts from the current state of this builder.
         """
-        return copy.deepcopy(self._template)
+        forked = TemplateBuilder()
+        forked._template = self._template.fork()
+        return forked
 
     def set_template_name(self, template_name):
         """
@@ -752,11 +920,11 @@ class TemplateBuilder:
 
 
 class ReadTemplate(BasePost):
-    def __init__(self, data):
-        super().__init__(data)
-        self.id = data['id']
+    def __init__(self, data, interner=None):
+        super().__init__(data, interner)
+        self.id = _intern_string(interner, data['id'])
         """"""
-        self.project = Project(data['project'])
+        self.project = _build(interner, Project, data['project'])
         """
         :type: :class:`dooray.Project.Project`
         """
@@ -771,11 +939,11 @@ class ReadTemplate(BasePost):
         :type: bool
         """
         # 'milestone' is not returned if no milestones set
-        self.milestone = Milestone(data['milestone']) if 'milestone' in data else None
+        self.milestone = _build(interner, Milestone, data['milestone']) if 'milestone' in data else None
         """
         :type: :class:`dooray.Project.Milestone`
         """
-        self.tags = [Tag(tag) for tag in data['tags']]
+        self.tags = [_build(interner, Tag, tag) for tag in data['tags']]
         """
         :type: list of :class:`dooray.Project.Tag`
         """
@@ -788,18 +956,33 @@ class ReadTemplate(BasePost):
 
 
 class PostLog:
-    def __init__(self, data):
-        self.id = data['id']
+    COLUMNS = {
+        'id': ('str', lambda e: e.id),
+        'post_id': ('str', lambda e: e.post.id),
+        'type': ('str', lambda e: e.type),
+        'subtype': ('str', lambda e: e.subtype),
+        'creator_member_id': (
+            'str', lambda e: e.creator.member.organization_member_id if e.creator.member is not None else None
+        ),
+        'created_at': ('timestamp', lambda e: e.created_at),
+        'modified_at': ('timestamp', lambda e: e.modified_at),
+    }
+    """
+    Columns for :func:`dooray.DoorayObjects.to_columns`, as a dict of column name to (type, getter).
+    """
+
+    def __init__(self, data, interner=None):
+        self.id = _intern_string(interner, data['id'])
         """"""
-        self.post = dooray.DoorayObjects.Relation(data['post'])
+        self.post = _build(interner, dooray.DoorayObjects.Relation, data['post'])
         """
         :type: :class:`dooray.DoorayObjects.Relation`
         """
-        self.type = data['type']
+        self.type = _intern_string(interner, data['type'])
         """
         The type of log. Possible values are `comment` and 'event`.
         """
-        self.subtype = data['subtype']
+        self.subtype = _intern_string(interner, data['subtype'])
         """
         the subtype of the log. Possible values are `general`, `from_email` and `sent_email`.
         """
@@ -807,15 +990,15 @@ class PostLog:
         """"""
         self.modified_at = data['modifiedAt'] if 'modifiedAt' in data else None
         """"""
-        self.creator = PostUser(data['creator'])
+        self.creator = _build_post_user(interner, data['creator'])
         """
         :type: :class:`dooray.Project.PostUser`
         """
-        self.mailUsers = PostUsers(data['mailUsers']) if 'mailUsers' in data else None
+        self.mailUsers = PostUsers(data['mailUsers'], interner) if 'mailUsers' in data else None
         """
         :type: :class:`dooray.Project.PostUsers`
         """
-        self.body = PostBody(data['body'])
+        self.body = PostBody(data['body']) if 'body' in data else None
         """
         :type: :class:`dooray.Project.PostBody`
         """
@@ -827,7 +1010,7 @@ class PostLog:
                f"'mailUsers': {self.mailUsers}, 'body': {self.body} }}"
 
 
-class PostUser:
+class PostUser(_ReadOnly):
     def __init__(self, data):
         self.type = data['type']
         """"""
@@ -839,10 +1022,18 @@ class PostUser:
         """
         :type: :class:`dooray.Project.EmailAddress`
         """
+        self._freeze()
 
     def __repr__(self):
         return f"{{ 'type': '{self.type}', 'member': {self.member}, 'email_user': {self.email_user} }}"
 
+    def _json_key(self):
+        return (
+            self.type,
+            self.member._json_key() if self.member is not None else None,
+            self.email_user._json_key() if self.email_user is not None else None,
+        )
+
     def to_json_dict(self):
         d = {'type': self.type}
         if self.type == 'member':
@@ -853,17 +1044,17 @@ class PostUser:
 
 
 class PostUsers:
-    def __init__(self, data=None):
+    def __init__(self, data=None, interner=None):
         if data is not None:
-            self.user_from = PostUser(data['from']) if 'from' in data else None
+            self.user_from = _build_post_user(interner, data['from']) if 'from' in data else None
             """
             :type: :class:`dooray.Project.PostUser`
             """
-            self.to = [PostUser(u) for u in data['to']]
+            self.to = [_build_post_user(interner, u) for u in data['to']]
             """
             :type: list of :class:`dooray.Project.PostUser`
             """
-            self.cc = [PostUser(u) for u in data['cc']]
+            self.cc = [_build_post_user(interner, u) for u in data['cc']]
             """
             :type: list of :class:`dooray.Project.PostUser`
             """
@@ -875,24 +1066,45 @@ class PostUsers:
     def __repr__(self):
         return f"{{ 'user_from': {self.user_from}, 'to': {self.to}, 'cc': {self.cc} }}"
 
+    def fork(self):
+        """
+        Returns a copy with its own lists of recipients, sharing the recipients themselves.
+        """
+        forked = PostUsers()
+        forked.user_from = self.user_from
+        forked.to = list(self.to)
+        forked.cc = list(self.cc)
+        return forked
+
+    def _json_key(self):
+        return (
+            self.user_from._json_key() if self.user_from is not None else None,
+            tuple(u._json_key() for u in self.to),
+            tuple(u._json_key() for u in self.cc),
+        )
+
     def to_json_dict(self):
         return {
-            'from': self.user_from,
+            'from': self.user_from.to_json_dict() if self.user_from is not None else None,
             'to': [u.to_json_dict() for u in self.to],
             'cc': [u.to_json_dict() for u in self.cc],
         }
 
 
-class PostBody:
+class PostBody(_ReadOnly):
     def __init__(self, data):
         self.mime_type = data['mimeType']
         """"""
         self.content = data['content']
         """"""
+        self._freeze()
 
     def __repr__(self):
         return f"{{ 'mime_type': '{self.mime_type}', 'content': '{self.content}' }}"
 
+    def _json_key(self):
+        return self.mime_type, self.content
+
     def to_json_dict(self):
         return {
             'mimeType': self.mime_type,
@@ -1,5 +1,11 @@
 __all__ = ['MessengerHook']
 
+from .AsyncMessengerHook import AsyncMessengerHook
 from .Dooray import Dooray, DoorayMessenger, DoorayProject
-from .MessengerHook import MessengerHook, MessengerHookAttachments
+from .DoorayCache import ResponseCache, SQLiteResponseCache
+from .MessengerHook import MessengerHook, MessengerHookAttachments, MessengerHookField, MessengerHookMessage
+from .MessengerHookDedupe import DedupingMessengerHook
+from .MessengerHookPool import MessengerHookPool, MessengerHookPoolResult
+from .MessengerHookQueue import QueuedMessengerHook, MessengerHookResult
+from .MessengerHookSpool import MessengerHookSpool
 from .Project import TemplateBuilder, PostBuilder
@@ -0,0 +1,12 @@
+"""Fake clock for the unit tests of the classes taking a `clock`."""
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
@@ -0,0 +1,124 @@
+import asyncio
+import importlib.util
+import unittest
+from unittest.mock import patch, MagicMock
+import dooray
+
+HAS_AIOHTTP = importlib.util.find_spec("aiohttp") is not None
+
+
+def mock_response(status, headers=None):
+    response = MagicMock(status=status, headers=headers or {})
+    context = MagicMock()
+    context.__aenter__.return_value = response
+    return context
+
+
+@unittest.skipUnless(HAS_AIOHTTP, "aiohttp is not installed")
+class TestAsyncMessengerHook(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._hook = dooray.AsyncMessengerHook(hook_url="https://hook.example.com/test")
+        patcher = patch("aiohttp.ClientSession.post")
+        self._post = patcher.start()
+        self._post.return_value = mock_response(200)
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self._hook.close()
+
+    async def test_asend(self):
+        """The payload is the one of MessengerHook."""
+        self.assertTrue(await self._hook.asend("Hello", [{"title": "t"}]))
+
+        payload = self._post.call_args.kwargs["json"]
+        self.assertEqual(payload["botName"], "My Bot")
+        self.assertEqual(payload["text"], "Hello")
+        self.assertEqual(payload["attachments"], [{"title": "t"}])
+
+    async def test_asend_failure(self):
+        """Errors other than throttling are not retried."""
+        self._post.return_value = mock_response(400)
+
+        self.assertFalse(await self._hook.asend("Hello"))
+        self.assertEqual(self._post.call_count, 1)
+        self.assertEqual(self._hook.dropped, 1)
+
+    @patch("asyncio.sleep")
+    async def test_retry_after(self, mock_sleep):
+        """A 429 is retried after Retry-After, which later sends wait for as well."""
+        now = [1000.0]
+        mock_sleep.side_effect = lambda seconds: now.__setitem__(0, now[0] + seconds)
+        hook = dooray.AsyncMessengerHook(hook_url="https://hook.example.com/test", clock=lambda: now[0])
+        self._post.side_effect = [mock_response(429, {"Retry-After": "2"}), mock_response(200)]
+
+        with patch("random.uniform", lambda a, b: 0):
+            self.assertTrue(await hook.asend("Hello"))
+        await hook.close()
+
+        mock_sleep.assert_awaited_once_with(2.0)
+        self.assertEqual(hook.stats(), {"sent": 1, "throttled": 1, "retried": 1, "dropped": 0})
+
+    async def test_session_reused(self):
+        """The session is kept, and created again after close()."""
+        await self._hook.asend("Hello")
+        session = self._hook._session
+        await self._hook.asend("Hello")
+        self.assertIs(self._hook._session, session)
+
+        await self._hook.close()
+        await self._hook.asend("Hello")
+        self.assertIsNot(self._hook._session, session)
+
+    async def test_asend_many(self):
+        """Messages are sent in order of the results, up to `concurrency` at a time."""
+        in_flight = 0
+        peak = 0
+
+        async def send(text, attachments):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            if text == "boom":
+                raise ConnectionError(text)
+            return text != "rejected"
+
+        messages = (e for e in ["a", ("b", [{"text": "x"}]), "rejected", "boom"] + ["c"] * 20)
+        with patch.object(self._hook, "asend", side_effect=send):
+            results = await self._hook.asend_many(messages, concurrency=3)
+
+        self.assertEqual(len(results), 24)
+        self.assertEqual(results[1].attachments, [{"text": "x"}])
+        self.assertEqual([e.ok for e in results[:4]], [True, True, False, False])
+        self.assertIsInstance(results[3].error, ConnectionError)
+        self.assertEqual(peak, 3)
+
+    async def test_asend_many_invalid_message(self):
+        """An invalid message is reported in its result, and the others are still sent."""
+        results = await self._hook.asend_many(["a", 42, ("b", "not a list"), ("c", None, None), "d"], concurrency=2)
+
+        self.assertEqual([e.ok for e in results], [True, False, False, False, True])
+        self.assertTrue(all(isinstance(e.error, TypeError) for e in results[1:4]))
+        self.assertEqual(self._post.call_count, 2)
+
+    @patch("asyncio.sleep")
+    async def test_rate(self, mock_sleep):
+        """The rate limit of MessengerHook applies."""
+        now = [1000.0]
+        mock_sleep.side_effect = lambda seconds: now.__setitem__(0, now[0] + seconds)
+        hook = dooray.AsyncMessengerHook(hook_url="https://hook.example.com/test", rate=2, clock=lambda: now[0])
+
+        for _ in range(3):
+            await hook.asend("Hello")
+        await hook.close()
+
+        self.assertEqual([e.args[0] for e in mock_sleep.await_args_list], [0.5, 0.5])
+
+
+@unittest.skipIf(HAS_AIOHTTP, "aiohttp is installed")
+class TestAsyncMessengerHookWithoutAiohttp(unittest.TestCase):
+    def test_import_error(self):
+        """The error tells how to install aiohttp."""
+        with self.assertRaisesRegex(ImportError, r"PyDooray\[aiohttp\]"):
+            dooray.AsyncMessengerHook(hook_url="https://hook.example.com/test")
@@ -0,0 +1,632 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+import requests
+import dooray
+from dooray.DoorayCache import ResponseCache, SQLiteResponseCache, SingleFlight
+from tests.fixtures.clock import FakeClock
+from tests.fixtures.responses import (
+    PROJECT_RESPONSE,
+    WORKFLOW_LIST_RESPONSE,
+    POST_RESPONSE,
+    POST_LIST_RESPONSE,
+    POST_LOG_RESPONSE,
+    MILESTONE_RESPONSE,
+    INCOMING_HOOK_RESPONSE,
+    RESPONSE_HEADER_SUCCESS,
+)
+
+
+def make_resp(json_data, content=b"{}", headers=None, status_code=200):
+    """Helper to create a mock response with status 200."""
+    mock_resp = MagicMock()
+    mock_resp.status_code = status_code
+    mock_resp.text = ""
+    mock_resp.content = content
+    mock_resp.headers = headers or {}
+    mock_resp.json.return_value = json_data
+    return mock_resp
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self._clock = FakeClock()
+
+    def test_make_key_normalizes_params(self):
+        """Parameter order does not change the key."""
+        self.assertEqual(
+            ResponseCache.make_key("GET", "/a", {"page": 0, "size": 20}),
+            ResponseCache.make_key("GET", "/a", {"size": 20, "page": 0})
+        )
+        self.assertNotEqual(
+            ResponseCache.make_key("GET", "/a", {"page": 0}),
+            ResponseCache.make_key("GET", "/a", {"page": 1})
+        )
+        self.assertEqual(ResponseCache.make_key("GET", "/a", {}), ResponseCache.make_key("GET", "/a"))
+
+    def test_make_key_scope(self):
+        """Clients with a different endpoint or token get different keys for the same request."""
+        scope = ResponseCache.make_scope("https://api.dooray.com", "token-1")
+        self.assertNotIn("token-1", scope)
+        self.assertEqual(scope, ResponseCache.make_scope("https://api.dooray.com", "token-1"))
+        self.assertNotEqual(scope, ResponseCache.make_scope("https://api.dooray.com", "token-2"))
+        self.assertNotEqual(scope, ResponseCache.make_scope("https://api.gov-dooray.com", "token-1"))
+        self.assertNotEqual(
+            ResponseCache.make_key("GET", "/a", {"page": 0}, scope),
+            ResponseCache.make_key("GET", "/a", {"page": 0})
+        )
+
+    def test_ttl_for(self):
+        """Default TTLs cover metadata methods; others are off unless configured."""
+        cache = ResponseCache(ttls={"get_posts": 5, "get_tag": 0})
+
+        self.assertGreater(cache.ttl_for("get_workflows"), 0)
+        self.assertEqual(cache.ttl_for("get_posts"), 5)
+        self.assertEqual(cache.ttl_for("get_tag"), 0)
+        self.assertEqual(cache.ttl_for("get_post"), 0)
+
+    def test_expiry(self):
+        """Entries expire after their TTL."""
+        cache = ResponseCache(clock=self._clock)
+        resp = make_resp({})
+        cache.set("k", resp, 10)
+
+        self._clock.now = 9.9
+        self.assertIs(cache.get("k"), resp)
+        self._clock.now = 10
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction_by_entries(self):
+        """Least recently used entries are evicted beyond max_entries."""
+        cache = ResponseCache(max_entries=2, clock=self._clock)
+        cache.set("a", make_resp({}), 10)
+        cache.set("b", make_resp({}), 10)
+        cache.get("a")
+        cache.set("c", make_resp({}), 10)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_lru_eviction_by_bytes(self):
+        """Entries are evicted to stay within max_bytes; oversized ones are not stored."""
+        cache = ResponseCache(max_bytes=10, clock=self._clock)
+        cache.set("a", make_resp({}, b"12345"), 10)
+        cache.set("b", make_resp({}, b"12345"), 10)
+        cache.set("c", make_resp({}, b"123"), 10)
+        cache.set("d", make_resp({}, b"12345678901"), 10)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNone(cache.get("d"))
+        self.assertEqual(cache.stats()["bytes"], 8)
+
+    def test_stats(self):
+        """Hits and misses are counted."""
+        cache = ResponseCache(clock=self._clock)
+        cache.get("a")
+        cache.set("a", make_resp({}), 10)
+        cache.get("a")
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+
+    def test_invalidate(self):
+        """Responses of a path are removed with any query, and the ones under it if recursive."""
+        cache = ResponseCache(clock=self._clock)
+        for key in (
+            "GET /p/1/posts?page=0",
+            "GET /p/1/posts?page=1",
+            "GET /p/1/posts/2",
+            "GET /p/1/posts/2/logs",
+            "GET /p/1/posts/20",
+            "GET /p/1/posts/2#https://api.dooray.com 0123456789abcdef",
+        ):
+            cache.set(key, make_resp({}), 10)
+
+        self.assertEqual(cache.invalidate("/p/1/posts", recursive=False), 2)
+        self.assertEqual(cache.invalidate("/p/1/posts/2", recursive=False), 2)
+        self.assertEqual(cache.invalidate("/p/1/posts/2"), 1)
+        self.assertIsNotNone(cache.get("GET /p/1/posts/20"))
+        self.assertEqual(len(cache), 1)
+
+    def test_expired_entry_with_validators_is_kept(self):
+        """Expired entries with ETag or Last-Modified are kept for revalidation."""
+        cache = ResponseCache(clock=self._clock)
+        cache.set("a", make_resp({}, headers={"ETag": '"v1"'}), 10)
+        cache.set("b", make_resp({}, headers={"Last-Modified": "Mon, 05 Jan 2026 00:00:00 GMT"}), 10)
+        cache.set("c", make_resp({}), 10)
+        self._clock.now = 10
+
+        for key in ("a", "b", "c"):
+            self.assertIsNone(cache.get(key))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.conditional_headers("a"), {"If-None-Match": '"v1"'})
+        self.assertEqual(cache.conditional_headers("b"), {"If-Modified-Since": "Mon, 05 Jan 2026 00:00:00 GMT"})
+        self.assertEqual(cache.conditional_headers("c"), {})
+
+    def test_revalidated(self):
+        """Revalidation renews the TTL and records the savings."""
+        cache = ResponseCache(clock=self._clock)
+        resp = make_resp({}, b"12345", headers={"ETag": '"v1"'})
+        cache.set("a", resp, 10, elapsed=0.5)
+        self._clock.now = 10
+
+        self.assertIs(cache.revalidated("a", 10, elapsed=0.1), resp)
+        self.assertIs(cache.get("a"), resp)
+        self.assertIsNone(cache.revalidated("b", 10))
+
+        stats = cache.stats()
+        self.assertEqual(stats["not_modified"], 1)
+        self.assertEqual(stats["bytes_saved"], 5)
+        self.assertAlmostEqual(stats["seconds_saved"], 0.4)
+
+
+class TestDoorayWithCache(unittest.TestCase):
+    def setUp(self):
+        self._clock = FakeClock()
+        self._cache = ResponseCache(clock=self._clock)
+        self._dooray = dooray.Dooray(token="test-token", cache=self._cache)
+
+    @patch("requests.request")
+    def test_get_is_cached(self, mock_request):
+        """Repeated get() with the same arguments hits the API once."""
+        mock_request.return_value = make_resp(PROJECT_RESPONSE)
+
+        first = self._dooray.project.get("proj-1")
+        second = self._dooray.project.get("proj-1")
+
+        self.assertEqual(mock_request.call_count, 1)
+        self.assertEqual(first.result.code, second.result.code)
+        self.assertIsNot(first.result, second.result)
+
+    @patch("requests.request")
+    def test_different_arguments_are_not_shared(self, mock_request):
+        """Different paths are cached separately."""
+        mock_request.return_value = make_resp(WORKFLOW_LIST_RESPONSE)
+
+        self._dooray.project.get_workflows("proj-1")
+        self._dooray.project.get_workflows("proj-2")
+        self._dooray.project.get_workflows("proj-1")
+
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch("requests.request")
+    def test_clients_with_different_tokens_are_not_shared(self, mock_request):
+        """A shared cache does not serve the responses of one token to another."""
+        mock_request.return_value = make_resp(PROJECT_RESPONSE)
+        other = dooray.Dooray(token="other-token", cache=self._cache)
+        same = dooray.Dooray(token="test-token", cache=self._cache)
+
+        self._dooray.project.get("proj-1")
+        other.project.get("proj-1")
+        same.project.get("proj-1")
+
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(mock_request.call_args_list[1].kwargs["headers"]["Authorization"], "dooray-api other-token")
+
+    @patch("requests.request")
+    def test_ttl_expiry_refetches(self, mock_request):
+        """An expired response is fetched again."""
+        mock_request.return_value = make_resp(INCOMING_HOOK_RESPONSE)
+
+        self._dooray.get_incoming_hook("hook-1")
+        self._clock.now = 301
+        self._dooray.get_incoming_hook("hook-1")
+
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch("requests.request")
+    def test_uncached_method(self, mock_request):
+        """Methods without TTL always call the API."""
+        mock_request.return_value = make_resp(POST_RESPONSE)
+
+        self._dooray.project.get_post("proj-1", "post-1")
+        self._dooray.project.get_post("proj-1", "post-1")
+
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(self._cache.stats()["misses"], 0)
+
+    @patch("requests.request")
+    def test_errors_are_not_cached(self, mock_request):
+        """Failed responses are not stored."""
+        mock_resp = make_resp(PROJECT_RESPONSE)
+        mock_resp.status_code = 500
+        mock_request.return_value = mock_resp
+
+        for _ in range(2):
+            with self.assertRaises(dooray.DoorayExceptions.BadHttpResponseStatusCode):
+                self._dooray.project.get("proj-1")
+
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(len(self._cache), 0)
+
+    @patch("requests.request")
+    def test_conditional_get(self, mock_request):
+        """An expired response with ETag is revalidated and served from the cache on 304."""
+        mock_request.side_effect = [
+            make_resp(PROJECT_RESPONSE, headers={"ETag": '"v1"'}),
+            make_resp(None, headers={"ETag": '"v1"'}, status_code=304),
+        ]
+
+        self._dooray.project.get("proj-1")
+        self._clock.now = 301
+        result = self._dooray.project.get("proj-1")
+
+        self.assertEqual(result.result.code, PROJECT_RESPONSE["result"]["code"])
+        headers = mock_request.call_args_list[1].kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        self.assertIn("Authorization", headers)
+        self.assertNotIn("If-None-Match", mock_request.call_args_list[0].kwargs["headers"])
+        self.assertEqual(self._cache.not_modified, 1)
+
+        # TTL is renewed
+        self._dooray.project.get("proj-1")
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch("requests.request")
+    def test_conditional_get_modified(self, mock_request):
+        """A modified response replaces the cached one."""
+        updated = {**PROJECT_RESPONSE, "result": {**PROJECT_RESPONSE["result"], "code": "updated"}}
+        mock_request.side_effect = [
+            make_resp(PROJECT_RESPONSE, headers={"ETag": '"v1"'}),
+            make_resp(updated, headers={"ETag": '"v2"'}),
+        ]
+
+        self._dooray.project.get("proj-1")
+        self._clock.now = 301
+        result = self._dooray.project.get("proj-1")
+
+        self.assertEqual(result.result.code, "updated")
+        self.assertEqual(self._cache.not_modified, 0)
+        key = ResponseCache.make_key("GET", "/project/v1/projects/proj-1", scope=self._dooray._cache_scope)
+        self.assertEqual(self._cache.conditional_headers(key), {"If-None-Match": '"v2"'})
+
+    @patch("requests.request")
+    def test_no_validators_is_plain_ttl(self, mock_request):
+        """Without validators no conditional header is sent."""
+        mock_request.return_value = make_resp(PROJECT_RESPONSE)
+
+        self._dooray.project.get("proj-1")
+        self._clock.now = 301
+        self._dooray.project.get("proj-1")
+
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertNotIn("If-None-Match", mock_request.call_args_list[1].kwargs["headers"])
+        self.assertNotIn("If-Modified-Since", mock_request.call_args_list[1].kwargs["headers"])
+
+    @patch("requests.request")
+    def test_update_post_invalidates(self, mock_request):
+        """Writes to a post invalidate the post, its logs and the post lists, but not other posts."""
+        cache = ResponseCache(ttls={"get_post": 60, "get_posts": 60, "get_post_logs": 60}, clock=self._clock)
+        d = dooray.Dooray(token="test-token", cache=cache)
+        mock_request.side_effect = lambda method, url, **kwargs: make_resp(
+            POST_LIST_RESPONSE if url.endswith("/posts") else
+            {**RESPONSE_HEADER_SUCCESS, "result": [POST_LOG_RESPONSE["result"]], "totalCount": 1}
+            if url.endswith("/logs") else
+            POST_RESPONSE if method == "GET" else RESPONSE_HEADER_SUCCESS
+        )
+        d.project.get_post("proj-1", "post-1")
+        d.project.get_post("proj-1", "post-2")
+        d.project.get_posts("proj-1")
+        d.project.get_post_logs("proj-1", "post-1")
+        self.assertEqual(len(cache), 4)
+
+        d.project.set_post_as_done("proj-1", "post-1")
+
+        self.assertEqual(len(cache), 1)
+        mock_request.reset_mock()
+        d.project.get_post("proj-1", "post-1")
+        d.project.get_post("proj-1", "post-2")
+        self.assertEqual(mock_request.call_count, 1)
+
+    @patch("requests.request")
+    def test_update_milestone_invalidates(self, mock_request):
+        """Read-your-writes on a milestone."""
+        mock_request.return_value = make_resp(MILESTONE_RESPONSE)
+
+        self._dooray.project.get_milestone("proj-1", "ms-1")
+        self._dooray.project.update_milestone("proj-1", "ms-1", "name", "open", "2026-01-01+00:00", "2026-02-01+00:00")
+        self._dooray.project.get_milestone("proj-1", "ms-1")
+
+        self.assertEqual(mock_request.call_count, 3)
+
+    @patch("requests.request")
+    def test_failed_write_does_not_invalidate(self, mock_request):
+        """A failed write keeps the cached responses."""
+        mock_request.return_value = make_resp(MILESTONE_RESPONSE)
+        self._dooray.project.get_milestone("proj-1", "ms-1")
+
+        mock_request.return_value = make_resp(MILESTONE_RESPONSE, status_code=500)
+        with self.assertRaises(dooray.DoorayExceptions.BadHttpResponseStatusCode):
+            self._dooray.project.delete_milestone("proj-1", "ms-1")
+
+        self.assertEqual(len(self._cache), 1)
+
+    @patch("requests.request")
+    def test_negative_caching_of_not_found(self, mock_request):
+        """404 responses are cached for negative_ttl, even for methods without TTL."""
+        cache = ResponseCache(negative_ttl=30, clock=self._clock)
+        d = dooray.Dooray(token="test-token", cache=cache)
+        mock_request.return_value = make_resp(None, status_code=404)
+
+        for _ in range(3):
+            with self.assertRaises(dooray.DoorayExceptions.BadHttpResponseStatusCode) as e:
+                d.project.get_post("proj-1", "no-such-post")
+            self.assertEqual(e.exception.status_code, 404)
+        self.assertEqual(mock_request.call_count, 1)
+        self.assertEqual(cache.stats()["negative_hits"], 2)
+
+        self._clock.now = 30
+        with self.assertRaises(dooray.DoorayExceptions.BadHttpResponseStatusCode):
+            d.project.get_post("proj-1", "no-such-post")
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch("requests.request")
+    def test_negative_caching_is_off_by_default(self, mock_request):
+        """Without negative_ttl, 404 responses are not cached."""
+        mock_request.return_value = make_resp(None, status_code=404)
+
+        for _ in range(2):
+            with self.assertRaises(dooray.DoorayExceptions.BadHttpResponseStatusCode):
+                self._dooray.project.get("no-such-project")
+
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch("requests.request")
+    def test_negative_caching_of_is_creatable(self, mock_request):
+        """'Not creatable' results are cached until a project is created."""
+        cache = ResponseCache(negative_ttl=30, clock=self._clock)
+        d = dooray.Dooray(token="test-token", cache=cache)
+        mock_request.return_value = make_resp(None, status_code=409)
+
+        self.assertFalse(d.project.is_creatable("taken"))
+        self.assertFalse(d.project.is_creatable("taken"))
+        self.assertEqual(mock_request.call_count, 1)
+
+        mock_request.return_value = make_resp(PROJECT_RESPONSE)
+        d.project.create("new-project", "description")
+        self.assertTrue(d.project.is_creatable("taken"))
+        self.assertEqual(mock_request.call_count, 3)
+
+    @patch("requests.request")
+    def test_other_errors_are_not_negative(self, mock_request):
+        """is_creatable() failing for other reasons than a taken code is not cached."""
+        cache = ResponseCache(negative_ttl=30, clock=self._clock)
+        d = dooray.Dooray(token="test-token", cache=cache)
+
+        for status_code in (401, 403, 429, 500):
+            mock_request.return_value = make_resp(None, status_code=status_code)
+            self.assertFalse(d.project.is_creatable("code"))
+        mock_request.return_value = make_resp(PROJECT_RESPONSE)
+        self.assertTrue(d.project.is_creatable("code"))
+
+        self.assertEqual(mock_request.call_count, 5)
+
+    def test_negative_entries_are_bounded(self):
+        """Negative entries have their own bound."""
+        cache = ResponseCache(max_entries=1, negative_ttl=30, max_negative_entries=2, clock=self._clock)
+        cache.set("GET /a", make_resp({}), 10)
+        for key in ("GET /x", "GET /y", "GET /z"):
+            cache.set_negative(key, 404)
+
+        self.assertIsNone(cache.get_negative("GET /x"))
+        self.assertEqual(cache.get_negative("GET /z"), 404)
+        self.assertIsNotNone(cache.get("GET /a"))
+        self.assertEqual(cache.stats()["negative_entries"], 2)
+
+    def test_invalid_cache(self):
+        """cache must be a ResponseCache."""
+        with self.assertRaises(TypeError):
+            dooray.Dooray(token="test-token", cache={})
+
+
+def make_real_resp(content=b'{"result": null}', headers=None, status_code=200):
+    """Helper to create a requests.Response, which the SQLite cache stores."""
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp._content = content
+    resp.headers.update(headers or {})
+    resp.encoding = "utf-8"
+    resp.url = "https://api.dooray.com/"
+    return resp
+
+
+class TestSQLiteResponseCache(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._dir.name, "cache", "responses.sqlite3")
+        self._clock = FakeClock()
+        self._cache = SQLiteResponseCache(self._path, clock=self._clock)
+
+    def tearDown(self):
+        self._cache.close()
+        self._dir.cleanup()
+
+    def test_shared_by_instances(self):
+        """Responses stored by one instance are read by another one on the same file."""
+        self._cache.set("GET /a", make_real_resp(b'{"a": 1}', {"Content-Type": "application/json"}), 10)
+
+        other = SQLiteResponseCache(self._path, clock=self._clock)
+        try:
+            resp = other.get("GET /a")
+            self.assertEqual(resp.json(), {"a": 1})
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp.headers["content-type"], "application/json")
+        finally:
+            other.close()
+
+    def test_expiry_and_revalidation(self):
+        """Expired responses are removed unless they have validators."""
+        self._cache.set("GET /a", make_real_resp(), 10)
+        self._cache.set("GET /b", make_real_resp(b"12345", {"ETag": '"v1"'}), 10, elapsed=0.5)
+        self._clock.now = 10
+
+        self.assertIsNone(self._cache.get("GET /a"))
+        self.assertIsNone(self._cache.get("GET /b"))
+        self.assertEqual(len(self._cache), 1)
+        self.assertEqual(self._cache.conditional_headers("GET /b"), {"If-None-Match": '"v1"'})
+
+        self.assertEqual(self._cache.revalidated("GET /b", 10, elapsed=0.1).content, b"12345")
+        self.assertIsNotNone(self._cache.get("GET /b"))
+        self.assertEqual(self._cache.stats()["bytes_saved"], 5)
+
+    def test_size_caps(self):
+        """Least recently used responses are evicted beyond the caps."""
+        cache = SQLiteResponseCache(self._path + "-caps", max_entries=2, max_bytes=10, clock=self._clock)
+        try:
+            cache.set("GET /a", make_real_resp(b"1234"), 10)
+            self._clock.now = 1
+            cache.set("GET /b", make_real_resp(b"1234"), 10)
+            self._clock.now = 2
+            cache.get("GET /a")
+            cache.set("GET /c", make_real_resp(b"1234"), 10)
+            cache.set("GET /d", make_real_resp(b"12345678901"), 10)
+
+            self.assertIsNone(cache.get("GET /b"))
+            self.assertIsNone(cache.get("GET /d"))
+            self.assertEqual(cache.stats()["entries"], 2)
+            self.assertEqual(cache.evictions, 1)
+        finally:
+            cache.close()
+
+    def test_invalidate(self):
+        """Invalidation works as the in-memory cache."""
+        for key in ("GET /p/1/posts?page=0", "GET /p/1/posts/2", "GET /p/1/posts/2/logs", "GET /p/1/posts/20"):
+            self._cache.set(key, make_real_resp(), 10)
+
+        self.assertEqual(self._cache.invalidate("/p/1/posts", recursive=False), 1)
+        self.assertEqual(self._cache.invalidate("/p/1/posts/2"), 2)
+        self.assertEqual(len(self._cache), 1)
+
+    def test_compact(self):
+        """Compaction removes expired responses without validators."""
+        self._cache.set("GET /a", make_real_resp(), 10)
+        self._cache.set("GET /b", make_real_resp(headers={"Last-Modified": "Mon, 05 Jan 2026 00:00:00 GMT"}), 10)
+        self._cache.set("GET /c", make_real_resp(), 100)
+        self._clock.now = 50
+
+        self.assertEqual(self._cache.compact(), 1)
+        self.assertEqual(len(self._cache), 2)
+
+    def test_concurrent_writers(self):
+        """Threads write through their own connections."""
+        def write(i):
+            for j in range(20):
+                self._cache.set(f"GET /{i}/{j}", make_real_resp(), 10)
+
+        threads = [threading.Thread(target=write, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(self._cache), 80)
+
+    @patch("requests.request")
+    def test_dooray_with_sqlite_cache(self, mock_request):
+        """A new client on the same file starts warm."""
+        mock_request.return_value = make_real_resp(json.dumps(PROJECT_RESPONSE).encode())
+
+        dooray.Dooray(token="test-token", cache=self._cache).project.get("proj-1")
+        other = SQLiteResponseCache(self._path, clock=self._clock)
+        try:
+            result = dooray.Dooray(token="test-token", cache=other).project.get("proj-1")
+        finally:
+            other.close()
+
+        self.assertEqual(result.result.code, PROJECT_RESPONSE["result"]["code"])
+        self.assertEqual(mock_request.call_count, 1)
+
+
+class TestSingleFlight(unittest.TestCase):
+    def _run_concurrently(self, count, target):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for t in threads:
+            t.start()
+        return threads
+
+    def test_do_shares_result(self):
+        """Concurrent calls with the same key share one call."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def fn():
+            calls.append(1)
+            release.wait(5)
+            return "result"
+
+        threads = self._run_concurrently(8, lambda: results.append(flight.do("k", fn)))
+        while flight.shared < 7:
+            threading.Event().wait(0.001)
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["result"] * 8)
+
+    def test_do_shares_exception(self):
+        """The exception of the call is raised to all the waiters."""
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def fn():
+            release.wait(5)
+            raise ValueError("failed")
+
+        def call():
+            try:
+                flight.do("k", fn)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = self._run_concurrently(4, call)
+        while flight.shared < 3:
+            threading.Event().wait(0.001)
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(errors), 4)
+        self.assertTrue(all(e is errors[0] for e in errors))
+
+    def test_do_after_completion_calls_again(self):
+        """Only calls in flight are shared."""
+        flight = SingleFlight()
+
+        self.assertEqual(flight.do("k", lambda: 1), 1)
+        self.assertEqual(flight.do("k", lambda: 2), 2)
+        self.assertEqual(flight.shared, 0)
+
+    @patch("requests.request")
+    def test_dooray_singleflight(self, mock_request):
+        """Concurrent get_post() calls hit the API once."""
+        d = dooray.Dooray(token="test-token", singleflight=True)
+        release = threading.Event()
+
+        def request(method, url, **kwargs):
+            release.wait(5)
+            return make_resp(POST_RESPONSE)
+
+        mock_request.side_effect = request
+        results = []
+        threads = self._run_concurrently(5, lambda: results.append(d.project.get_post("proj-1", "post-1")))
+        while d.project._singleflight.shared < 4:
+            threading.Event().wait(0.001)
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(mock_request.call_count, 1)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(len({id(r.result) for r in results}), 5)
@@ -0,0 +1,405 @@
+import datetime
+import unittest
+from unittest.mock import patch, MagicMock
+import dooray
+from dooray.DoorayCache import ResponseCache
+from dooray.DoorayDirectory import WorkflowRegistry, MemberDirectory, ChannelDirectory, TemplateCache
+from tests.fixtures.clock import FakeClock
+from tests.fixtures.responses import RESPONSE_HEADER_SUCCESS, CHANNEL_LIST_RESPONSE
+
+
+# Workflow list response with the orders and the localized names
+WORKFLOW_NAMES_RESPONSE: dict = {
+    **RESPONSE_HEADER_SUCCESS,
+    "result": [
+        {"id": "wf-3", "name": "Done", "order": 2, "class": "closed",
+         "names": [{"locale": "ko_KR", "name": "완료"}]},
+        {"id": "wf-1", "name": "To do", "order": 0, "class": "registered",
+         "names": [{"locale": "ko_KR", "name": "할 일"}]},
+        {"id": "wf-2", "name": "Working", "order": 1, "class": "working"},
+        {"id": "wf-4", "name": "Archived", "order": 3, "class": "closed"},
+    ],
+    "totalCount": 4
+}
+
+
+def make_resp(json_data):
+    """Helper to create a mock response with status 200."""
+    mock_resp = MagicMock()
+    mock_resp.status_code = 200
+    mock_resp.text = ""
+    mock_resp.content = b"{}"
+    mock_resp.headers = {}
+    mock_resp.json.return_value = json_data
+    return mock_resp
+
+
+class TestWorkflowRegistry(unittest.TestCase):
+    def setUp(self):
+        self._dooray = dooray.Dooray(token="test-token")
+        self._clock = FakeClock()
+        self._registry = WorkflowRegistry(self._dooray.project, ttl=60, clock=self._clock)
+
+    @patch("requests.request")
+    def test_resolve(self, mock_request):
+        """Workflows are resolved by id, name, localized name and class with one API call."""
+        mock_request.return_value = make_resp(WORKFLOW_NAMES_RESPONSE)
+
+        self.assertEqual(self._registry.resolve("proj-1", "wf-2").id, "wf-2")
+        self.assertEqual(self._registry.resolve("proj-1", "done").id, "wf-3")
+        self.assertEqual(self._registry.resolve("proj-1", "완료").id, "wf-3")
+        self.assertEqual(self._registry.resolve("proj-1", "registered").id, "wf-1")
+        # The first one in order for a class
+        self.assertEqual(self._registry.resolve("proj-1", "closed").id, "wf-3")
+
+        self.assertEqual(mock_request.call_count, 1)
+
+    @patch("requests.request")
+    def test_ttl(self, mock_request):
+        """Workflows are loaded again after the TTL, per project."""
+        mock_request.return_value = make_resp(WORKFLOW_NAMES_RESPONSE)
+
+        self._registry.resolve("proj-1", "Done")
+        self._registry.resolve("proj-2", "Done")
+        self._clock.now = 60
+        self._registry.resolve("proj-1", "Done")
+
+        self.assertEqual(mock_request.call_count, 3)
+
+    @patch("requests.request")
+    def test_refresh_on_miss(self, mock_request):
+        """A miss loads the workflows again once, then raises ValueError."""
+        mock_request.return_value = make_resp(WORKFLOW_NAMES_RESPONSE)
+
+        self._registry.resolve("proj-1", "Done")
+        with self.assertRaises(ValueError):
+            self._registry.resolve("proj-1", "Unknown")
+        self.assertEqual(mock_request.call_count, 2)
+
+        self.assertIsNone(self._registry.find("proj-1", "Unknown"))
+        self.assertEqual(mock_request.call_count, 3)
+
+    @patch("requests.request")
+    def test_invalidate(self, mock_request):
+        """Invalidated projects are loaded again."""
+        mock_request.return_value = make_resp(WORKFLOW_NAMES_RESPONSE)
+
+        self._registry.resolve("proj-1", "Done")
+        self._registry.invalidate("proj-1")
+        self._registry.resolve("proj-1", "Done")
+
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch("requests.request")
+    def test_set_post_workflow_by_name(self, mock_request):
+        """set_post_workflow() resolves the workflow name."""
+        mock_request.side_effect = [make_resp(WORKFLOW_NAMES_RESPONSE), make_resp(RESPONSE_HEADER_SUCCESS)]
+
+        self._dooray.project.set_post_workflow("proj-1", "post-1", workflow="Done")
+
+        self.assertEqual(mock_request.call_args.kwargs["json"], {"workflowId": "wf-3"})
+
+    def test_set_post_workflow_arguments(self):
+        """Exactly one of workflow_id and workflow is required."""
+        with self.assertRaises(ValueError):
+            self._dooray.project.set_post_workflow("proj-1", "post-1")
+        with self.assertRaises(ValueError):
+            self._dooray.project.set_post_workflow("proj-1", "post-1", workflow_id="wf-1", workflow="Done")
+
+
+def member(i, name=None):
+    return {
+        "id": f"m-{i}",
+        "name": name or f"User {i}",
+        "userCode": f"user{i}",
+        "externalEmailAddress": f"user{i}@example.com",
+    }
+
+
+def members_response(members):
+    return {**RESPONSE_HEADER_SUCCESS, "result": members, "totalCount": len(members)}
+
+
+def members_by_params(method, url, params=None, **kwargs):
+    """Fake API answering get_members() by the requested emails or user code."""
+    if "externalEmailAddresses" in params:
+        emails = params["externalEmailAddresses"].split(",")
+        return make_resp(members_response([member(e[4:e.index("@")]) for e in emails if e.startswith("user")]))
+    if "userCodeExact" in params:
+        return make_resp(members_response([member(params["userCodeExact"][4:])]))
+    return make_resp(members_response([member(1, "Hong  Gildong"), member(2, "Hong Gildong Jr")]))
+
+
+class TestMemberDirectory(unittest.TestCase):
+    def setUp(self):
+        self._dooray = dooray.Dooray(token="test-token")
+        self._clock = FakeClock()
+        self._directory = MemberDirectory(self._dooray, ttl=60, max_size=100, clock=self._clock)
+
+    @patch("requests.request", side_effect=members_by_params)
+    def test_find_by_user_code(self, mock_request):
+        """Members are looked up once, and indexed by all the keys."""
+        self.assertEqual(self._directory.find_by_user_code("user1").id, "m-1")
+        self.assertEqual(self._directory.find_by_user_code("user1").id, "m-1")
+        self.assertEqual(self._directory.find_by_email("USER1@example.com").id, "m-1")
+        self.assertEqual(self._directory.get("m-1").name, "User 1")
+
+        self.assertEqual(mock_request.call_count, 1)
+        stats = self._directory.stats()
+        self.assertEqual(stats["hits"], 3)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_rate"], 0.75)
+
+    @patch("requests.request", side_effect=members_by_params)
+    def test_find_by_emails_batches(self, mock_request):
+        """Missing emails are looked up by batches of BATCH_SIZE."""
+        self._directory.find_by_email("user0@example.com")
+        emails = [f"user{i}@example.com" for i in range(150)] + ["nobody@example.com"]
+
+        found = self._directory.find_by_emails(emails)
+
+        self.assertEqual(len(found), 150)
+        self.assertEqual(found["user149@example.com"].id, "m-149")
+        # 1 + 150 missing emails in 2 batches
+        self.assertEqual(mock_request.call_count, 3)
+        self.assertEqual(len(mock_request.call_args_list[1].kwargs["params"]["externalEmailAddresses"].split(",")), 100)
+        # Bounded
+        self.assertEqual(len(self._directory), 100)
+
+    @patch("requests.request", side_effect=members_by_params)
+    def test_find_by_name(self, mock_request):
+        """Names are normalized and matched exactly."""
+        members = self._directory.find_by_name("hong gildong")
+
+        self.assertEqual([e.id for e in members], ["m-1"])
+        self.assertEqual([e.id for e in self._directory.find_by_name("HONG GILDONG ")], ["m-1"])
+        self.assertEqual(mock_request.call_count, 1)
+
+    @patch("requests.request", side_effect=members_by_params)
+    def test_find_by_name_not_answered_by_other_lookups(self, mock_request):
+        """A member found by another lookup does not hide the other members of its name."""
+        self._directory._fill([dooray.Member.Member(member(3, "Hong Gildong"))])
+
+        self.assertEqual([e.id for e in self._directory.find_by_name("hong gildong")], ["m-1"])
+        self.assertEqual(mock_request.call_count, 1)
+
+    @patch("requests.request")
+    def test_find_by_name_pages(self, mock_request):
+        """All the pages of the members of a name are looked up."""
+        pages = [[member(i, "Kim") for i in range(100)], [member(i, "Kim") for i in range(100, 130)]]
+        mock_request.side_effect = [
+            make_resp({**RESPONSE_HEADER_SUCCESS, "result": e, "totalCount": 130}) for e in pages
+        ]
+
+        self.assertEqual(len(self._directory.find_by_name("kim")), 130)
+        self.assertEqual(mock_request.call_args.kwargs["params"]["page"], 1)
+
+    @patch("requests.request", side_effect=members_by_params)
+    def test_find_by_name_expires(self, mock_request):
+        """The members of a name are looked up again after the TTL."""
+        self._directory.find_by_name("hong gildong")
+        self._clock.now = 60
+
+        self._directory.find_by_name("hong gildong")
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch("requests.request", side_effect=members_by_params)
+    def test_ttl(self, mock_request):
+        """Members expire after the TTL."""
+        self._directory.find_by_user_code("user1")
+        self._clock.now = 60
+
+        self.assertIsNone(self._directory.get("m-1"))
+        self._directory.find_by_user_code("user1")
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch("requests.request", side_effect=members_by_params)
+    def test_prefetch_emails(self, mock_request):
+        """Prefetched members are found without calling the API again."""
+        future = self._directory.prefetch_emails(["user1@example.com", "user2@example.com"])
+        self.assertEqual(len(future.result(5)), 2)
+        self._directory.close()
+
+        self.assertEqual(self._directory.find_by_email("user2@example.com").id, "m-2")
+        self.assertEqual(mock_request.call_count, 1)
+
+
+def channel(channel_id, title, channel_type, member_ids, updated_at="2026-01-01T00:00:00Z"):
+    return {
+        **CHANNEL_LIST_RESPONSE["result"][0],
+        "id": channel_id,
+        "title": title,
+        "type": channel_type,
+        "users": {"participants": [
+            {"type": "member", "member": {"organizationMemberId": e}} for e in member_ids
+        ]},
+        "updatedAt": updated_at,
+    }
+
+
+def channels_response(channels):
+    return {**RESPONSE_HEADER_SUCCESS, "result": channels, "totalCount": len(channels)}
+
+
+class TestChannelDirectory(unittest.TestCase):
+    def setUp(self):
+        self._dooray = dooray.Dooray(token="test-token")
+        self._clock = FakeClock()
+        self._directory = ChannelDirectory(self._dooray.messenger, ttl=60, clock=self._clock)
+        self._channels = [
+            channel("ch-1", "General", "private", ["bot", "m-1", "m-2"]),
+            channel("ch-2", "m-1", "direct", ["bot", "m-1"]),
+            channel("ch-3", "General", "private", ["bot", "m-3"]),
+        ]
+
+    @patch("requests.request")
+    def test_lookups(self, mock_request):
+        """Channels are indexed by id, title, type and member with one API call."""
+        mock_request.return_value = make_resp(channels_response(self._channels))
+
+        self.assertEqual(self._directory.get("ch-1").title, "General")
+        self.assertIsNone(self._directory.get("ch-9"))
+        self.assertEqual(sorted(e.id for e in self._directory.find_by_title("General")), ["ch-1", "ch-3"])
+        self.assertEqual([e.id for e in self._directory.channels_of_type("direct")], ["ch-2"])
+        self.assertEqual(sorted(e.id for e in self._directory.channels_with_member("m-1")), ["ch-1", "ch-2"])
+        self.assertEqual(self._directory.direct_channel("m-1").id, "ch-2")
+        self.assertIsNone(self._directory.direct_channel("m-3"))
+        self.assertEqual(self._directory.channels_with_member("m-9"), [])
+
+        self.assertEqual(mock_request.call_count, 1)
+
+    @patch("requests.request")
+    def test_incremental_refresh(self, mock_request):
+        """Only updated channels are parsed again; removed ones are dropped."""
+        mock_request.return_value = make_resp(channels_response(self._channels))
+        self._directory.refresh()
+        unchanged = self._directory.get("ch-1")
+
+        updated = channel("ch-2", "m-1", "direct", ["bot", "m-1", "m-4"], updated_at="2026-01-02T00:00:00Z")
+        mock_request.return_value = make_resp(channels_response([self._channels[0], updated]))
+
+        self.assertEqual(self._directory.refresh(), 2)
+        self.assertIs(self._directory.get("ch-1"), unchanged)
+        self.assertEqual(self._directory.direct_channel("m-4").id, "ch-2")
+        self.assertEqual(self._directory.channels_with_member("m-3"), [])
+        self.assertEqual(len(self._directory), 2)
+
+    @patch("requests.request")
+    def test_ttl_and_invalidation(self, mock_request):
+        """The list is loaded again after the TTL and after channel writes."""
+        mock_request.return_value = make_resp(channels_response(self._channels))
+        channels = self._dooray.messenger.channels
+
+        channels.get("ch-1")
+        channels.get("ch-1")
+        self._dooray.messenger.join_channel("ch-1", "m-5")
+        channels.get("ch-1")
+
+        # list, join, list
+        self.assertEqual(mock_request.call_count, 3)
+
+    @patch("requests.request")
+    def test_cached_response_is_not_parsed_again(self, mock_request):
+        """A response served from the response cache is skipped."""
+        d = dooray.Dooray(token="test-token", cache=ResponseCache(ttls={"get_channels": 600}))
+        directory = ChannelDirectory(d.messenger, ttl=60, clock=self._clock)
+        mock_request.return_value = make_resp(channels_response(self._channels))
+
+        self.assertEqual(directory.refresh(), 3)
+        self.assertEqual(directory.refresh(), 0)
+        self.assertEqual(mock_request.call_count, 1)
+
+
+def template_response(subject, content):
+    return {
+        **RESPONSE_HEADER_SUCCESS,
+        "result": {
+            "id": "tmpl-1",
+            "project": {"id": "proj-1", "code": "test-project"},
+            "templateName": "Daily",
+            "subject": subject,
+            "body": {"mimeType": "text/x-markdown", "content": content},
+            "users": {"to": [], "cc": []},
+            "priority": "normal",
+            "isDefault": False,
+            "tags": []
+        }
+    }
+
+
+class TestTemplateCache(unittest.TestCase):
+    # 2026-01-31 16:00 UTC is 2026-02-01 in KST
+    NOW = datetime.datetime(2026, 1, 31, 16, 0, tzinfo=datetime.timezone.utc)
+
+    def setUp(self):
+        self._dooray = dooray.Dooray(token="test-token")
+        self._clock = FakeClock()
+        self._templates = TemplateCache(self._dooray.project, ttl=60, clock=self._clock)
+
+    @patch("requests.request")
+    def test_render_locally(self, mock_request):
+        """Supported placeholders are rendered in KST without server interpolation."""
+        mock_request.return_value = make_resp(template_response("Daily ${date}", "${year}/${month}/${day}"))
+
+        rendered = self._templates.render("proj-1", "tmpl-1", now=self.NOW)
+
+        self.assertEqual(rendered.subject, "Daily 2026-02-01")
+        self.assertEqual(rendered.body.content, "2026/02/01")
+        self.assertEqual(rendered.body.mime_type, "text/x-markdown")
+        self.assertEqual(self._templates.get("proj-1", "tmpl-1").subject, "Daily ${date}")
+        self.assertNotIn("interpolation", mock_request.call_args.kwargs["params"])
+        self.assertEqual(mock_request.call_count, 1)
+
+    @patch("requests.request")
+    def test_render_without_subject(self, mock_request):
+        """A template without a subject is rendered locally too."""
+        mock_request.return_value = make_resp(template_response(None, "Report of ${date}"))
+
+        rendered = self._templates.render("proj-1", "tmpl-1", now=self.NOW)
+
+        self.assertIsNone(rendered.subject)
+        self.assertEqual(rendered.body.content, "Report of 2026-02-01")
+        self.assertEqual(mock_request.call_count, 1)
+
+    @patch("requests.request")
+    def test_render_is_memoized(self, mock_request):
+        """Renders of a template are kept per date until the template is loaded again."""
+        mock_request.return_value = make_resp(template_response("Daily ${date}", "body"))
+
+        first = self._templates.render("proj-1", "tmpl-1", now=self.NOW)
+        second = self._templates.render("proj-1", "tmpl-1", now=self.NOW + datetime.timedelta(hours=1))
+        next_day = self._templates.render("proj-1", "tmpl-1", now=self.NOW + datetime.timedelta(days=1))
+
+        self.assertIs(first, second)
+        self.assertEqual(next_day.subject, "Daily 2026-02-02")
+        self.assertEqual(self._templates.rendered, 3)
+
+        self._clock.now = 60
+        self.assertIsNot(self._templates.render("proj-1", "tmpl-1", now=self.NOW), first)
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch("requests.request")
+    def test_unknown_placeholder_falls_back(self, mock_request):
+        """Templates with unsupported placeholders are interpolated by the server."""
+        mock_request.side_effect = [
+            make_resp(template_response("${author} ${date}", "body")),
+            make_resp(template_response("Someone 2026-02-01", "body")),
+        ]
+
+        rendered = self._templates.render("proj-1", "tmpl-1", now=self.NOW)
+
+        self.assertEqual(rendered.subject, "Someone 2026-02-01")
+        self.assertEqual(mock_request.call_args.kwargs["params"], {"interpolation": "true"})
+        self.assertEqual(self._templates.interpolated, 1)
+
+    @patch("requests.request")
+    def test_update_template_invalidates(self, mock_request):
+        """Updating a template through the client loads it again."""
+        mock_request.return_value = make_resp(template_response("Daily", "body"))
+        templates = self._dooray.project.templates
+
+        templates.render("proj-1", "tmpl-1")
+        self._dooray.project.delete_template("proj-1", "tmpl-1")
+        templates.render("proj-1", "tmpl-1")
+
+        self.assertEqual(mock_request.call_count, 3)
@@ -0,0 +1,120 @@
+import datetime
+import importlib.util
+import unittest
+import dooray
+from dooray.DoorayObjects import DoorayListResponse, to_columns
+from dooray.Project import ReadPost, Milestone
+from tests.fixtures.responses import RESPONSE_HEADER_SUCCESS, POST_RESPONSE
+
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+# Post list response with all the exported fields
+POST_COLUMNS_RESPONSE: dict = {
+    **RESPONSE_HEADER_SUCCESS,
+    "result": [
+        {
+            **POST_RESPONSE["result"],
+            "id": "post-1",
+            "number": 1,
+            "closed": False,
+            "workflowClass": "working",
+            "workflow": {"id": "wf-2", "name": "Working"},
+            "milestone": {"id": "ms-1", "name": "v1.0"},
+            "tags": [{"id": "tag-1"}, {"id": "tag-2"}],
+            "createdAt": "2026-01-01T09:00:00+09:00",
+            "updatedAt": "2026-01-02T00:00:00Z",
+        },
+        {
+            **POST_RESPONSE["result"],
+            "id": "post-2",
+            "number": 2,
+            "closed": True,
+            "workflowClass": "closed",
+            "milestone": None,
+            "tags": [],
+            "createdAt": "2026-01-03T00:00:00+00:00",
+        },
+    ],
+    "totalCount": 2
+}
+
+
+class TestColumnarExport(unittest.TestCase):
+    def setUp(self):
+        self._response = DoorayListResponse(POST_COLUMNS_RESPONSE, ReadPost)
+
+    def test_to_columns(self):
+        """Each field becomes a list of values, timestamps are parsed in UTC."""
+        columns = self._response.to_columns()
+
+        self.assertEqual(columns["id"], ["post-1", "post-2"])
+        self.assertEqual(columns["workflow_class"], ["working", "closed"])
+        self.assertEqual(columns["workflow_id"], ["wf-2", None])
+        self.assertEqual(columns["milestone_id"], ["ms-1", None])
+        self.assertEqual(columns["tag_ids"], [["tag-1", "tag-2"], []])
+        self.assertEqual(
+            columns["created_at"][0],
+            datetime.datetime(2026, 1, 1, 0, 0, tzinfo=datetime.timezone.utc)
+        )
+        self.assertEqual(columns["updated_at"][1], None)
+
+    def test_to_columns_selected(self):
+        """Only the requested columns are exported."""
+        columns = self._response.to_columns(["id", "subject"])
+
+        self.assertEqual(list(columns.keys()), ["id", "subject"])
+
+    def test_to_columns_unknown_column(self):
+        """Unknown column name raises ValueError."""
+        with self.assertRaises(ValueError):
+            self._response.to_columns(["no_such_column"])
+
+    def test_to_columns_unsupported_type(self):
+        """Types without COLUMNS raise TypeError."""
+        with self.assertRaises(TypeError):
+            to_columns([dooray.DoorayObjects.Relation({"id": "1"})])
+
+    def test_to_columns_empty_result(self):
+        """An empty response still knows its columns."""
+        response = DoorayListResponse({**RESPONSE_HEADER_SUCCESS, "result": [], "totalCount": 0}, Milestone)
+
+        columns = response.to_columns()
+
+        self.assertEqual(columns["id"], [])
+        self.assertIn("started_at", columns)
+
+    def test_to_columns_across_pages(self):
+        """Objects from several pages can be exported together."""
+        pages = [self._response.result, self._response.result]
+
+        columns = to_columns([post for page in pages for post in page])
+
+        self.assertEqual(len(columns["id"]), 4)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+    def test_to_numpy(self):
+        """Columns become typed NumPy arrays."""
+        import numpy
+
+        arrays = self._response.to_numpy()
+
+        self.assertEqual(arrays["number"].dtype, numpy.int64)
+        self.assertEqual(arrays["closed"].dtype, numpy.bool_)
+        self.assertEqual(arrays["created_at"].dtype, numpy.dtype("datetime64[ms]"))
+        self.assertEqual(arrays["created_at"][0], numpy.datetime64("2026-01-01T00:00:00"))
+        self.assertTrue(numpy.isnat(arrays["updated_at"][1]))
+        self.assertEqual(list(arrays["tag_ids"][0]), ["tag-1", "tag-2"])
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_to_arrow(self):
+        """Columns become an Arrow table with typed fields."""
+        import pyarrow
+
+        table = self._response.to_arrow()
+
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(table.schema.field("created_at").type, pyarrow.timestamp("ms", tz="UTC"))
+        self.assertEqual(table.schema.field("tag_ids").type, pyarrow.list_(pyarrow.string()))
+        self.assertEqual(table.column("milestone_id").to_pylist(), ["ms-1", None])
@@ -1,4 +1,6 @@
+import json
 import unittest
+from copy import deepcopy
 from unittest.mock import patch, MagicMock, ANY
 import dooray
 from dooray.DoorayExceptions import BadHttpResponseStatusCode
@@ -29,6 +31,29 @@ POST_LOG_LIST_RESPONSE: dict = {
     "totalCount": 1
 }
 
+# Post list response whose posts share the nested entities
+SHARED_POST_LIST_RESPONSE: dict = {
+    **RESPONSE_HEADER_SUCCESS,
+    "result": [
+        {
+            "id": f"post-{i}",
+            "number": i,
+            "subject": f"Post {i}",
+            "project": {"id": "proj-1", "code": "test-project"},
+            "workflowClass": "working",
+            "workflow": {"id": "wf-2", "name": "Working"},
+            "milestone": {"id": "ms-1", "name": "v1.0"},
+            "tags": [{"id": "tag-1"}, {"id": "tag-2"}],
+            "users": {
+                "to": [{"type": "member", "member": {"organizationMemberId": "member-1"}}],
+                "cc": []
+            }
+        }
+        for i in range(3)
+    ],
+    "totalCount": 3
+}
+
 # Reusable member response
 PROJECT_MEMBER_RESPONSE: dict = {
     **RESPONSE_HEADER_SUCCESS,
@@ -329,7 +354,7 @@ class TestDoorayProject(unittest.TestCase):
 
     @patch("requests.request")
     def test_create_template(self, mock_request):
-        """Verify to_json_dict() is called on template object."""
+        """Verify the template is sent as JSON encoded bytes."""
         mock_request.return_value = self._make_mock_resp(RELATION_RESPONSE)
 
         template = dooray.TemplateBuilder()\
@@ -338,7 +363,7 @@ class TestDoorayProject(unittest.TestCase):
             .create()
         self._dooray.project.create_template("proj-1", template)
 
-        body = mock_request.call_args.kwargs["json"]
+        body = json.loads(mock_request.call_args.kwargs["data"])
         self.assertEqual(body["templateName"], "Test Template")
 
     @patch("requests.request")
@@ -365,7 +390,7 @@ class TestDoorayProject(unittest.TestCase):
 
     @patch("requests.request")
     def test_update_template(self, mock_request):
-        """Verify PUT with to_json_dict()."""
+        """Verify PUT with JSON encoded bytes."""
         mock_request.return_value = self._make_mock_resp(RESPONSE_HEADER_SUCCESS)
 
         template = dooray.TemplateBuilder()\
@@ -375,7 +400,7 @@ class TestDoorayProject(unittest.TestCase):
 
         call_args = mock_request.call_args
         self.assertEqual(call_args[0][0], "PUT")
-        body = call_args.kwargs["json"]
+        body = json.loads(call_args.kwargs["data"])
         self.assertEqual(body["templateName"], "Updated")
 
     @patch("requests.request")
@@ -393,7 +418,7 @@ class TestDoorayProject(unittest.TestCase):
 
     @patch("requests.request")
     def test_create_post(self, mock_request):
-        """Verify to_json_dict() is called on post object."""
+        """Verify the post is sent as JSON encoded bytes."""
         mock_request.return_value = self._make_mock_resp(RELATION_RESPONSE)
 
         post = dooray.PostBuilder()\
@@ -402,8 +427,9 @@ class TestDoorayProject(unittest.TestCase):
             .create()
         self._dooray.project.create_post("proj-1", post)
 
-        body = mock_request.call_args.kwargs["json"]
+        body = json.loads(mock_request.call_args.kwargs["data"])
         self.assertEqual(body["subject"], "Test Post")
+        self.assertEqual(mock_request.call_args.kwargs["headers"]["Content-Type"], "application/json")
 
     @patch("requests.request")
     def test_get_posts_tag_ids_mapping(self, mock_request):
@@ -460,6 +486,19 @@ class TestDoorayProject(unittest.TestCase):
         self.assertEqual(params["dueAt"], "prev-7d")
         self.assertEqual(params["order"], "-createdAt")
 
+    @patch("requests.request")
+    def test_get_posts_without_body(self, mock_request):
+        """with_body=False drops the bodies of the posts."""
+        mock_request.return_value = self._make_mock_resp(POST_LIST_RESPONSE)
+
+        with_body = self._dooray.project.get_posts("proj-1")
+        mock_request.return_value = self._make_mock_resp(deepcopy(POST_LIST_RESPONSE))
+        without_body = self._dooray.project.get_posts("proj-1", with_body=False)
+
+        self.assertEqual(with_body.result[0].body.content, "body")
+        self.assertIsNone(without_body.result[0].body)
+        self.assertEqual(without_body.result[0].subject, "Test Post")
+
     @patch("requests.request")
     def test_get_post(self, mock_request):
         """Verify endpoint with post_id."""
@@ -522,6 +561,93 @@ class TestDoorayProject(unittest.TestCase):
         self.assertEqual(call_args[0][0], "POST")
         self.assertIn("/posts/post-1/set-done", call_args[0][1])
 
+    @patch("requests.request")
+    def test_get_posts_without_interning(self, mock_request):
+        """Nested entities are built per post by default."""
+        mock_request.return_value = self._make_mock_resp(SHARED_POST_LIST_RESPONSE)
+
+        posts = self._dooray.project.get_posts("proj-1").result
+
+        self.assertIsNot(posts[0].project, posts[1].project)
+        self.assertEqual(posts[0].project.id, posts[1].project.id)
+
+    @patch("requests.request")
+    def test_get_posts_interning_per_response(self, mock_request):
+        """interning='response' shares nested entities within a response only."""
+        mock_request.return_value = self._make_mock_resp(SHARED_POST_LIST_RESPONSE)
+        d = dooray.Dooray(token="test-token", interning='response')
+
+        posts = d.project.get_posts("proj-1").result
+        other = d.project.get_posts("proj-1").result
+
+        self.assertIs(posts[0].project, posts[2].project)
+        self.assertIs(posts[0].workflow, posts[1].workflow)
+        self.assertIs(posts[0].milestone, posts[1].milestone)
+        self.assertIs(posts[0].tags[1], posts[1].tags[1])
+        self.assertIs(posts[0].users.to[0], posts[1].users.to[0])
+        self.assertIsNot(posts[0].project, other[0].project)
+        self.assertIsNone(d.project.interner)
+
+    @patch("requests.request")
+    def test_get_posts_interning_per_client(self, mock_request):
+        """interning='client' shares nested entities across responses."""
+        mock_request.return_value = self._make_mock_resp(SHARED_POST_LIST_RESPONSE)
+        d = dooray.Dooray(token="test-token", interning='client')
+
+        posts = d.project.get_posts("proj-1").result
+        other = d.project.get_posts("proj-1").result
+
+        self.assertIs(posts[0].project, other[1].project)
+        self.assertIs(posts[0].workflow_class, other[0].workflow_class)
+
+    @patch("requests.request")
+    def test_interning_rebuilds_changed_entities(self, mock_request):
+        """An interned entity is rebuilt when the server returns different data for its id."""
+        d = dooray.Dooray(token="test-token", interning='client')
+        mock_request.return_value = self._make_mock_resp(SHARED_POST_LIST_RESPONSE)
+        before = d.project.get_posts("proj-1").result[0]
+
+        renamed = {
+            **RESPONSE_HEADER_SUCCESS,
+            "result": [{**e, "workflow": {"id": "wf-2", "name": "Doing"}} for e in SHARED_POST_LIST_RESPONSE["result"]],
+            "totalCount": 3
+        }
+        mock_request.return_value = self._make_mock_resp(renamed)
+        after = d.project.get_posts("proj-1").result[0]
+
+        self.assertEqual(before.workflow.name, "Working")
+        self.assertEqual(after.workflow.name, "Doing")
+        self.assertIs(before.project, after.project)
+
+    @patch("requests.request")
+    def test_interning_shares_ids(self, mock_request):
+        """The ids of the posts and of their nested entities are shared across responses."""
+        d = dooray.Dooray(token="test-token", interning='client')
+        mock_request.return_value = self._make_mock_resp(json.loads(json.dumps(SHARED_POST_LIST_RESPONSE)))
+        posts = d.project.get_posts("proj-1").result
+        mock_request.return_value = self._make_mock_resp(json.loads(json.dumps(SHARED_POST_LIST_RESPONSE)))
+        other = d.project.get_posts("proj-1").result
+
+        self.assertIs(posts[0].id, other[0].id)
+        self.assertIs(posts[0].users.to[0].member.organization_member_id,
+                      other[1].users.to[0].member.organization_member_id)
+
+    def test_interned_strings_lru(self):
+        """The least recently used strings are dropped first."""
+        interner = dooray.DoorayObjects.ObjectInterner(max_size=2)
+        a = interner.intern_string("".join(["a", "1"]))
+        interner.intern_string("b1")
+        interner.intern_string("".join(["a", "1"]))
+        interner.intern_string("c1")
+
+        self.assertIs(interner.intern_string("".join(["a", "1"])), a)
+        self.assertEqual(list(interner._strings), ["c1", "a1"])
+
+    def test_invalid_interning(self):
+        """Unknown interning scope raises ValueError."""
+        with self.assertRaises(ValueError):
+            dooray.Dooray(token="test-token", interning='global')
+
     # --- Project > Post Logs ---
 
     @patch("requests.request")
@@ -547,6 +673,17 @@ class TestDoorayProject(unittest.TestCase):
         self.assertEqual(params["size"], 10)
         self.assertEqual(params["order"], "-createdAt")
 
+    @patch("requests.request")
+    def test_get_post_logs_without_body(self, mock_request):
+        """with_body=False drops the bodies of the logs."""
+        mock_request.return_value = self._make_mock_resp(deepcopy(POST_LOG_LIST_RESPONSE))
+
+        result = self._dooray.project.get_post_logs("proj-1", "post-1", with_body=False)
+
+        self.assertIsNone(result.result[0].body)
+        self.assertEqual(result.result[0].id, "log-1")
+        self.assertNotIn("with_body", mock_request.call_args.kwargs["params"])
+
     @patch("requests.request")
     def test_get_post_log(self, mock_request):
         """Verify endpoint with log_id."""
@@ -1,13 +1,18 @@
+import gc
+import json
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
 import dooray
+from dooray.MessengerHook import _retry_after
+from tests.fixtures.clock import FakeClock
 
 
 class TestMessengerHook(unittest.TestCase):
     def setUp(self):
         self._hook = dooray.MessengerHook(hook_url="https://hook.example.com/test")
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_send_returns_true_on_success(self, mock_post):
         """P0: send() must return True when status_code == 200."""
         mock_resp = MagicMock()
@@ -18,7 +23,7 @@ class TestMessengerHook(unittest.TestCase):
 
         self.assertTrue(result)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_send_returns_false_on_failure(self, mock_post):
         """P0: send() must return False when status_code != 200."""
         mock_resp = MagicMock()
@@ -29,7 +34,7 @@ class TestMessengerHook(unittest.TestCase):
 
         self.assertFalse(result)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_send_payload_structure(self, mock_post):
         """Verify the JSON body contains botName, botIconImage, and text."""
         mock_resp = MagicMock()
@@ -44,7 +49,7 @@ class TestMessengerHook(unittest.TestCase):
         self.assertEqual(payload["text"], "Test message")
         self.assertIn("botIconImage", payload)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_send_with_attachments(self, mock_post):
         """Verify attachments key is included when provided."""
         mock_resp = MagicMock()
@@ -59,7 +64,7 @@ class TestMessengerHook(unittest.TestCase):
         self.assertIn("attachments", payload)
         self.assertEqual(payload["attachments"], [{"title": "test"}])
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_send_without_attachments(self, mock_post):
         """Verify attachments key is absent when None."""
         mock_resp = MagicMock()
@@ -82,3 +87,218 @@ class TestMessengerHook(unittest.TestCase):
             dooray.MessengerHook(hook_url="http://ok", hook_name=None)
         with self.assertRaises(AssertionError):
             dooray.MessengerHook(hook_url="http://ok", hook_icon=None)
+
+    @patch("requests.Session.post")
+    def test_send_timeout(self, mock_post):
+        """The request has the timeout of the hook."""
+        mock_post.return_value = MagicMock(status_code=200)
+
+        dooray.MessengerHook(hook_url="https://hook.example.com/test", timeout=3).send("Hello")
+
+        self.assertEqual(mock_post.call_args.kwargs["timeout"], 3)
+
+    @patch("requests.Session.post")
+    def test_session_per_thread(self, mock_post):
+        """Each thread reuses its own session, which shares the connection pool."""
+        mock_post.return_value = MagicMock(status_code=200)
+        sessions = []
+
+        def send():
+            self._hook.send("Hello")
+            self._hook.send("Hello")
+            sessions.append(self._hook._session())
+
+        threads = [threading.Thread(target=send) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(set(map(id, sessions))), 3)
+        self.assertTrue(all(e.get_adapter("https://hook.example.com") is self._hook._adapter for e in sessions))
+        self.assertEqual(mock_post.call_count, 6)
+
+    @patch("requests.Session.post")
+    def test_sessions_of_finished_threads(self, mock_post):
+        """The sessions of finished threads are not kept."""
+        mock_post.return_value = MagicMock(status_code=200)
+
+        for _ in range(50):
+            t = threading.Thread(target=self._hook.send, args=("Hello",))
+            t.start()
+            t.join()
+        gc.collect()
+
+        self.assertEqual(mock_post.call_count, 50)
+        self.assertEqual(len(self._hook._sessions), 0)
+
+    @patch("requests.Session.post")
+    def test_close(self, mock_post):
+        """Closing drops the sessions; the hook can be used again."""
+        mock_post.return_value = MagicMock(status_code=200)
+
+        with dooray.MessengerHook(hook_url="https://hook.example.com/test") as hook:
+            hook.send("Hello")
+            session = hook._session()
+        self.assertEqual(len(hook._sessions), 0)
+
+        self.assertTrue(hook.send("Hello"))
+        self.assertIsNot(hook._session(), session)
+
+
+@patch("random.uniform", lambda a, b: b)
+class TestMessengerHookThrottling(unittest.TestCase):
+    def setUp(self):
+        self._clock = FakeClock(1000.0)
+        sleep_patcher = patch("time.sleep", side_effect=self._clock.sleep)
+        self._sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    def _hook(self, **kwargs):
+        return dooray.MessengerHook(hook_url="https://hook.example.com/test", clock=self._clock, **kwargs)
+
+    @patch("requests.Session.post")
+    def test_rate(self, mock_post):
+        """Sends wait for the rate after the burst."""
+        mock_post.return_value = MagicMock(status_code=200)
+        hook = self._hook(rate=2, burst=2)
+        times = []
+        mock_post.side_effect = lambda *args, **kwargs: times.append(self._clock.now) or MagicMock(status_code=200)
+
+        for _ in range(4):
+            hook.send("Hello")
+
+        self.assertEqual(times, [1000.0, 1000.0, 1000.5, 1001.0])
+        self.assertEqual(hook.sent, 4)
+
+    @patch("requests.Session.post")
+    def test_retry_after(self, mock_post):
+        """A 429 is retried after Retry-After, which later sends wait for as well."""
+        mock_post.side_effect = [
+            MagicMock(status_code=429, headers={"Retry-After": "5"}),
+            MagicMock(status_code=200),
+        ]
+        hook = self._hook(backoff=0.5)
+
+        self.assertTrue(hook.send("Hello"))
+
+        self.assertEqual(self._clock.now, 1005.5)
+        self.assertEqual(hook.stats(), {"sent": 1, "throttled": 1, "retried": 1, "dropped": 0})
+
+    @patch("requests.Session.post")
+    def test_pause_shared(self, mock_post):
+        """Other sends do not go out before Retry-After."""
+        hook = self._hook()
+        hook._bucket.pause(10)
+        mock_post.return_value = MagicMock(status_code=200)
+
+        hook.send("Hello")
+
+        self._sleep.assert_called_once_with(10)
+
+    @patch("requests.Session.post")
+    def test_backoff(self, mock_post):
+        """Without Retry-After, the wait doubles up to max_backoff, and the message is dropped after max_retries."""
+        mock_post.return_value = MagicMock(status_code=503, headers={})
+        hook = self._hook(max_retries=4, backoff=1, max_backoff=3)
+
+        self.assertFalse(hook.send("Hello"))
+
+        self.assertEqual([e.args[0] for e in self._sleep.call_args_list], [1, 2, 3, 3])
+        self.assertEqual(hook.stats(), {"sent": 0, "throttled": 5, "retried": 4, "dropped": 1})
+
+    @patch("requests.Session.post")
+    def test_retry_after_too_long(self, mock_post):
+        """A message is given up at once when Retry-After is longer than max_retry_wait."""
+        mock_post.return_value = MagicMock(status_code=429, headers={"Retry-After": "120"})
+        hook = self._hook(max_retry_wait=60)
+
+        self.assertFalse(hook.send("Hello"))
+
+        self._sleep.assert_not_called()
+        self.assertEqual(hook.dropped, 1)
+
+    @patch("requests.Session.post")
+    def test_not_retried(self, mock_post):
+        """Other errors are not retried."""
+        mock_post.return_value = MagicMock(status_code=400)
+        hook = self._hook()
+
+        self.assertFalse(hook.send("Hello"))
+
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(hook.stats(), {"sent": 0, "throttled": 0, "retried": 0, "dropped": 1})
+
+    def test_retry_after_date(self):
+        """Retry-After can be an HTTP date."""
+        headers = {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}
+        self.assertEqual(_retry_after(headers), 0.0)
+        self.assertIsNone(_retry_after({"Retry-After": "soon"}))
+
+    def test_assertions(self):
+        """Invalid rate limiting parameters are rejected."""
+        with self.assertRaises(ValueError):
+            self._hook(rate=0)
+        with self.assertRaises(ValueError):
+            self._hook(burst=0)
+        with self.assertRaises(TypeError):
+            self._hook(max_retries=None)
+
+
+class TestMessengerHookMessage(unittest.TestCase):
+    def setUp(self):
+        self._hook = dooray.MessengerHook(hook_url="https://hook.example.com/test", hook_name="Metrics Bot")
+
+    def test_encode(self):
+        """The compiled payload is the one send() would post."""
+        message = self._hook.compile([
+            {"title": "CPU usage", "text": dooray.MessengerHookField("usage"), "color": "red"},
+            {"title": dooray.MessengerHookField("host"), "text": dooray.MessengerHookField("usage")},
+        ])
+
+        payload = json.loads(message.encode('db-1 "busy" 한글', usage=93.5, host="db-1"))
+
+        self.assertEqual(payload, {
+            "botName": "Metrics Bot",
+            "botIconImage": "https://static.dooray.com/static_images/dooray-bot.png",
+            "text": 'db-1 "busy" 한글',
+            "attachments": [
+                {"title": "CPU usage", "text": 93.5, "color": "red"},
+                {"title": "db-1", "text": 93.5},
+            ],
+        })
+        self.assertEqual(message.fields, ["usage", "host"])
+
+    def test_encode_without_attachments(self):
+        """Only the text varies without attachments."""
+        message = self._hook.compile()
+
+        self.assertEqual(json.loads(message.encode("Hello"))["text"], "Hello")
+        self.assertEqual(message.fields, [])
+
+    @patch("requests.Session.post")
+    def test_send(self, mock_post):
+        """The payload is posted as bytes."""
+        mock_post.return_value = MagicMock(status_code=200)
+        message = self._hook.compile([{"text": dooray.MessengerHookField("value")}])
+
+        self.assertTrue(message.send("Hello", value="1"))
+
+        kwargs = mock_post.call_args.kwargs
+        self.assertEqual(json.loads(kwargs["data"])["attachments"], [{"text": "1"}])
+        self.assertEqual(kwargs["headers"]["Content-Type"], "application/json")
+        self.assertEqual(self._hook.sent, 1)
+
+    def test_assertions(self):
+        """Missing fields and invalid names are rejected."""
+        message = self._hook.compile([{"text": dooray.MessengerHookField("value")}])
+        with self.assertRaises(ValueError):
+            message.encode("Hello")
+        with self.assertRaises(TypeError):
+            message.encode(None, value="1")
+        with self.assertRaises(ValueError):
+            dooray.MessengerHookField("text")
+        with self.assertRaises(ValueError):
+            dooray.MessengerHookField("not a name")
+        with self.assertRaises(ValueError):
+            dooray.MessengerHookField("사용률")
@@ -74,3 +74,13 @@ class TestMessengerHookAttachments(unittest.TestCase):
 
         self.assertEqual(len(result2), 1)
         self.assertEqual(result2[0]['title'], 'Base')
+
+    def testFork(self):
+        """fork() returns an independent builder starting from the same state."""
+        base = dooray.MessengerHookAttachments.builder()\
+            .add_attachment(title='Base')
+
+        forked = base.fork().add_attachment(text='Extra')
+
+        self.assertEqual(base.create(), [{'title': 'Base'}])
+        self.assertEqual(forked.create(), [{'title': 'Base'}, {'text': 'Extra'}])
@@ -0,0 +1,171 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+import dooray
+from tests.fixtures.clock import FakeClock
+
+
+class TestDedupingMessengerHook(unittest.TestCase):
+    def setUp(self):
+        self._clock = FakeClock(1000.0)
+        self._hook = dooray.MessengerHook(hook_url="https://hook.example.com/test")
+        self._hook.send = MagicMock(return_value=True)
+
+    def _dedupe(self, **kwargs):
+        return dooray.DedupingMessengerHook(self._hook, check_interval=None, clock=self._clock, **kwargs)
+
+    def _sent_texts(self):
+        return [e.args[0] for e in self._hook.send.call_args_list]
+
+    def test_suppress_and_summarize(self):
+        """Repeats within the window are suppressed and summarized when it closes."""
+        hook = self._dedupe(window=60)
+
+        self.assertTrue(hook.send("db-1 is down"))
+        for _ in range(4):
+            self.assertFalse(hook.send("db-1 is down"))
+        self.assertTrue(hook.send("db-2 is down"))
+        self._clock.now += 59
+        hook.expire()
+        self.assertEqual(self._sent_texts(), ["db-1 is down", "db-2 is down"])
+
+        self._clock.now += 1
+        hook.expire()
+
+        self.assertEqual(self._sent_texts(), ["db-1 is down", "db-2 is down", "db-1 is down (repeated 4 times)"])
+        self.assertEqual(hook.stats(), {"sent": 2, "suppressed": 4, "summaries": 1, "windows": 0})
+
+    def test_new_window(self):
+        """A message after the window is sent again, after the summary."""
+        hook = self._dedupe(window=10, summary_text="{count}x {text}")
+        hook.send("flap")
+        hook.send("flap")
+        self._clock.now += 10
+
+        self.assertTrue(hook.send("flap"))
+
+        self.assertEqual(self._sent_texts(), ["flap", "1x flap", "flap"])
+
+    def test_first_send_fails(self):
+        """A message the hook does not accept does not suppress the next one."""
+        hook = self._dedupe()
+        self._hook.send.side_effect = [False, ConnectionError("down"), True, True]
+
+        self.assertFalse(hook.send("db-1 is down"))
+        with self.assertRaises(ConnectionError):
+            hook.send("db-1 is down")
+        self.assertTrue(hook.send("db-1 is down"))
+        self.assertFalse(hook.send("db-1 is down"))
+        hook.close()
+
+        self.assertEqual(self._sent_texts(), ["db-1 is down"] * 3 + ["db-1 is down (repeated 1 times)"])
+        self.assertEqual(hook.stats(), {"sent": 1, "suppressed": 1, "summaries": 1, "windows": 0})
+
+    def test_key(self):
+        """Messages with the same key are repeats, whatever their text."""
+        hook = self._dedupe()
+
+        hook.send("cpu 91%", key="cpu:db-1")
+        self.assertFalse(hook.send("cpu 95%", key="cpu:db-1"))
+        self.assertTrue(hook.send("cpu 91%", [{"text": "details"}]))
+
+        self.assertEqual(hook.suppressed, 1)
+
+    def test_max_keys(self):
+        """The oldest window is closed early when there are too many."""
+        hook = self._dedupe(max_keys=2)
+        hook.send("a")
+        hook.send("a")
+        hook.send("b")
+
+        hook.send("c")
+
+        self.assertEqual(self._sent_texts(), ["a", "b", "a (repeated 1 times)", "c"])
+        self.assertEqual(hook.stats()["windows"], 2)
+
+    def test_close(self):
+        """Closing summarizes the open windows."""
+        with self._dedupe() as hook:
+            hook.send("a")
+            hook.send("a")
+            hook.send("b")
+
+        self.assertEqual(self._sent_texts(), ["a", "b", "a (repeated 1 times)"])
+
+    def test_threads(self):
+        """Only one of the concurrent repeats is sent."""
+        hook = self._dedupe()
+        barrier = threading.Barrier(8)
+
+        def send():
+            barrier.wait()
+            for _ in range(100):
+                hook.send("same")
+
+        threads = [threading.Thread(target=send) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(self._hook.send.call_count, 1)
+        self.assertEqual(hook.suppressed, 799)
+
+    def _send_during_first(self, hook, repeats, results):
+        # The first send fails after the repeats have come from other threads
+        started = threading.Event()
+        release = threading.Event()
+
+        def send(text, attachments=None):
+            if not started.is_set():
+                started.set()
+                release.wait(5)
+            return results.pop(0)
+
+        self._hook.send.side_effect = send
+        thread_result = []
+        thread = threading.Thread(target=lambda: thread_result.append(hook.send("db-1 is down")))
+        thread.start()
+        started.wait(5)
+        repeated = [threading.Thread(target=hook.send, args=("db-1 is down",)) for _ in range(repeats)]
+        for t in repeated:
+            t.start()
+        for t in repeated:
+            t.join()
+        self.assertEqual(hook.suppressed, repeats)
+        release.set()
+        thread.join()
+        return thread_result[0]
+
+    def test_repeats_during_failed_send(self):
+        """Repeats which came while the first message failed are sent again instead of being lost."""
+        hook = self._dedupe(window=60)
+
+        self.assertTrue(self._send_during_first(hook, 3, [False, True]))
+        self.assertEqual(hook.stats(), {"sent": 1, "suppressed": 2, "summaries": 0, "windows": 1})
+        self._clock.now += 60
+        hook.expire()
+
+        self.assertEqual(self._sent_texts(), ["db-1 is down"] * 2 + ["db-1 is down (repeated 2 times)"])
+
+    def test_repeats_during_failed_send_while_down(self):
+        """While the hook does not accept the message, none of the repeats is counted as suppressed."""
+        hook = self._dedupe(window=60)
+
+        self.assertFalse(self._send_during_first(hook, 3, [False] * 4))
+
+        self.assertEqual(self._sent_texts(), ["db-1 is down"] * 4)
+        self.assertEqual(hook.stats(), {"sent": 0, "suppressed": 0, "summaries": 0, "windows": 0})
+
+    def test_background_thread(self):
+        """The background thread sends the summaries."""
+        summarized = threading.Event()
+        self._hook.send.side_effect = lambda text, attachments=None: summarized.set() or True
+        hook = dooray.DedupingMessengerHook(self._hook, window=0.2, check_interval=0.01)
+        hook.send("a")
+        summarized.clear()
+        hook.send("a")
+
+        self.assertTrue(summarized.wait(5))
+        hook.close()
+        self.assertEqual(self._sent_texts(), ["a", "a (repeated 1 times)"])
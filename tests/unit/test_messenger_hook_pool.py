@@ -0,0 +1,84 @@
+import json
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+import dooray
+
+
+def make_hooks(count):
+    return [
+        dooray.MessengerHook(hook_url=f"https://hook.example.com/{i}", hook_name=f"Bot {i}") for i in range(count)
+    ]
+
+
+class TestMessengerHookPool(unittest.TestCase):
+    @patch("requests.Session.post")
+    def test_send(self, mock_post):
+        """Each hook gets the message with its own name and icon."""
+        mock_post.return_value = MagicMock(status_code=200)
+        hooks = make_hooks(3)
+
+        with dooray.MessengerHookPool(hooks) as pool:
+            results = pool.send("한글 alert", [{"title": "t"}])
+
+        self.assertEqual([e.hook for e in results], hooks)
+        self.assertTrue(all(e.ok for e in results))
+        payloads = {e.args[0]: json.loads(e.kwargs["data"]) for e in mock_post.call_args_list}
+        self.assertEqual(payloads["https://hook.example.com/1"], {
+            "botName": "Bot 1",
+            "botIconImage": "https://static.dooray.com/static_images/dooray-bot.png",
+            "text": "한글 alert",
+            "attachments": [{"title": "t"}],
+        })
+        self.assertEqual(mock_post.call_args.kwargs["headers"]["Content-Type"], "application/json")
+
+    @patch("requests.Session.post")
+    def test_concurrent(self, mock_post):
+        """The hooks are sent to at the same time, up to max_workers."""
+        barrier = threading.Barrier(4, timeout=5)
+
+        def post(*args, **kwargs):
+            barrier.wait()
+            return MagicMock(status_code=200)
+
+        mock_post.side_effect = post
+        with dooray.MessengerHookPool(make_hooks(8), max_workers=4) as pool:
+            results = pool.send("Hello")
+
+        self.assertTrue(all(e.ok for e in results))
+        self.assertEqual(mock_post.call_count, 8)
+
+    @patch("requests.Session.post")
+    def test_results(self, mock_post):
+        """Failures are reported per hook."""
+        def post(url, **kwargs):
+            if url.endswith("/1"):
+                return MagicMock(status_code=400)
+            if url.endswith("/2"):
+                raise ConnectionError("down")
+            return MagicMock(status_code=200)
+
+        mock_post.side_effect = post
+        hooks = make_hooks(3)
+        with dooray.MessengerHookPool(hooks) as pool:
+            results = pool.send("Hello")
+
+        self.assertEqual([e.ok for e in results], [True, False, False])
+        self.assertIsNone(results[1].error)
+        self.assertIsInstance(results[2].error, ConnectionError)
+        self.assertEqual(hooks[0].sent, 1)
+        self.assertEqual(hooks[1].dropped, 1)
+
+    def test_shared_adapter(self):
+        """The connections are pooled per host and shared by the hooks."""
+        with dooray.MessengerHookPool(make_hooks(3), max_workers=5) as pool:
+            session = pool._session()
+            self.assertIs(session.get_adapter("https://hook.example.com/1"), pool._adapter)
+            self.assertEqual(pool._adapter._pool_maxsize, 5)
+
+    def test_assertions(self):
+        """Invalid parameters are rejected."""
+        with self.assertRaises(TypeError):
+            dooray.MessengerHookPool(["https://hook.example.com"])
+        with self.assertRaises(ValueError):
+            dooray.MessengerHookPool(make_hooks(1), max_workers=0)
@@ -0,0 +1,286 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+import dooray
+
+
+def make_hook(side_effect=None):
+    """Helper to create a hook whose send() is mocked."""
+    hook = dooray.MessengerHook(hook_url="https://hook.example.com/test")
+    hook.send = MagicMock(return_value=True, side_effect=side_effect)
+    return hook
+
+
+class BlockingSend:
+    """send() which blocks until released."""
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def __call__(self, text, attachments=None):
+        self.started.set()
+        self.release.wait(5)
+        return True
+
+
+class TestQueuedMessengerHook(unittest.TestCase):
+    def test_send_and_flush(self):
+        """Messages are sent in order by the worker."""
+        hook = make_hook()
+        results = []
+        queued = dooray.QueuedMessengerHook(hook, callback=results.append)
+
+        for i in range(5):
+            self.assertTrue(queued.send(f"message {i}", [{"text": "a"}]))
+        self.assertTrue(queued.flush(5))
+
+        self.assertEqual([e.args[0] for e in hook.send.call_args_list], [f"message {i}" for i in range(5)])
+        self.assertTrue(all(e.ok for e in results))
+        self.assertEqual(queued.stats()["sent"], 5)
+        queued.close()
+
+    def test_failures_are_reported(self):
+        """Rejected messages and exceptions are passed to the callback."""
+        hook = make_hook(side_effect=[False, ConnectionError("down")])
+        results = []
+        queued = dooray.QueuedMessengerHook(hook)
+
+        queued.send("first", callback=results.append)
+        queued.send("second", callback=results.append)
+        queued.close(5)
+
+        self.assertFalse(results[0].ok)
+        self.assertIsNone(results[0].error)
+        self.assertIsInstance(results[1].error, ConnectionError)
+        self.assertEqual(queued.failed, 2)
+
+    def test_drop_newest(self):
+        """A full queue drops the new message."""
+        blocking = BlockingSend()
+        hook = make_hook(side_effect=blocking)
+        results = []
+        queued = dooray.QueuedMessengerHook(hook, max_queue_size=1, policy="drop_newest", callback=results.append)
+
+        queued.send("in flight")
+        blocking.started.wait(5)
+        self.assertTrue(queued.send("queued"))
+        self.assertFalse(queued.send("dropped"))
+        blocking.release.set()
+        queued.close(5)
+
+        self.assertEqual([e.text for e in results if e.dropped], ["dropped"])
+        self.assertEqual(queued.sent, 2)
+
+    def test_drop_oldest(self):
+        """A full queue drops the oldest message."""
+        blocking = BlockingSend()
+        hook = make_hook(side_effect=blocking)
+        results = []
+        queued = dooray.QueuedMessengerHook(hook, max_queue_size=1, policy="drop_oldest", callback=results.append)
+
+        queued.send("in flight")
+        blocking.started.wait(5)
+        queued.send("oldest")
+        self.assertTrue(queued.send("newest"))
+        blocking.release.set()
+        queued.close(5)
+
+        self.assertEqual([e.text for e in results if e.dropped], ["oldest"])
+        self.assertEqual([e.text for e in results if e.ok], ["in flight", "newest"])
+
+    def test_block_timeout(self):
+        """The 'block' policy waits for room, and drops on timeout."""
+        blocking = BlockingSend()
+        hook = make_hook(side_effect=blocking)
+        queued = dooray.QueuedMessengerHook(hook, max_queue_size=1, policy="block", block_timeout=0.05)
+
+        queued.send("in flight")
+        blocking.started.wait(5)
+        queued.send("queued")
+        self.assertFalse(queued.send("timed out"))
+        blocking.release.set()
+
+        self.assertTrue(queued.send("after"))
+        queued.close(5)
+        self.assertEqual(queued.dropped, 1)
+
+    def test_close_timeout(self):
+        """close() returns False and drops the rest on timeout; sending afterwards raises."""
+        blocking = BlockingSend()
+        hook = make_hook(side_effect=blocking)
+        results = []
+        queued = dooray.QueuedMessengerHook(hook, callback=results.append)
+
+        queued.send("in flight")
+        blocking.started.wait(5)
+        queued.send("queued")
+        self.assertFalse(queued.close(0.05))
+        blocking.release.set()
+
+        self.assertEqual([e.text for e in results if e.dropped], ["queued"])
+        with self.assertRaises(RuntimeError):
+            queued.send("closed")
+
+    def test_workers(self):
+        """Several workers send concurrently."""
+        hook = make_hook()
+        with dooray.QueuedMessengerHook(hook, workers=4) as queued:
+            for i in range(20):
+                queued.send(f"message {i}")
+        self.assertEqual(hook.send.call_count, 20)
+
+    def test_constructor_arguments(self):
+        """Invalid arguments are rejected."""
+        with self.assertRaises(TypeError):
+            dooray.QueuedMessengerHook("https://hook.example.com/test")
+        with self.assertRaises(ValueError):
+            dooray.QueuedMessengerHook(make_hook(), policy="drop_all")
+        with self.assertRaises(ValueError):
+            dooray.QueuedMessengerHook(make_hook(), workers=0)
+
+
+class TestCoalescing(unittest.TestCase):
+    def test_burst_is_coalesced(self):
+        """A burst is sent in requests of up to coalesce_max_items messages."""
+        hook = make_hook()
+        queued = dooray.QueuedMessengerHook(hook, coalesce_window=0.05, coalesce_max_items=10)
+
+        for i in range(25):
+            queued.send(f"alert {i}", [{"title": f"detail {i}"}])
+        queued.close(5)
+
+        self.assertLessEqual(hook.send.call_count, 4)
+        self.assertEqual(queued.sent, 25)
+        texts = [e.args[0] for e in hook.send.call_args_list]
+        self.assertIn("10 messages", texts)
+        attachments = [a for e in hook.send.call_args_list if e.args[1] is not None for a in e.args[1]]
+        self.assertIn({"text": "alert 3"}, attachments)
+        self.assertIn({"title": "detail 3"}, attachments)
+
+    def test_single_message_is_sent_as_is(self):
+        """A message alone in its window is not merged."""
+        hook = make_hook()
+        queued = dooray.QueuedMessengerHook(hook, coalesce_window=0.01)
+
+        queued.send("alone", [{"title": "detail"}])
+        queued.close(5)
+
+        hook.send.assert_called_once_with("alone", [{"title": "detail"}])
+
+    def test_payload_size_limit(self):
+        """Messages are not merged beyond max_payload_bytes."""
+        hook = make_hook()
+        blocking = BlockingSend()
+        hook.send.side_effect = blocking
+        queued = dooray.QueuedMessengerHook(hook, coalesce_window=0, coalesce_max_items=100, max_payload_bytes=100)
+
+        queued.send("first")
+        blocking.started.wait(5)
+        for i in range(6):
+            queued.send("x" * 30)
+        blocking.release.set()
+        queued.close(5)
+
+        # Each merged message is about 45 bytes, so 2 fit within 100 bytes
+        self.assertEqual(hook.send.call_count, 4)
+        self.assertEqual(queued.sent, 7)
+
+    def test_callbacks_of_merged_messages(self):
+        """Every merged message gets its own result."""
+        hook = make_hook()
+        results = []
+        queued = dooray.QueuedMessengerHook(hook, coalesce_window=0.05, callback=results.append)
+
+        for i in range(3):
+            queued.send(f"alert {i}")
+        queued.close(5)
+
+        self.assertEqual(sorted(e.text for e in results), ["alert 0", "alert 1", "alert 2"])
+        self.assertTrue(all(e.ok for e in results))
+
+
+class TestPriorities(unittest.TestCase):
+    def _queue_behind(self, **kwargs):
+        """A queue whose worker is busy with a first message until released."""
+        blocking = BlockingSend()
+        hook = make_hook(side_effect=blocking)
+        queued = dooray.QueuedMessengerHook(hook, **kwargs)
+        queued.send("in flight")
+        blocking.started.wait(5)
+        return hook, blocking, queued
+
+    def test_higher_first(self):
+        """The higher lanes are sent first, each in order."""
+        hook, blocking, queued = self._queue_behind()
+        queued.send("low 1", priority="low")
+        queued.send("normal 1")
+        queued.send("high 1", priority="high")
+        queued.send("low 2", priority="low")
+        queued.send("high 2", priority="high")
+
+        self.assertEqual(queued.stats()["lanes"], {"high": 2, "normal": 1, "low": 2})
+        blocking.release.set()
+        queued.close(5)
+
+        self.assertEqual(
+            [e.args[0] for e in hook.send.call_args_list],
+            ["in flight", "high 1", "high 2", "normal 1", "low 1", "low 2"],
+        )
+
+    def test_preemption(self):
+        """A full queue drops a lower message for a higher one, whatever the policy."""
+        results = []
+        hook, blocking, queued = self._queue_behind(
+            max_queue_size=2, policy="drop_newest", callback=results.append
+        )
+        queued.send("normal")
+        queued.send("low", priority="low")
+
+        self.assertTrue(queued.send("high", priority="high"))
+        self.assertFalse(queued.send("low 2", priority="low"))
+        self.assertTrue(queued.send("high 2", priority="high"))
+        self.assertFalse(queued.send("high 3", priority="high"))
+        blocking.release.set()
+        queued.close(5)
+
+        self.assertEqual([e.text for e in results if e.dropped], ["low", "low 2", "normal", "high 3"])
+        self.assertEqual([e.text for e in results if e.ok], ["in flight", "high", "high 2"])
+
+    def test_drop_oldest_keeps_higher(self):
+        """'drop_oldest' does not drop a higher message for a lower one."""
+        results = []
+        hook, blocking, queued = self._queue_behind(
+            max_queue_size=1, policy="drop_oldest", callback=results.append
+        )
+        queued.send("high", priority="high")
+
+        self.assertFalse(queued.send("normal"))
+        blocking.release.set()
+        queued.close(5)
+
+        self.assertEqual([e.text for e in results if e.dropped], ["normal"])
+
+    def test_starvation(self):
+        """A lower lane sends a message after being passed over `starvation_limit` times."""
+        hook, blocking, queued = self._queue_behind(starvation_limit=2)
+        for i in range(2):
+            queued.send(f"low {i}", priority="low")
+        for i in range(2):
+            queued.send(f"normal {i}")
+        for i in range(5):
+            queued.send(f"high {i}", priority="high")
+        blocking.release.set()
+        queued.close(5)
+
+        self.assertEqual([e.args[0] for e in hook.send.call_args_list], [
+            "in flight", "high 0", "high 1", "normal 0", "low 0", "high 2", "high 3", "normal 1", "low 1", "high 4",
+        ])
+
+    def test_priority_argument(self):
+        """Unknown priorities are rejected."""
+        queued = dooray.QueuedMessengerHook(make_hook())
+        with self.assertRaises(ValueError):
+            queued.send("message", priority="urgent")
+        with self.assertRaises(ValueError):
+            dooray.QueuedMessengerHook(make_hook(), starvation_limit=0)
+        queued.close()
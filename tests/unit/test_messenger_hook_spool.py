@@ -0,0 +1,233 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+import dooray
+from tests.fixtures.clock import FakeClock
+
+
+class TestMessengerHookSpool(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._clock = FakeClock(1000.0)
+        self._hook = dooray.MessengerHook(hook_url="https://hook.example.com/test")
+        self._hook._send_status = MagicMock(return_value=200)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _spool(self, **kwargs):
+        return dooray.MessengerHookSpool(
+            self._hook, self._dir.name, replay_interval=None, clock=self._clock, **kwargs
+        )
+
+    def _sent_texts(self):
+        return [e.args[0] for e in self._hook._send_status.call_args_list]
+
+    def test_send_when_up(self):
+        """Messages are sent directly while the hook is up."""
+        spool = self._spool()
+
+        self.assertTrue(spool.send("Hello", [{"text": "a"}]))
+
+        self._hook._send_status.assert_called_once_with("Hello", [{"text": "a"}])
+        self.assertEqual(spool.pending_bytes(), 0)
+
+    def test_spool_and_replay_in_order(self):
+        """Undelivered messages are spooled, and replayed in order after the backoff."""
+        spool = self._spool(backoff=10)
+        self._hook._send_status.return_value = 503
+        self.assertFalse(spool.send("first"))
+        self._hook._send_status.side_effect = ConnectionError("down")
+        self.assertFalse(spool.send("second", [{"title": "t"}]))
+        self.assertEqual(spool.spooled, 2)
+
+        self._hook._send_status.side_effect = None
+        self._hook._send_status.return_value = 200
+        self._hook._send_status.reset_mock()
+        self.assertEqual(spool.replay(), 0)
+        self._clock.now += 10
+        self.assertTrue(spool.send("third"))
+
+        self.assertEqual(self._sent_texts(), ["first", "second", "third"])
+        self.assertEqual(self._hook._send_status.call_args_list[1].args[1], [{"title": "t"}])
+        self.assertEqual(spool.pending_bytes(), 0)
+
+    def test_rejected_message_is_dropped(self):
+        """A message the hook rejects is dropped instead of spooled, and does not hold back the next ones."""
+        spool = self._spool()
+        self._hook._send_status.return_value = 400
+        self.assertFalse(spool.send("bad"))
+        self.assertEqual(spool.dropped, 1)
+        self.assertEqual(spool.pending_bytes(), 0)
+
+        self._hook._send_status.return_value = 200
+        for i in range(5):
+            self.assertTrue(spool.send(f"message {i}"))
+        self.assertEqual(spool.delivered, 5)
+        self.assertEqual(spool.spooled, 0)
+
+    def test_outages_are_spooled(self):
+        """Unreachable hooks, 5xx and throttling after the retries are spooled."""
+        spool = self._spool()
+        for failure in (None, 500, 502, 429, 503):
+            self._hook._send_status.return_value = failure
+            self._hook._send_status.side_effect = ConnectionError("down") if failure is None else None
+            spool.send(f"message {failure}")
+
+        self.assertEqual(spool.spooled, 5)
+        self.assertEqual(spool.dropped, 0)
+
+    def test_rejected_message_is_skipped_on_replay(self):
+        """A spooled message the hook rejects is dropped, and the messages behind it are replayed."""
+        spool = self._spool()
+        self._hook._send_status.return_value = 503
+        for i in range(3):
+            spool.send(f"message {i}")
+
+        self._hook._send_status.side_effect = [200, 404, 200]
+        self.assertEqual(spool.replay(force=True), 2)
+        self.assertEqual(spool.dropped, 1)
+        self.assertEqual(spool.pending_bytes(), 0)
+
+        self._hook._send_status.side_effect = None
+        self._hook._send_status.return_value = 200
+        self._hook._send_status.reset_mock()
+        for i in range(5):
+            self.assertTrue(spool.send(f"next {i}"))
+        self.assertEqual(self._sent_texts(), [f"next {i}" for i in range(5)])
+
+    @patch("requests.Session.post")
+    def test_status_of_the_hook(self, mock_post):
+        """The status of the real hook decides between spooling and dropping."""
+        hook = dooray.MessengerHook(hook_url="https://hook.example.com/test", max_retries=0)
+        spool = dooray.MessengerHookSpool(hook, self._dir.name, replay_interval=None, clock=self._clock)
+        mock_post.return_value = MagicMock(status_code=404, headers={})
+        spool.send("rejected")
+        mock_post.return_value = MagicMock(status_code=503, headers={})
+        spool.send("throttled")
+
+        self.assertEqual(spool.dropped, 1)
+        self.assertEqual(spool.spooled, 1)
+
+    def test_backoff_doubles(self):
+        """Each failed replay doubles the wait."""
+        spool = self._spool(backoff=1, max_backoff=3)
+        self._hook._send_status.return_value = 503
+        spool.send("message")
+
+        for wait in (1, 2, 3, 3):
+            self._hook._send_status.reset_mock()
+            self._clock.now += wait - 0.5
+            spool.replay()
+            self._hook._send_status.assert_not_called()
+            self._clock.now += 0.5
+            spool.replay()
+            self._hook._send_status.assert_called_once()
+
+    def test_survives_restart(self):
+        """A new spool on the directory resumes after the delivered messages."""
+        spool = self._spool()
+        self._hook._send_status.return_value = 503
+        for i in range(3):
+            spool.send(f"message {i}")
+        spool.close()
+
+        self._hook._send_status.side_effect = [200, 503]
+        restarted = self._spool()
+        restarted.replay(force=True)
+        self._hook._send_status.side_effect = None
+        self._hook._send_status.return_value = 200
+        restarted.close()
+
+        self._hook._send_status.reset_mock()
+        self._spool().replay(force=True)
+        self.assertEqual(self._sent_texts(), ["message 1", "message 2"])
+
+    def test_max_age(self):
+        """Messages older than max_age are dropped."""
+        spool = self._spool(max_age=60)
+        self._hook._send_status.return_value = 503
+        spool.send("old")
+        self._clock.now += 30
+        spool.send("new")
+
+        self._hook._send_status.return_value = 200
+        self._hook._send_status.reset_mock()
+        self._clock.now += 40
+        spool.replay(force=True)
+
+        self.assertEqual(self._sent_texts(), ["new"])
+        self.assertEqual(spool.dropped, 1)
+
+    def test_max_bytes(self):
+        """New messages are dropped while the spool is full."""
+        spool = self._spool(max_bytes=120)
+        self._hook._send_status.return_value = 503
+
+        for i in range(5):
+            spool.send("x" * 30)
+
+        self.assertEqual(spool.spooled, 2)
+        self.assertEqual(spool.dropped, 3)
+        self.assertLessEqual(spool.pending_bytes(), 120)
+
+    def test_compaction_and_torn_line(self):
+        """Delivered messages are removed from the file; a partly written line is skipped."""
+        spool = self._spool()
+        self._hook._send_status.return_value = 503
+        for i in range(4):
+            spool.send(f"message {i}")
+        spool.close()
+        path = os.path.join(self._dir.name, dooray.MessengerHookSpool.SPOOL_FILE)
+        with open(path, "ab") as f:
+            f.write(b'{"t":1000,"text":"torn')
+
+        self._hook._send_status.return_value = 200
+        spool = self._spool()
+        self.assertEqual(spool.replay(force=True), 4)
+
+        self.assertEqual(os.path.getsize(path), 0)
+        self.assertTrue(spool.send("after"))
+
+    def test_append_after_torn_line(self):
+        """A partly written last line is removed on restart, so the next message is not appended to it."""
+        spool = self._spool()
+        self._hook._send_status.return_value = 503
+        spool.send("before")
+        spool.close()
+        path = os.path.join(self._dir.name, dooray.MessengerHookSpool.SPOOL_FILE)
+        with open(path, "ab") as f:
+            f.write(b'{"t":1000,"text":"torn')
+
+        spool = self._spool()
+        spool.send("after")
+        self._hook._send_status.return_value = 200
+        self._hook._send_status.reset_mock()
+        spool.replay(force=True)
+
+        self.assertEqual(self._sent_texts(), ["before", "after"])
+
+    def test_unexpected_records(self):
+        """Lines which are not records of the spool are skipped."""
+        path = os.path.join(self._dir.name, dooray.MessengerHookSpool.SPOOL_FILE)
+        with open(path, "wb") as f:
+            f.write(b'{"text":"no time"}\n[1,2]\n{"t":"now","text":"x"}\n{"t":1000,"text":"good"}\n')
+
+        spool = self._spool()
+        self.assertEqual(spool.replay(force=True), 1)
+
+        self.assertEqual(self._sent_texts(), ["good"])
+        self.assertEqual(spool.pending_bytes(), 0)
+
+    def test_compact_records(self):
+        """Records are compact JSON lines."""
+        spool = self._spool()
+        self._hook._send_status.return_value = 503
+        spool.send("한글", [{"text": "a"}])
+
+        with open(os.path.join(self._dir.name, dooray.MessengerHookSpool.SPOOL_FILE), "rb") as f:
+            line = f.read()
+        self.assertEqual(json.loads(line), {"t": 1000.0, "text": "한글", "attachments": [{"text": "a"}]})
+        self.assertNotIn(b" ", line)
@@ -1,3 +1,4 @@
+import json
 import unittest
 import dooray
 
@@ -177,3 +178,102 @@ class TestPostBuilder(unittest.TestCase):
         self.assertEqual(post_a.to_json_dict()["subject"], "Post A")
         self.assertEqual(post_b.to_json_dict()["subject"], "Post B")
         self.assertIsNot(post_a, post_b)
+
+    def test_create_shares_unchanged_sub_structures(self):
+        """create() shares recipients and body instead of deep copying them."""
+        builder = dooray.PostBuilder()\
+            .set_body("Shared body")\
+            .add_to_member("member-1")\
+            .add_tag_id("tag-1")
+
+        post1 = builder.create()
+        post2 = builder.create()
+
+        self.assertIs(post1.body, post2.body)
+        self.assertIs(post1.users.to[0], post2.users.to[0])
+        self.assertIsNot(post1.users.to, post2.users.to)
+        self.assertIsNot(post1.tag_ids, post2.tag_ids)
+
+    def test_shared_sub_structures_are_read_only(self):
+        """The body and recipients shared by created posts can not be changed in place."""
+        builder = dooray.PostBuilder()\
+            .set_body("Body")\
+            .add_to_member("member-1")\
+            .add_cc_email_user("cc@example.com", "CC User")
+
+        post1 = builder.create()
+        with self.assertRaises(AttributeError):
+            post1.body.content = "Mutated"
+        with self.assertRaises(AttributeError):
+            post1.users.to[0].member.organization_member_id = "member-2"
+        with self.assertRaises(AttributeError):
+            post1.users.cc[0].email_user.email_address = "other@example.com"
+        with self.assertRaises(AttributeError):
+            del post1.users.to[0].type
+        post1.body = dooray.Project.PostBody({"mimeType": "text/x-markdown", "content": "Replaced"})
+
+        d = builder.create().to_json_dict()
+        self.assertEqual(d["body"]["content"], "Body")
+        self.assertEqual(d["users"]["to"][0]["member"]["organizationMemberId"], "member-1")
+        self.assertEqual(d["users"]["cc"][0]["emailUser"]["emailAddress"], "cc@example.com")
+
+    def test_builder_changes_after_create(self):
+        """Changing the builder does not affect posts already created."""
+        builder = dooray.PostBuilder()\
+            .set_body("Body")\
+            .add_to_member("member-1")\
+            .add_tag_id("tag-1")
+
+        post1 = builder.create()
+        builder.add_to_member("member-2").add_cc_member("cc-1").add_tag_id("tag-2").set_body("Changed")
+
+        d = post1.to_json_dict()
+        self.assertEqual(len(d["users"]["to"]), 1)
+        self.assertEqual(d["users"]["cc"], [])
+        self.assertEqual(d["tagIds"], ["tag-1"])
+        self.assertEqual(d["body"]["content"], "Body")
+
+    def test_fork(self):
+        """fork() returns an independent builder starting from the same state."""
+        base = dooray.PostBuilder()\
+            .set_subject("Base")\
+            .add_to_member("member-1")
+
+        forked = base.fork().add_to_member("member-2").set_subject("Forked")
+
+        self.assertEqual(len(base.create().users.to), 1)
+        self.assertEqual(base.create().subject, "Base")
+        self.assertEqual(len(forked.create().users.to), 2)
+        self.assertEqual(forked.create().subject, "Forked")
+
+    def test_to_json_bytes_matches_to_json_dict(self):
+        """to_json_bytes() encodes the same payload as to_json_dict()."""
+        post = dooray.PostBuilder()\
+            .set_subject("제목")\
+            .set_body("Body")\
+            .set_priority("high")\
+            .add_to_member("member-1")\
+            .add_cc_email_user("cc@example.com", "CC User")\
+            .add_tag_id("tag-1")\
+            .create()
+
+        self.assertEqual(json.loads(post.to_json_bytes()), post.to_json_dict())
+
+    def test_to_json_bytes_reflects_changes(self):
+        """Cached fragments are re-encoded when a field changes, even in place."""
+        builder = dooray.PostBuilder()\
+            .set_subject("Base")\
+            .add_to_member("member-1")\
+            .add_tag_id("tag-1")
+        base = json.loads(builder.create().to_json_bytes())
+
+        post = builder.set_subject("Changed").create()
+        post.tag_ids.append("tag-2")
+        post.users.to[0] = dooray.Project.PostUser({"type": "member", "member": {"organizationMemberId": "member-2"}})
+        changed = json.loads(post.to_json_bytes())
+
+        self.assertEqual(base["subject"], "Base")
+        self.assertEqual(base["tagIds"], ["tag-1"])
+        self.assertEqual(changed["subject"], "Changed")
+        self.assertEqual(changed["tagIds"], ["tag-1", "tag-2"])
+        self.assertEqual(changed["users"]["to"][0]["member"]["organizationMemberId"], "member-2")
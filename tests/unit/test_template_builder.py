@@ -112,3 +112,16 @@ class TestTemplateBuilder(unittest.TestCase):
 
         self.assertEqual(template2.template_name, "Original")
         self.assertEqual(template2.to_json_dict()["tagIds"], ["tag-1"])
+
+    def test_fork(self):
+        """fork() returns an independent builder starting from the same state."""
+        base = dooray.TemplateBuilder()\
+            .set_template_name("Base")\
+            .set_guide("Guide")\
+            .add_tag_id("tag-1")
+
+        forked = base.fork().add_tag_id("tag-2")
+
+        self.assertEqual(base.create().to_json_dict()["tagIds"], ["tag-1"])
+        self.assertEqual(forked.create().to_json_dict()["tagIds"], ["tag-1", "tag-2"])
+        self.assertIs(base.create().guide, forked.create().guide)